@@ -16,13 +16,23 @@
 
 from __future__ import absolute_import
 
+import contextlib
+import httplib
 import json
 import logging
+import select
 import socket
+import ssl
+import sys
+import threading
+import time
 import urllib
 import urllib2
 import urlparse
+import zlib
 
+from cityindex import records
+from cityindex import schema
 from cityindex import util
 
 
@@ -31,6 +41,88 @@ LIVE_API_URL = 'https://ciapi.cityindex.com/tradingapi/'
 TEST_API_URL = 'https://ciapipreprod.cityindextest9.co.uk/tradingapi/'
 REQS_PER_SEC = 10
 
+# Maximum idle keep-alive connections retained per host; one for each worker
+# of the shared executor.
+POOL_SIZE = REQS_PER_SEC
+
+# HTTP methods HttpPool may resend after a stale keep-alive connection fails.
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD'])
+
+# Seconds an idle keep-alive connection is kept before it is discarded rather
+# than risk reusing one the server has timed out.
+IDLE_TIMEOUT = 15.0
+
+# Maximum bytes of raw response bodies retained by the response cache.
+CACHE_SIZE = 8 << 20
+
+# Seconds to cache responses for each RPC, taken from the SMD cacheDuration.
+CACHE_TTLS = dict((name, rpc['cache_duration'] / 1000.0)
+                  for name, rpc in schema.RPCS.iteritems()
+                  if rpc['cache_duration'])
+
+# The tag tree changes rarely, but the SMD does not declare a cacheDuration.
+CACHE_TTLS['TagLookup'] = 3600.0
+
+# Market details rarely change, but the SMD caches them for only a second;
+# market_info_many(refresh=True) fetches them afresh.
+CACHE_TTLS['GetMarketInformation'] = 3600.0
+
+#: Product types listed by list_tag_markets(), as search_with_tags() keyword
+#: arguments.
+PRODUCT_TYPES = ('cfd', 'spread', 'binary')
+
+# maxResults for each SearchWithTags request made by list_tag_markets().
+TAG_MAX_RESULTS = 10000
+
+# Request priority classes. Lower values are admitted by the rate limiter
+# first.
+PRIORITY_TRADING = 0
+PRIORITY_ACCOUNT = 1
+PRIORITY_NORMAL = 2
+PRIORITY_BULK = 3
+
+# Default priority class for each RPC; others use PRIORITY_NORMAL.
+RPC_PRIORITIES = {
+    'CancelOrder': PRIORITY_TRADING,
+    'Order': PRIORITY_TRADING,
+    'Trade': PRIORITY_TRADING,
+    'UpdateOrder': PRIORITY_TRADING,
+    'UpdateTrade': PRIORITY_TRADING,
+    'GetClientAndTradingAccount': PRIORITY_ACCOUNT,
+    'ListActiveStopLimitOrders': PRIORITY_ACCOUNT,
+    'ListOpenPositions': PRIORITY_ACCOUNT,
+    'LogOn': PRIORITY_ACCOUNT,
+    'GetPriceBars': PRIORITY_BULK,
+    'GetPriceTicks': PRIORITY_BULK,
+    'ListMarketInformationSearch': PRIORITY_BULK,
+    'SearchWithTags': PRIORITY_BULK,
+    'TagLookup': PRIORITY_BULK
+}
+
+# Seconds a waiter of each background class may be overtaken by higher
+# priority requests before it is admitted ahead of them.
+STARVATION_LIMITS = {
+    PRIORITY_NORMAL: 5.0,
+    PRIORITY_BULK: 30.0
+}
+
+# RPCs whose results are converted to records.Record in compact mode. Others,
+# such as TagLookup, are post-processed as dicts and are left alone.
+COMPACT_RPCS = frozenset([
+    'GetMarketInformation',
+    'ListCfdMarkets',
+    'ListMarketInformation',
+    'ListMarketInformationSearch',
+    'ListMarketSearch',
+    'ListSpreadMarkets',
+    'ListTradeHistory',
+    'SearchWithTags'
+])
+
+# Throttle scope for each RPC. Many are unset in the SMD, so default to 'data'.
+THROTTLE_SCOPES = dict((name, rpc['throttle_scope'] or 'data')
+                       for name, rpc in schema.RPCS.iteritems())
+
 
 #
 # Lightstreamer field names.
@@ -40,6 +132,21 @@ def url_bool(b):
     return 'true' if b else 'false'
 
 
+_shared_executor = None
+_shared_executor_lock = threading.Lock()
+
+
+def shared_executor():
+    """Return the util.Executor shared by every CiApiClient in the process.
+    It runs REQS_PER_SEC functions concurrently, since any more would only
+    queue in the rate limiter."""
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = util.Executor(REQS_PER_SEC)
+        return _shared_executor
+
+
 # Order status values.
 ORDER_STATUS_PENDING = 1
 ORDER_STATUS_ACCEPTED = 2
@@ -66,30 +173,266 @@ ORDER_STATUS_MAP = {
 }
 
 
+def _decode_body(encoding, data):
+    """Undo any Content-Encoding applied to a response body."""
+    if encoding == 'gzip':
+        return zlib.decompress(data, 16 + zlib.MAX_WBITS)
+    elif encoding == 'deflate':
+        # Servers disagree on whether deflate means zlib or raw deflate.
+        try:
+            return zlib.decompress(data)
+        except zlib.error:
+            return zlib.decompress(data, -zlib.MAX_WBITS)
+    return data
+
+
+class _PinnedHTTPSConnection(httplib.HTTPSConnection):
+    """HTTPSConnection that dials an already resolved address, while using
+    the original hostname for SNI and certificate verification."""
+    def __init__(self, address, hostname, context, **kwargs):
+        httplib.HTTPSConnection.__init__(self, address, **kwargs)
+        self.hostname = hostname
+        self.context = context
+
+    def connect(self):
+        sock = socket.create_connection((self.host, self.port), self.timeout)
+        self.sock = self.context.wrap_socket(sock,
+            server_hostname=self.hostname)
+
+
+class HttpResponse(object):
+    """A fully read HTTP response, exposing the subset of the urllib2
+    response interface used by CiApiClient."""
+    def __init__(self, code, msg, headers, body):
+        self.code = code
+        self.msg = msg
+        self.headers = headers
+        self.body = body
+
+    def getcode(self):
+        return self.code
+
+    def read(self):
+        return self.body
+
+
+class HttpPool(object):
+    """Pool of persistent HTTP/1.1 connections. Connections are keyed by
+    (scheme, address, hostname), and returned to the pool after each request
+    unless the server asked to close them. Idle connections are discarded
+    once older than `idle_timeout`, or when the server closed them. Responses are requested with
+    gzip/deflate encoding and decompressed before being returned."""
+    def __init__(self, size=POOL_SIZE, timeout=None,
+            idle_timeout=IDLE_TIMEOUT):
+        """Create an instance keeping at most `size` idle connections per
+        host for at most `idle_timeout` seconds, with an optional socket
+        `timeout`."""
+        self.size = size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        #: Count of connections that were newly opened.
+        self.opened = 0
+        #: Count of requests that reused an idle connection.
+        self.reused = 0
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._context = None
+
+    def _connect(self, scheme, address, hostname):
+        kwargs = {}
+        if self.timeout is not None:
+            kwargs['timeout'] = self.timeout
+        if scheme != 'https':
+            return httplib.HTTPConnection(address, **kwargs)
+        if self._context is None:
+            self._context = ssl.create_default_context()
+        return _PinnedHTTPSConnection(address, hostname, self._context,
+            **kwargs)
+
+    def _usable(self, conn, released):
+        """Return True if idle `conn`, released at time `released`, may be
+        reused. A connection the server closed or sent anything to while
+        idle polls readable."""
+        if (time.time() - released) > self.idle_timeout or conn.sock is None:
+            return False
+        try:
+            readable, _, _ = select.select([conn.sock], [], [], 0)
+        except (select.error, socket.error):
+            return False
+        return not readable
+
+    def _acquire(self, key):
+        """Return (conn, reused) for `key`, preferring a usable idle
+        connection."""
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                if not idle:
+                    self.opened += 1
+                    break
+                conn, released = idle.pop()
+            if self._usable(conn, released):
+                with self._lock:
+                    self.reused += 1
+                return conn, True
+            conn.close()
+        return self._connect(*key), False
+
+    def _release(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.size:
+                idle.append((conn, time.time()))
+                return
+        conn.close()
+
+    def request(self, method, url, body=None, headers=None, hostname=None):
+        """Issue a request for `url` and return an HttpResponse. `hostname`
+        overrides the name used for TLS verification when `url` contains a
+        pinned IP address."""
+        parsed = urlparse.urlsplit(url)
+        key = parsed.scheme, parsed.netloc, hostname or parsed.hostname
+        path = parsed.path or '/'
+        if parsed.query:
+            path += '?' + parsed.query
+        headers = dict(headers or {})
+        headers['Accept-Encoding'] = 'gzip, deflate'
+
+        while True:
+            conn, reused = self._acquire(key)
+            resp = None
+            try:
+                conn.request(method, path, body, headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except (httplib.HTTPException, socket.error):
+                conn.close()
+                # An idle connection may have been closed by the server
+                # after _usable() checked it. Retry on a fresh connection
+                # only when no status line arrived and resending is harmless:
+                # a timeout after the body was sent may mean the server
+                # already acted on it, so an order or trade must never be
+                # sent twice.
+                if reused and resp is None and method in IDEMPOTENT_METHODS:
+                    continue
+                raise
+            break
+
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+        data = _decode_body(resp.getheader('content-encoding'), data)
+        return HttpResponse(resp.status, resp.reason, resp.getheaders(), data)
+
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.itervalues():
+            for conn, released in conns:
+                conn.close()
+
+    def stats(self):
+        """Return a dict describing connection reuse."""
+        with self._lock:
+            return {
+                'opened': self.opened,
+                'reused': self.reused,
+                'idle': sum(len(conns) for conns in self._idle.itervalues())
+            }
+
+
 class CiApiClient:
     JSON_TYPE = 'application/json; charset=utf-8'
 
     def __init__(self, username, password, session_id=None, url=None,
-            prod=True):
+            prod=True, pool_size=POOL_SIZE, cache_size=CACHE_SIZE,
+            limiter_path=None, compact=False):
+        """Create an instance. If `limiter_path` is given, rate limiter state
+        is kept in files with that prefix, shared by every process using the
+        same prefix. If `compact` is True, large results are returned as
+        records.Record instances rather than dicts."""
         self.username = username
         self.password = password
         self.session_id = session_id
         self.url = url or (LIVE_API_URL if prod else TEST_API_URL)
         self.log = logging.getLogger('CiApiClient')
         self._client_account_id = None
+        self.limiter_path = limiter_path
+        self.compact = compact
+        self.limiter = util.ScopedLimiter(self._make_bucket)
+        self._local = threading.local()
+        self.pool = HttpPool(pool_size)
+        #: Raw response bodies keyed by path and query string.
+        self.cache = util.LruCache(cache_size)
+        #: Map of RPC name to cache lifetime in seconds.
+        self.cache_ttls = dict(CACHE_TTLS)
+        self._login_lock = threading.Lock()
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        #: Map of startup phase to seconds spent in it; see timed().
+        self.timings = {}
+        # DNS is resolved by the first request, so constructing a client
+        # never blocks.
+        self._original_host = urlparse.urlparse(self.url)[1]
+        self._resolved = False
+        self._resolve_lock = threading.Lock()
+
+    def _make_bucket(self, scope):
         # Docs say no more than 50reqs/5sec.
-        self._bucket = util.LeakyBucket(REQS_PER_SEC, REQS_PER_SEC)
-        self._resolve_host()
+        if self.limiter_path:
+            return util.SharedLeakyBucket('%s.%s' % (self.limiter_path, scope),
+                REQS_PER_SEC, REQS_PER_SEC, starvation=STARVATION_LIMITS)
+        return util.LeakyBucket(REQS_PER_SEC, REQS_PER_SEC,
+            starvation=STARVATION_LIMITS)
+
+    @contextlib.contextmanager
+    def timed(self, phase):
+        """Context manager adding the time spent in its body to
+        timings[phase]."""
+        start = time.time()
+        try:
+            yield
+        finally:
+            elapsed = time.time() - start
+            self.timings[phase] = self.timings.get(phase, 0) + elapsed
 
     def _resolve_host(self):
-        parsed = list(urlparse.urlparse(self.url))
-        self._original_host = parsed[1]
-        parsed[1] = socket.gethostbyname(parsed[1])
-        self.log.debug('Resolved %r to %r', self._original_host, parsed[1])
-        self.url = urlparse.urlunparse(tuple(parsed))
-
-    def _request(self, path):
-        self._bucket.get()
+        with self._resolve_lock:
+            if self._resolved:
+                return
+            parsed = list(urlparse.urlparse(self.url))
+            host, sep, port = parsed[1].partition(':')
+            with self.timed('dns'):
+                parsed[1] = socket.gethostbyname(host) + sep + port
+            self.log.debug('Resolved %r to %r', self._original_host, parsed[1])
+            self.url = urlparse.urlunparse(tuple(parsed))
+            self._resolved = True
+
+    @contextlib.contextmanager
+    def priority(self, priority):
+        """Context manager overriding the default priority class of
+        requests made by the calling thread.
+
+        Example:
+            with api.priority(cityindex.PRIORITY_BULK):
+                api.market_info(market_id)
+        """
+        old = getattr(self._local, 'priority', None)
+        self._local.priority = priority
+        try:
+            yield
+        finally:
+            self._local.priority = old
+
+    def _request(self, path, rpc=None):
+        priority = getattr(self._local, 'priority', None)
+        if priority is None:
+            priority = RPC_PRIORITIES.get(rpc, PRIORITY_NORMAL)
+        self.limiter.get(THROTTLE_SCOPES.get(rpc, 'data'), priority)
+        if not self._resolved:
+            self._resolve_host()
         req = urllib2.Request(urlparse.urljoin(self.url, path), headers={
             'Host': self._original_host
         })
@@ -101,50 +444,125 @@ class CiApiClient:
         if self.session_id:
             req.headers['UserName'] = self.username
             req.headers['session'] = self.session_id
-        try:
-            fp = urllib2.urlopen(req)
-        except urllib2.HTTPError, e:
-            fp = e
+        fp = self.pool.request(req.get_method(), req.get_full_url(),
+            req.get_data(), dict(req.header_items()),
+            hostname=self._original_host)
         self.log.debug('%s %s HTTP %d %s', req.get_method(),
             req.get_full_url(), fp.getcode(), fp.msg)
         return fp
 
-    def _open_raise(self, req, create_session=True):
+    def _relogin(self, stale_session_id):
+        """Login unless another thread already replaced `stale_session_id`
+        while we waited for the lock."""
+        with self._login_lock:
+            if self.session_id == stale_session_id:
+                self.login()
+
+    def _open_raw(self, req, create_session=True):
         """Do all required to make an HTTP request, paying attention to whether
         login is required, and trying to relogin once if our session has
-        expired."""
+        expired. Return the undecoded response body."""
         if create_session and not self.session_id:
-            self.login()
+            self._relogin(None)
 
+        session_id = self.session_id
         fp = self._make_request(req)
         if fp.getcode() == 401 and create_session:
-            self.login()
+            self._relogin(session_id)
             fp = self._make_request(req)
 
         if fp.getcode() != 200:
             raise ValueError('%d: %s' % (fp.getcode(), fp.read()))
+        return fp.read()
 
-        raw = fp.read()
+    def _decode(self, raw, conv=None, rpc=None):
+        """Decode the JSON body `raw`. If `conv` is given, it is a converter
+        generated from the schema that knows the response's date fields,
+        otherwise dates are found generically. In compact mode, responses
+        for COMPACT_RPCS are converted to records."""
         try:
-            return json.loads(util.json_fixup(raw))
+            if conv:
+                obj = conv(json.loads(raw))
+            else:
+                obj = util.json_loads(raw)
         except ValueError, e:
             raise ValueError('%r (%r)' % (e, raw))
+        if self.compact and rpc in COMPACT_RPCS:
+            obj = records.DEFAULT_DECODER.decode(schema.RPCS[rpc]['response'],
+                                                 obj)
+        return obj
+
+    def _open_raise(self, req, create_session=True, conv=None, rpc=None):
+        return self._decode(self._open_raw(req, create_session), conv, rpc)
 
-    def _post(self, path, dct, create_session=True):
-        req = self._request(path)
+    def _post(self, path, dct, create_session=True, rpc=None, conv=None):
+        req = self._request(path, rpc)
         req.add_header('Content-Type', self.JSON_TYPE)
         req.add_data(json.dumps(dct))
-        return self._open_raise(req, create_session)
+        return self._open_raise(req, create_session, conv, rpc)
 
-    def _get(self, path, dct=None):
+    def _get(self, path, dct=None, rpc=None, conv=None):
+        """GET `path` with query parameters from `dct`. If `rpc` names an
+        SMD service with a cache lifetime, the response may be served from
+        the response cache. `conv` is passed to _decode()."""
         if dct:
             path += '?' + urllib.urlencode(dct)
-        req = self._request(path)
-        return self._open_raise(req)
+        ttl = self.cache_ttls.get(rpc)
+        raw = self.cache.get(path) if ttl else None
+        if raw is None:
+            raw = self._fetch(path, rpc)
+            if ttl:
+                self.cache.put(path, raw, ttl)
+        return self._decode(raw, conv, rpc)
+
+    def _fetch(self, path, rpc=None):
+        """Return the raw response body for GET `path`. Concurrent callers
+        requesting the same path share a single request, and receive its
+        result or exception."""
+        with self._inflight_lock:
+            future = self._inflight.get(path)
+            leader = future is None
+            if leader:
+                future = self._inflight[path] = util.Future()
+        if not leader:
+            return future.result()
+
+        try:
+            raw = self._open_raw(self._request(path, rpc))
+        except:
+            future.set_exception(sys.exc_info())
+            raise
+        else:
+            future.set_result(raw)
+            return raw
+        finally:
+            with self._inflight_lock:
+                del self._inflight[path]
+
+    @util.cached_property
+    def rpc(self):
+        """schema.Rpc instance exposing a method for every SMD service."""
+        return schema.Rpc(self)
+
+    @util.cached_property
+    def executor(self):
+        """util.Executor used for concurrent bulk fetches; by default the
+        shared_executor()."""
+        return shared_executor()
 
     @util.cached_property
     def account_information(self):
-        return self._get('useraccount/UserAccount/ClientAndTradingAccount')
+        with self.timed('account'):
+            return self._get(
+                'useraccount/UserAccount/ClientAndTradingAccount',
+                rpc='GetClientAndTradingAccount')
+
+    def prefetch(self):
+        """Start fetching account_information on the executor, returning a
+        util.Future. When `session_id` was reused from an earlier run, this
+        doubles as a cheap validity check: a stale session is replaced by a
+        single login, with no login at all when it is still valid."""
+        return self.executor.submit(lambda: self.account_information)
 
     @property
     def client_account_id(self):
@@ -155,28 +573,16 @@ class CiApiClient:
         return self.account_information['TradingAccounts']
 
     def login(self):
-        dct = self._post('session', {
-            'UserName': self.username,
-            'Password': self.password
-        }, create_session=False)
+        with self.timed('login'):
+            dct = self._post('session', {
+                'UserName': self.username,
+                'Password': self.password
+            }, create_session=False, rpc='LogOn')
         self.session_id = dct['Session']
 
-    def market_search(self, q):
-        return self._get('market/search', {
-            'clientAccountId': self.client_account_id,
-            'searchByMarketCode': 'true',
-            'searchByMarketName': 'true',
-            'spreadProductType': 'false',
-            'cfdProductType': 'true',
-            'binaryProductType': 'false',
-            'query': 'Wall Street',
-            'maxResults': '1000',
-            'useMobileShortName': 'false'
-        })
-
     def tag_lookup(self):
         tags = []
-        for tag in self._get('market/taglookup')['Tags']:
+        for tag in self._get('market/taglookup', rpc='TagLookup')['Tags']:
             tags.append(tag)
             tag['ParentTagId'] = None
             tag.pop('Type')
@@ -199,11 +605,58 @@ class CiApiClient:
             dct['query'] = query
         if tag_id:
             dct['tagId'] = tag_id
-        return self._get('market/searchwithtags', dct)['Markets']
+        return self._get('market/searchwithtags', dct,
+            rpc='SearchWithTags')['Markets']
+
+    def list_tag_markets(self, tags=None, products=PRODUCT_TYPES,
+            max_results=TAG_MAX_RESULTS):
+        """Return a list of (tag, product, markets) tuples listing the
+        markets of each of `tags` for each of `products` using
+        search_with_tags(), fetched concurrently on the executor. `tags`
+        defaults to every tag returned by tag_lookup(). A warning is logged
+        for any listing that may have been truncated at `max_results`."""
+        if tags is None:
+            tags = CiApiClient.tag_lookup(self)
+        futures = []
+        for tag in tags:
+            for product in products:
+                kwargs = dict.fromkeys(PRODUCT_TYPES, False)
+                kwargs[product] = True
+                futures.append((tag, product, self.executor.submit(
+                    CiApiClient.search_with_tags, self,
+                    tag_id=tag['MarketTagId'],
+                    maxResults=max_results, **kwargs)))
+
+        out = []
+        for tag, product, future in futures:
+            markets = future.result()
+            if len(markets) >= max_results:
+                self.log.warning('%s listing of tag %r may be truncated at '
+                                 '%d markets', product, tag['MarketTagId'],
+                                 max_results)
+            out.append((tag, product, markets))
+        return out
 
     def market_info(self, market_id):
-        dct = self._get('market/%s/information' % market_id)
-        return dct['MarketInformation']
+        return self.rpc.get_market_information(market_id)['MarketInformation']
+
+    def market_info_many(self, market_ids, refresh=False):
+        """Return a dict mapping each MarketId in `market_ids` to its
+        ApiMarketInformationDTO. Duplicate IDs are fetched once, and the
+        remainder are fetched concurrently on the client's executor, paced by
+        the rate limiter. Markets are served from the response cache for
+        cache_ttls['GetMarketInformation'] seconds, unless `refresh` is
+        True."""
+        out = {}
+        futures = {}
+        for market_id in set(int(m) for m in market_ids):
+            if refresh:
+                self.cache.discard('market/%d/information' % market_id)
+            futures[market_id] = self.executor.submit(
+                CiApiClient.market_info, self, market_id)
+        for market_id, future in futures.iteritems():
+            out[market_id] = future.result()
+        return out
 
     def market_search(self, query, by_code=False, by_name=False, spread=False,
             cfd=False, binary=False, options=False, max_results=200,
@@ -218,23 +671,26 @@ class CiApiClient:
             'query': query,
             'maxResults': max_results,
             'useMobileShortName': url_bool(mobile)
-        })
+        }, rpc='ListMarketInformationSearch')
         return dct['MarketInformation']
 
-    def market_bars(self, market_id, interval='MINUTE', span=1, bars=60):
-        return self._get('market/%s/barhistory' % market_id, {
-            'interval': interval,
-            'span': span,
-            'PriceBars': bars
-        })
+    def market_bars(self, market_id, interval='MINUTE', span=1, bars=60,
+            as_array=False):
+        """Return the GetPriceBarResponseDTO for the last `bars` bars. If
+        `as_array` is True, PriceBars is a bars.BAR_DTYPE NumPy array."""
+        result = self.rpc.get_price_bars(market_id, interval, span, bars)
+        if as_array:
+            from cityindex import bars as bars_
+            result['PriceBars'] = bars_.from_dicts(result['PriceBars'])
+        return result
 
     def market_ticks(self, market_id, ticks=1000):
-        return self._get('market/%s/tickhistory' % market_id, {
-            'PriceTicks': ticks
-        })['PriceTicks']
+        return self.rpc.get_price_ticks(market_id, ticks)['PriceTicks']
 
     def translations(self):
-        lst = self._get('message/translation')['TranslationKeyValuePairs']
+        lst = self._get('message/translation',
+            rpc='GetClientApplicationMessageTranslation')
+        lst = lst['TranslationKeyValuePairs']
         return dict((e['Key'], e['Value']) for e in lst)
 
     def headlines(self, source=None, category=None, max_results=50,
@@ -244,10 +700,11 @@ class CiApiClient:
             'Category': category or 'uk',
             'MaxResults': max_results,
             'CultureId': culture_id
-        })
+        }, rpc='ListNewsHeadlines')
 
     def news_detail(self, source, story_id):
-        return self._get('news/%s/%s' % (source, story_id))
+        return self._get('news/%s/%s' % (source, story_id),
+            rpc='GetNewsDetail')
 
     def list_cfd_markets(self, name=None, code=None, max_results=200):
         return self._get('cfd/markets', {
@@ -255,7 +712,7 @@ class CiApiClient:
             'MarketCode': code or '',
             'ClientAccountId': self.client_account_id,
             'MaxResults': max_results
-        })['Markets']
+        }, rpc='ListCfdMarkets')['Markets']
 
     def list_spread_markets(self, name=None, code=None, max_results=200):
         return self._get('spread/markets', {
@@ -263,18 +720,18 @@ class CiApiClient:
             'MarketCode': code or '',
             'ClientAccountId': self.client_account_id,
             'MaxResults': max_results
-        })['Markets']
+        }, rpc='ListSpreadMarkets')['Markets']
 
     def get_system_lookup(self, entity):
         return self._get('message/lookup', {
             'LookupEntityName': entity
-        })
+        }, rpc='GetSystemLookup')
 
     def list_trade_history(self, account_id, max_results=200):
         return self._get('order/tradehistory', {
             'TradingAccountId': account_id,
             'maxResults': max_results
-        })
+        }, rpc='ListTradeHistory')
 
     def _account_id_for_market(self, market):
         for acct in self.account_information['TradingAccounts']:
@@ -298,5 +755,58 @@ class CiApiClient:
             'TradingAccountId': self._account_id_for_market(market),
             #'IfDone': ...
             'Close': close_ids
-        })
+        }, rpc='Trade')
+
+
 
+class AsyncCiApiClient(CiApiClient):
+    """CiApiClient variant whose API methods return a util.Future rather than
+    blocking the calling thread.
+
+    Python 2 has no native coroutine support, so requests are instead queued to
+    a small util.Executor whose threads share the client's connection pool,
+    rate limiter and login state. Hundreds of requests may be outstanding while
+    only `workers` threads exist; the rate limiter, not the thread count,
+    bounds throughput.
+
+    login(), and properties such as account_information and client_account_id
+    remain blocking.
+
+    Example:
+        api = AsyncCiApiClient('DM12345678', 'password')
+        futures = [api.market_bars(market_id) for market_id in market_ids]
+        bars = [future.result() for future in futures]
+    """
+    ASYNC_METHODS = ('market_search', 'tag_lookup',
+        'search_with_tags', 'market_info', 'market_bars', 'market_ticks',
+        'translations', 'headlines', 'news_detail', 'list_cfd_markets',
+        'list_spread_markets', 'get_system_lookup', 'list_trade_history',
+        'trade')
+
+    def __init__(self, username, password, session_id=None, url=None,
+            prod=True, pool_size=None, cache_size=CACHE_SIZE,
+            limiter_path=None, compact=False, workers=REQS_PER_SEC):
+        CiApiClient.__init__(self, username, password, session_id, url, prod,
+            pool_size or workers, cache_size, limiter_path, compact)
+        self.executor = util.Executor(workers)
+
+
+def _call_with_priority(self, priority, method, *args, **kwargs):
+    with self.priority(priority):
+        return method(self, *args, **kwargs)
+
+
+def _make_async(name):
+    method = getattr(CiApiClient, name)
+    def async_method(self, *args, **kwargs):
+        # Carry any priority() override over to the worker thread.
+        priority = getattr(self._local, 'priority', None)
+        return self.executor.submit(_call_with_priority, self, priority,
+            method, *args, **kwargs)
+    async_method.__name__ = name
+    async_method.__doc__ = method.__doc__
+    return async_method
+
+for _name in AsyncCiApiClient.ASYNC_METHODS:
+    setattr(AsyncCiApiClient, _name, _make_async(_name))
+del _name
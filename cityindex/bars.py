@@ -0,0 +1,503 @@
+#
+# Copyright 2012, the py-cityindex authors
+# 
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# 
+#    http://www.apache.org/licenses/LICENSE-2.0
+# 
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Price bar storage and manipulation using NumPy.
+
+Bars are handled column-wise: functions accept any mapping of column name to
+array, such as a dict of arrays or a NumPy structured array, and return the
+same kind of mapping.
+"""
+
+from __future__ import absolute_import
+
+import errno
+import fcntl
+import logging
+import math
+import operator
+import os
+import threading
+import time
+
+import numpy
+
+
+#: Column names of a price bar, in storage order.
+COLUMNS = ('BarDate', 'Open', 'High', 'Low', 'Close')
+
+#: Seconds in a single span of each bar interval.
+INTERVAL_SECS = {
+    'MINUTE': 60,
+    'HOUR': 60 * 60,
+    'DAY': 86400
+}
+
+
+#: Most bars requested from GetPriceBars at once. It returns only the most
+#: recent bars, so older bars cannot be paged in.
+MAX_BARS = 4000
+
+LOG = logging.getLogger('cityindex.bars')
+
+
+#: Structured array type holding one bar per element.
+BAR_DTYPE = numpy.dtype([(name, 'f8') for name in COLUMNS])
+
+
+def bar_seconds(interval, span=1):
+    """Return the length in seconds of a bar of `span` `interval`s."""
+    return INTERVAL_SECS[interval.upper()] * span
+
+
+def from_dicts(bars):
+    """Convert a list of PriceBarDTO dicts into a BAR_DTYPE array."""
+    return numpy.array(map(operator.itemgetter(*COLUMNS), bars), BAR_DTYPE)
+
+
+def to_dicts(bars):
+    """Convert a column mapping into a list of PriceBarDTO dicts."""
+    cols = [bars[name].tolist() for name in COLUMNS]
+    return [dict(zip(COLUMNS, row)) for row in zip(*cols)]
+
+
+def _like(bars, cols):
+    """Return `cols` as the same kind of mapping as `bars`."""
+    if isinstance(bars, numpy.ndarray):
+        arr = numpy.empty(len(cols['BarDate']), bars.dtype)
+        for name in bars.dtype.names:
+            arr[name] = cols[name]
+        return arr
+    return cols
+
+
+def tail(bars, count):
+    """Return the final `count` of `bars`."""
+    if isinstance(bars, numpy.ndarray):
+        return bars[-count:]
+    return dict((name, arr[-count:]) for name, arr in bars.iteritems())
+
+
+def pad(bars, interval='MINUTE', span=1, count=None):
+    """Fill gaps between `bars` with flat bars priced at the preceding bar's
+    Close, one every `span` `interval`s, as the charting UI does. If `count`
+    is given, return only the final `count` bars."""
+    dates = numpy.asarray(bars['BarDate'])
+    if len(dates) < 2:
+        cols = dict((name, numpy.asarray(bars[name])) for name in COLUMNS)
+    else:
+        step = bar_seconds(interval, span)
+        # Each bar is repeated once for itself and once per missing bar.
+        missing = numpy.ceil(numpy.diff(dates) / step).astype(int) - 1
+        reps = numpy.ones(len(dates), int)
+        reps[:-1] += numpy.maximum(missing, 0)
+        first = numpy.repeat(numpy.cumsum(reps) - reps, reps)
+        offset = numpy.arange(len(first)) - first
+        padded = offset > 0
+
+        close = numpy.repeat(bars['Close'], reps)
+        cols = {
+            'BarDate': numpy.repeat(dates, reps) + (offset * step),
+            'Close': close
+        }
+        for name in ('Open', 'High', 'Low'):
+            cols[name] = numpy.where(padded, close,
+                                     numpy.repeat(bars[name], reps))
+
+    if count is not None:
+        cols = tail(cols, count)
+    return _like(bars, cols)
+
+
+def from_ticks(ticks):
+    """Convert a list of PriceTickDTO dicts into a BAR_DTYPE array holding
+    one zero-length bar per tick, suitable for resample()."""
+    arr = numpy.empty(len(ticks), BAR_DTYPE)
+    arr['BarDate'] = [tick['TickDate'] for tick in ticks]
+    prices = [tick['Price'] for tick in ticks]
+    for name in COLUMNS[1:]:
+        arr[name] = prices
+    return arr
+
+
+def bucket_starts(dates, seconds, offset=0):
+    """Return the start of the `seconds` long bucket each of `dates` falls
+    in. Buckets begin `offset` seconds past a multiple of `seconds` since the
+    epoch, so for example daily bars for a session opening at 22:00 UTC use
+    `offset=22*3600`."""
+    dates = numpy.asarray(dates)
+    return dates - ((dates - offset) % seconds)
+
+
+def _resample(bars, dates, seconds, offset):
+    starts = bucket_starts(dates, seconds, offset)
+    first = numpy.flatnonzero(numpy.r_[True, starts[1:] != starts[:-1]])
+    last = numpy.r_[first[1:], len(dates)] - 1
+    return {
+        'BarDate': starts[first],
+        'Open': numpy.asarray(bars['Open'])[first],
+        'High': numpy.maximum.reduceat(bars['High'], first),
+        'Low': numpy.minimum.reduceat(bars['Low'], first),
+        'Close': numpy.asarray(bars['Close'])[last]
+    }
+
+
+def resample(bars, interval='MINUTE', span=1, offset=0):
+    """Aggregate finer `bars`, or ticks converted by from_ticks(), into
+    bars of `span` `interval`s. `bars` must be sorted by BarDate. Each output
+    BarDate is the start of its bucket; see bucket_starts() for `offset`."""
+    dates = numpy.asarray(bars['BarDate'])
+    if not len(dates):
+        return _like(bars, dict((name, numpy.empty(0)) for name in COLUMNS))
+    return _like(bars, _resample(bars, dates, bar_seconds(interval, span),
+                                 offset))
+
+
+class Resampler(object):
+    """Maintain bars of `span` `interval`s derived incrementally from finer
+    bars or ticks. Only input belonging to the newest bucket is merged into
+    the partial bar; closed bars are appended to a growing array and never
+    recomputed.
+
+    Feeding a revised copy of the newest input bar again is harmless, so
+    callers may pass overlapping ranges:
+
+        rs = Resampler('HOUR', 4)
+        rs.update(store.read(99500, 'MINUTE', 1))
+        ...
+        rs.update(store.read(99500, 'MINUTE', 1, start=rs.last_date))
+        closed, partial = rs.closed(), rs.partial
+    """
+    def __init__(self, interval='MINUTE', span=1, offset=0, limit=None):
+        """Create an instance. If `limit` is given, keep at least the most
+        recent `limit` closed bars, discarding older ones."""
+        self.seconds = bar_seconds(interval, span)
+        self.offset = offset
+        self.limit = limit
+        #: BarDate of the newest input seen, or None.
+        self.last_date = None
+        #: BAR_DTYPE scalar for the incomplete newest bucket, or None.
+        self.partial = None
+        self._buf = numpy.empty(64, BAR_DTYPE)
+        self._count = 0
+
+    def closed(self):
+        """Return a BAR_DTYPE array of closed bars, oldest first. The array
+        is a view, and is not modified by later calls to update()."""
+        return self._buf[:self._count]
+
+    def _append(self, arr):
+        count = self._count
+        if self.limit and (count + len(arr)) > (2 * self.limit):
+            keep = max(0, self.limit - len(arr))
+            self._buf = self._buf[count - keep:count].copy()
+            count = keep
+        need = count + len(arr)
+        if need > len(self._buf):
+            buf = numpy.empty(max(need, 2 * len(self._buf)), BAR_DTYPE)
+            buf[:count] = self._buf[:count]
+            self._buf = buf
+        # Views returned by closed() only cover the first _count elements, so
+        # writing beyond them is safe.
+        self._buf[count:need] = arr
+        self._count = need
+
+    def update(self, bars):
+        """Merge `bars` (sorted by BarDate) into the partial bar, closing it
+        and any further completed buckets. Input older than the partial bar
+        is ignored. Returns the number of newly closed bars."""
+        dates = numpy.asarray(bars['BarDate'])
+        if self.partial is not None:
+            skip = dates.searchsorted(self.partial['BarDate'])
+            bars = tail(bars, len(dates) - skip) if skip else bars
+            dates = dates[skip:]
+        if not len(dates):
+            return 0
+
+        new = _like(self._buf, _resample(bars, dates, self.seconds,
+                                         self.offset))
+        partial = self.partial
+        if partial is not None and new['BarDate'][0] == partial['BarDate']:
+            merged = new[0].copy()
+            merged['Open'] = partial['Open']
+            merged['High'] = max(partial['High'], merged['High'])
+            merged['Low'] = min(partial['Low'], merged['Low'])
+            new[0] = merged
+        elif partial is not None:
+            new = numpy.r_[numpy.array([partial], BAR_DTYPE), new]
+
+        self._append(new[:-1])
+        self.partial = new[-1].copy()
+        self.last_date = float(dates[-1])
+        return len(new) - 1
+
+    def add(self, date, price):
+        """Merge a single tick at `date` into the partial bar, without the
+        overhead of update(). Returns the number of newly closed bars."""
+        partial = self.partial
+        if partial is not None and date < partial['BarDate']:
+            return 0
+        self.last_date = date
+        start = date - ((date - self.offset) % self.seconds)
+        if partial is not None and start == partial['BarDate']:
+            if price > partial['High']:
+                partial['High'] = price
+            elif price < partial['Low']:
+                partial['Low'] = price
+            partial['Close'] = price
+            return 0
+
+        if partial is not None:
+            self._append(numpy.array([partial], BAR_DTYPE))
+        arr = numpy.array([(start, price, price, price, price)], BAR_DTYPE)
+        self.partial = arr[0]
+        return int(partial is not None)
+
+    def read(self, count=None):
+        """Return the final `count` closed bars followed by the partial bar,
+        as a new BAR_DTYPE array."""
+        closed = self.closed()
+        if count is not None:
+            closed = closed[-(count - 1):] if count > 1 else closed[:0]
+        if self.partial is None:
+            return closed.copy()
+        return numpy.r_[closed, numpy.array([self.partial], BAR_DTYPE)]
+
+
+class LiveBars(object):
+    """Maintain bars for one market from streaming prices, so charts and
+    strategies can read the current partial bar and recently closed bars
+    locally rather than polling market_bars().
+
+    A single history fetch of `interval` bars seeds a base Resampler, which
+    every tick received via CiStreamingClient.prices then updates. Coarser
+    spans are derived from the base bars the first time they are read, and
+    updated on every tick thereafter.
+
+    Example:
+        live = LiveBars(streamer, api, 99500)
+        bars = live.read('MINUTE', 15, count=100)
+        print 'last close:', bars['Close'][-1]
+    """
+    def __init__(self, streamer, api, market_id, interval='MINUTE',
+            history=1440, limit=None):
+        """Create an instance for `market_id`, fetching `history` bars of
+        `interval` and keeping at least the most recent `limit` closed bars
+        of each span."""
+        self.streamer = streamer
+        self.market_id = market_id
+        self.interval = interval.upper()
+        #: Number of `interval` bars fetched to seed the instance.
+        self.history = history
+        self.limit = limit
+        self.base = Resampler(self.interval, 1, limit=limit)
+        self._spans = {(self.interval, 1, 0): self.base}
+        self._lock = threading.Lock()
+        # Ticks received while the history fetch is in flight.
+        self._pending = []
+
+        streamer.prices.listen(self._on_price, market_id)
+        try:
+            result = api.market_bars(market_id, interval=self.interval,
+                span=1, bars=history, as_array=True)
+        except Exception:
+            self.stop()
+            raise
+
+        seed = result['PriceBars']
+        if result.get('PartialPriceBar'):
+            seed = numpy.r_[seed, from_dicts([result['PartialPriceBar']])]
+        with self._lock:
+            self.base.update(seed)
+            for date, price in self._pending:
+                self.base.add(date, price)
+            self._pending = None
+
+    def stop(self):
+        """Stop receiving prices."""
+        self.streamer.prices.unlisten(self._on_price, self.market_id)
+
+    def _on_price(self, price):
+        date = price['TickDate']
+        value = price['Price']
+        if date is None or value is None:
+            return
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((date, value))
+            else:
+                for resampler in self._spans.itervalues():
+                    resampler.add(date, value)
+
+    def _resampler(self, interval, span, offset):
+        key = interval.upper(), span, offset
+        resampler = self._spans.get(key)
+        if resampler is None:
+            if (bar_seconds(interval, span) % self.base.seconds) or \
+                    (offset % self.base.seconds):
+                raise ValueError('%d %s bars cannot be derived from %s bars'
+                                 % (span, interval, self.interval))
+            resampler = Resampler(interval, span, offset, self.limit)
+            resampler.update(self.base.read())
+            self._spans[key] = resampler
+        return resampler
+
+    def read(self, interval=None, span=1, offset=0, count=None):
+        """Return the final `count` bars of `span` `interval`s as a new
+        BAR_DTYPE array, ending with the partial bar. The interval must be a
+        multiple of the interval passed to the constructor; see
+        bucket_starts() for `offset`."""
+        with self._lock:
+            return self._resampler(interval or self.interval, span,
+                                   offset).read(count)
+
+
+class BarStore(object):
+    """Persistent store of price bars, keyed by (MarketId, interval, span).
+
+    Each series is a directory holding one file of native float64s per
+    column. New bars are appended as they become available, and reads return
+    slices of read-only numpy.memmap arrays, so a restarted process, or many
+    processes, can share months of bars via the page cache without copying
+    them or asking the API again.
+
+    Example:
+        store = BarStore('/var/lib/bars', api)
+        store.update(99500, 'MINUTE', 1)
+        bars = store.read(99500, 'MINUTE', 1, start=time.time() - 86400)
+        print bars['Close'].mean()
+    """
+    def __init__(self, path, api=None, initial=1440):
+        """Create an instance storing series below directory `path`. If
+        `api` is given, update() uses it to fetch bars, requesting `initial`
+        bars for a new series."""
+        self.path = path
+        self.api = api
+        self.initial = initial
+        self._maps = {}
+        self._lock = threading.Lock()
+
+    def _dir(self, market_id, interval, span):
+        return os.path.join(self.path, '%d-%s-%d' % (int(market_id),
+            interval.upper(), span))
+
+    def _column_path(self, series, name):
+        return os.path.join(series, name + '.f8')
+
+    def _open_column(self, path):
+        """Return a read-only memmap of the column at `path`, reusing the
+        previous map while the file has not grown."""
+        try:
+            size = os.path.getsize(path)
+        except OSError, e:
+            if e.errno != errno.ENOENT:
+                raise
+            size = 0
+        with self._lock:
+            old = self._maps.get(path)
+            if old is not None and old[0] == size:
+                return old[1]
+            if size < 8:
+                arr = numpy.empty(0, 'f8')
+            else:
+                arr = numpy.memmap(path, 'f8', 'r', shape=(size // 8,))
+            self._maps[path] = size, arr
+            return arr
+
+    def read(self, market_id, interval='MINUTE', span=1, start=None,
+            end=None):
+        """Return a dict mapping each of COLUMNS to a read-only array of the
+        stored bars whose BarDate is `start` <= BarDate < `end`."""
+        series = self._dir(market_id, interval, span)
+        cols = dict((name, self._open_column(self._column_path(series, name)))
+                    for name in COLUMNS)
+        # A concurrent or interrupted append may have extended some columns
+        # further than others.
+        count = min(len(arr) for arr in cols.itervalues())
+        dates = cols['BarDate'][:count]
+        lo = 0 if start is None else dates.searchsorted(start)
+        hi = count if end is None else dates.searchsorted(end)
+        return dict((name, arr[lo:hi]) for name, arr in cols.iteritems())
+
+    def last_date(self, market_id, interval='MINUTE', span=1):
+        """Return the BarDate of the newest stored bar, or None."""
+        dates = self.read(market_id, interval, span)['BarDate']
+        if len(dates):
+            return float(dates[-1])
+
+    def _truncate(self, series):
+        """Discard data left beyond the last complete row by an interrupted
+        append, so new rows are written aligned. Called with the series
+        locked."""
+        paths = [self._column_path(series, name) for name in COLUMNS]
+        sizes = [os.path.getsize(path) if os.path.exists(path) else 0
+                 for path in paths]
+        size = (min(sizes) // 8) * 8
+        for path, old in zip(paths, sizes):
+            if old > size:
+                with open(path, 'r+b') as fp:
+                    fp.truncate(size)
+
+    def append(self, market_id, interval, span, bars):
+        """Append those PriceBarDTO dicts from `bars` that are newer than the
+        last stored bar. Returns the number of bars appended."""
+        series = self._dir(market_id, interval, span)
+        try:
+            os.makedirs(series)
+        except OSError, e:
+            if e.errno != errno.EEXIST:
+                raise
+
+        with open(os.path.join(series, 'lock'), 'w') as lock_fp:
+            fcntl.flock(lock_fp, fcntl.LOCK_EX)
+            self._truncate(series)
+            last = self.last_date(market_id, interval, span)
+            new = [bar for bar in bars
+                   if last is None or bar['BarDate'] > last]
+            if not new:
+                return 0
+            # Write BarDate last, so readers never see a date without its
+            # prices.
+            for name in COLUMNS[1:] + COLUMNS[:1]:
+                arr = numpy.array([bar[name] for bar in new], 'f8')
+                with open(self._column_path(series, name), 'ab') as fp:
+                    fp.write(arr.tostring())
+            return len(new)
+
+    def update(self, market_id, interval='MINUTE', span=1):
+        """Fetch bars completed since the last stored bar, and append them.
+        At most MAX_BARS are fetched, so a warning is logged if older missing
+        bars are left as a gap. Returns the number of bars appended."""
+        last = self.last_date(market_id, interval, span)
+        if last is None:
+            count = self.initial
+        else:
+            elapsed = time.time() - last
+            count = int(math.ceil(elapsed / bar_seconds(interval, span)))
+            if count <= 1:
+                return 0
+        capped = count > MAX_BARS
+        result = self.api.market_bars(market_id, interval=interval.upper(),
+            span=span, bars=min(count, MAX_BARS))
+        bars = result['PriceBars']
+        # Bars are missing anyway while the market was closed, so only warn
+        # when the request was capped.
+        if capped and last is not None and bars and \
+                bars[0]['BarDate'] > last + bar_seconds(interval, span):
+            LOG.warning('market %r %d %s bars from %s to %s exceed MAX_BARS '
+                        'and are missing from the store', market_id, span,
+                        interval, last, bars[0]['BarDate'])
+        return self.append(market_id, interval, span, bars)
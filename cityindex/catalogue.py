@@ -0,0 +1,274 @@
+#
+# Copyright 2012, the py-cityindex authors
+# 
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# 
+#    http://www.apache.org/licenses/LICENSE-2.0
+# 
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Local SQLite catalogue of markets and their tags.
+
+Catalogue.sync() walks the tag tree returned by TagLookup, lists each tag's
+markets with SearchWithTags concurrently on the client's executor, and stores
+markets, their ApiMarketInformationDTO fields, and tag memberships in indexed
+tables. Only tags whose membership changed since the last sync are rewritten,
+and only markets that are new or belong to a changed tag have their market
+information fetched again.
+"""
+
+from __future__ import absolute_import
+
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+
+from cityindex import schema
+from cityindex.api import CiApiClient
+from cityindex.api import PRODUCT_TYPES
+
+
+#: Columns of the markets table, one per ApiMarketInformationDTO field.
+MARKET_FIELDS = tuple(sorted(str(f)
+                             for f in schema.TYPES['ApiMarketInformationDTO']))
+
+#: Market fields that are indexed.
+INDEXED_FIELDS = ('MarketSettingsType', 'MarketUnderlyingType', 'Name',
+                  'PriceDecimalPlaces')
+
+LOG = logging.getLogger('cityindex.catalogue')
+
+
+def _is_json(descr):
+    """Return True if fields described by `descr` are stored as JSON."""
+    return bool(descr.get('collection')) or descr['type'] in schema.TYPES
+
+
+#: Market fields holding collections or nested types, stored as JSON text.
+JSON_FIELDS = frozenset(f for f in MARKET_FIELDS if _is_json(
+    schema.TYPES['ApiMarketInformationDTO'][f]))
+
+
+def _membership_hash(memberships):
+    """Return a digest of a tag's (product, MarketId) pairs."""
+    return hashlib.sha1(json.dumps(sorted(memberships))).hexdigest()
+
+
+class Catalogue(object):
+    """SQLite catalogue of markets, tags and tag memberships.
+
+    Example:
+        cat = Catalogue('markets.db')
+        cat.sync(api)
+        for market in cat.markets(tag_id=90, product='cfd'):
+            print market['Name']
+        print len(cat.markets(PriceDecimalPlaces=2))
+    """
+    def __init__(self, path):
+        """Open or create the catalogue database at `path`."""
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self._create()
+
+    def _create(self):
+        cols = ', '.join('%s %s' % (field, self._column_type(field))
+                         for field in MARKET_FIELDS if field != 'MarketId')
+        with self.db:
+            self.db.executescript("""
+                CREATE TABLE IF NOT EXISTS tags (
+                    MarketTagId INTEGER PRIMARY KEY,
+                    ParentTagId INTEGER,
+                    Name TEXT,
+                    Hash TEXT,
+                    Synced REAL
+                );
+                CREATE TABLE IF NOT EXISTS tag_markets (
+                    MarketTagId INTEGER,
+                    Product TEXT,
+                    MarketId INTEGER,
+                    PRIMARY KEY (MarketTagId, Product, MarketId)
+                );
+                CREATE INDEX IF NOT EXISTS tag_markets_market
+                    ON tag_markets (MarketId);
+                CREATE TABLE IF NOT EXISTS markets (
+                    MarketId INTEGER PRIMARY KEY,
+                    Updated REAL,
+                    %s
+                );
+            """ % cols)
+            for field in INDEXED_FIELDS:
+                self.db.execute('CREATE INDEX IF NOT EXISTS markets_%s '
+                                'ON markets (%s)' % (field, field))
+
+    def _column_type(self, field):
+        descr = schema.TYPES['ApiMarketInformationDTO'][field]
+        if descr.get('date'):
+            return 'REAL'
+        elif field in JSON_FIELDS or descr['type'] == 'basestring':
+            return 'TEXT'
+        elif descr['type'] == 'bool':
+            return 'INTEGER'
+        return 'NUMERIC'
+
+    def close(self):
+        self.db.close()
+
+    def _list_tags(self, api, tags, products):
+        """Return a dict mapping each MarketTagId to a dict mapping MarketId
+        to ApiMarketDTO, and a set of (product, MarketId) pairs per tag."""
+        listed = {}
+        memberships = dict((tag['MarketTagId'], set()) for tag in tags)
+        for tag, product, markets in api.list_tag_markets(tags, products):
+            for market in markets:
+                listed[market['MarketId']] = market
+                memberships[tag['MarketTagId']].add(
+                    (product, market['MarketId']))
+        return listed, memberships
+
+    def sync(self, api, products=PRODUCT_TYPES, info=True, max_age=None):
+        """Update the catalogue from the API using CiApiClient `api`. If
+        `info` is True, fetch ApiMarketInformationDTO for new markets,
+        markets of changed tags, and if `max_age` is given, markets last
+        updated more than `max_age` seconds ago. Returns a dict describing the
+        work done."""
+        now = time.time()
+        # Unbound, so AsyncCiApiClient's Future-returning override is skipped.
+        tags = CiApiClient.tag_lookup(api)
+        listed, memberships = self._list_tags(api, tags, products)
+
+        old_hashes = dict(self.db.execute(
+            'SELECT MarketTagId, Hash FROM tags'))
+        known = set(row[0] for row in self.db.execute(
+            'SELECT MarketId FROM markets'))
+
+        changed = []
+        stale_ids = set(listed) - known
+        if max_age is not None:
+            stale_ids.update(row[0] for row in self.db.execute(
+                'SELECT MarketId FROM markets WHERE Updated < ?',
+                (now - max_age,)))
+            # Markets no longer listed are deleted below, not refreshed.
+            stale_ids &= set(listed)
+        with self.db:
+            for tag in tags:
+                tag_id = tag['MarketTagId']
+                digest = _membership_hash(memberships[tag_id])
+                if old_hashes.pop(tag_id, None) == digest:
+                    continue
+                changed.append(tag_id)
+                stale_ids.update(mid for _, mid in memberships[tag_id])
+                self.db.execute('INSERT OR REPLACE INTO tags VALUES '
+                    '(?, ?, ?, ?, ?)', (tag_id, tag['ParentTagId'],
+                    tag['Name'], digest, now))
+                self.db.execute('DELETE FROM tag_markets '
+                                'WHERE MarketTagId = ?', (tag_id,))
+                self.db.executemany('INSERT INTO tag_markets VALUES '
+                    '(?, ?, ?)', [(tag_id, product, market_id)
+                    for product, market_id in memberships[tag_id]])
+
+            # Tags no longer returned by TagLookup.
+            for tag_id in old_hashes:
+                self.db.execute('DELETE FROM tags WHERE MarketTagId = ?',
+                                (tag_id,))
+                self.db.execute('DELETE FROM tag_markets '
+                                'WHERE MarketTagId = ?', (tag_id,))
+            self.db.execute('DELETE FROM markets WHERE MarketId NOT IN '
+                            '(SELECT MarketId FROM tag_markets)')
+
+            if info and stale_ids:
+                infos = api.market_info_many(stale_ids, refresh=True)
+            else:
+                infos = {}
+            for market_id in stale_ids:
+                self._put_market(infos.get(market_id) or listed[market_id],
+                                 now)
+
+        LOG.debug('synced %d tags (%d changed, %d removed), %d markets '
+                  'updated', len(tags), len(changed), len(old_hashes),
+                  len(stale_ids))
+        return {
+            'tags': len(tags),
+            'changed_tags': len(changed),
+            'removed_tags': len(old_hashes),
+            'markets': len(listed),
+            'updated_markets': len(stale_ids)
+        }
+
+    def _put_market(self, market, now):
+        values = []
+        for field in MARKET_FIELDS:
+            value = market.get(field)
+            if field in JSON_FIELDS and value is not None:
+                value = json.dumps(value, default=lambda o: o.to_dict())
+            values.append(value)
+        self.db.execute('INSERT OR REPLACE INTO markets (Updated, %s) '
+            'VALUES (?, %s)' % (', '.join(MARKET_FIELDS),
+                                ', '.join('?' * len(MARKET_FIELDS))),
+            [now] + values)
+
+    def _to_dict(self, row):
+        dct = dict(zip(row.keys(), row))
+        for field in JSON_FIELDS:
+            if dct.get(field) is not None:
+                dct[field] = json.loads(dct[field])
+        return dct
+
+    def markets(self, tag_id=None, product=None, **where):
+        """Return a list of market dicts, optionally restricted to those in
+        tag `tag_id` and/or listed for `product`, and whose fields equal the
+        keyword arguments in `where`, for example PriceDecimalPlaces=2."""
+        clauses = []
+        args = []
+        for field, value in sorted(where.items()):
+            if field not in MARKET_FIELDS:
+                raise ValueError('unknown market field %r' % (field,))
+            clauses.append('m.%s = ?' % field)
+            args.append(value)
+        if tag_id is not None or product is not None:
+            sub = 'SELECT MarketId FROM tag_markets WHERE 1'
+            if tag_id is not None:
+                sub += ' AND MarketTagId = ?'
+                args.append(tag_id)
+            if product is not None:
+                sub += ' AND Product = ?'
+                args.append(product)
+            clauses.append('m.MarketId IN (%s)' % sub)
+        sql = 'SELECT m.* FROM markets m'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        return [self._to_dict(row)
+                for row in self.db.execute(sql + ' ORDER BY m.Name', args)]
+
+    def market(self, market_id):
+        """Return the market dict for `market_id`, or None."""
+        row = self.db.execute('SELECT * FROM markets WHERE MarketId = ?',
+                              (market_id,)).fetchone()
+        return row and self._to_dict(row)
+
+    def tags(self, parent_id=None):
+        """Return a list of tag dicts, optionally only children of
+        `parent_id`."""
+        sql = 'SELECT MarketTagId, ParentTagId, Name FROM tags'
+        args = ()
+        if parent_id is not None:
+            sql += ' WHERE ParentTagId = ?'
+            args = (parent_id,)
+        return [dict(zip(row.keys(), row))
+                for row in self.db.execute(sql + ' ORDER BY Name', args)]
+
+    def market_tags(self, market_id):
+        """Return a list of (MarketTagId, Product) for `market_id`."""
+        return [tuple(row) for row in self.db.execute(
+            'SELECT MarketTagId, Product FROM tag_markets WHERE MarketId = ? '
+            'ORDER BY MarketTagId, Product', (market_id,))]
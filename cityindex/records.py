@@ -0,0 +1,215 @@
+#
+# Copyright 2012, the py-cityindex authors
+# 
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# 
+#    http://www.apache.org/licenses/LICENSE-2.0
+# 
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Compact record types for large result sets.
+
+Dictionaries remain the library's native format, however a catalogue of
+thousands of markets repeats every key in every dict, along with values such
+as currency codes. The record types built here from schema.TYPES store fields
+in __slots__, intern repetitive string values, and support enough of the dict
+interface that most code reading results need not change.
+"""
+
+from __future__ import absolute_import
+
+import threading
+
+from cityindex import schema
+
+
+# String fields whose values are mostly unique, and so are not interned.
+UNIQUE_FIELDS = frozenset([
+    'AuditId', 'Description', 'Headline', 'MarketName', 'MobileShortName',
+    'Name', 'Story', 'Title', 'WeekendTradingTime'
+])
+
+# Interned strings are only added to the table while it is smaller than this.
+MAX_INTERNED = 1 << 16
+
+
+class Record(object):
+    """Base for generated record types. Fields are accessed using dict
+    syntax; keys present in the response but not the schema are kept in the
+    `_extra` slot."""
+    __slots__ = ('_extra',)
+    _fields = ()
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            return getattr(self, key)
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._fields:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __contains__(self, key):
+        return key in self._fields or bool(self._extra and key in self._extra)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self._fields) + len(self._extra or ())
+
+    def __eq__(self, other):
+        if not hasattr(other, 'iteritems'):
+            return NotImplemented
+        return dict(self.iteritems()) == dict(other.iteritems())
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, dict(self.iteritems()))
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return list(self._fields) + list(self._extra or ())
+
+    def iteritems(self):
+        for key in self._fields:
+            yield key, getattr(self, key)
+        for item in (self._extra or {}).iteritems():
+            yield item
+
+    def items(self):
+        return list(self.iteritems())
+
+    def values(self):
+        return [value for key, value in self.iteritems()]
+
+    def to_dict(self):
+        """Return the record as a plain dict, recursively."""
+        def conv(value):
+            if isinstance(value, Record):
+                return value.to_dict()
+            elif isinstance(value, list):
+                return [conv(v) for v in value]
+            return value
+        return dict((key, conv(value)) for key, value in self.iteritems())
+
+
+def make_record_type(name, fields):
+    """Return a new Record subclass named `name` with a slot for each of
+    `fields`."""
+    fields = tuple(str(f) for f in fields)
+    return type(str(name), (Record,), {
+        '__slots__': fields,
+        '_fields': fields
+    })
+
+
+class RecordDecoder(object):
+    """Convert decoded JSON dicts into Record instances according to the
+    types in schema.TYPES, interning low cardinality strings in a table shared
+    by every record this instance produces."""
+    def __init__(self, types=None):
+        self.types = types or schema.TYPES
+        self.strings = {}
+        self._classes = {}
+        self._decoders = {}
+        self._lock = threading.Lock()
+
+    def record_type(self, name):
+        """Return the Record subclass for type `name`."""
+        cls = self._classes.get(name)
+        if cls is None:
+            cls = make_record_type(name, sorted(self.types[name]))
+            self._classes[name] = cls
+        return cls
+
+    def intern(self, s):
+        """Return the shared copy of string `s`."""
+        strings = self.strings
+        interned = strings.get(s)
+        if interned is None:
+            if len(strings) >= MAX_INTERNED:
+                return s
+            interned = strings[s] = s
+        return interned
+
+    def decoder(self, name):
+        """Return a function converting a dict of type `name` into a
+        record. The dict passed to the function is consumed."""
+        decode = self._decoders.get(name)
+        if decode:
+            return decode
+        with self._lock:
+            building = {}
+            decode = self._build(name, building)
+            # Only publish decoders once every plan is complete.
+            self._decoders.update(building)
+        return decode
+
+    def _build(self, name, building):
+        """Return the decoder for type `name`, constructing it and any
+        decoders it depends on into `building`."""
+        decode = self._decoders.get(name) or building.get(name)
+        if decode:
+            return decode
+
+        cls = self.record_type(name)
+        plan = []
+        intern = self.intern
+
+        def decode(dct):
+            rec = cls.__new__(cls)
+            for key, conv, collection, interned in plan:
+                value = dct.pop(key, None)
+                if value is not None:
+                    if conv:
+                        if collection:
+                            value = [conv(v) for v in value]
+                        else:
+                            value = conv(value)
+                    elif interned and isinstance(value, basestring):
+                        value = intern(value)
+                setattr(rec, key, value)
+            rec._extra = dct or None
+            return rec
+
+        # Register before building the plan, so recursive types terminate.
+        building[name] = decode
+        for field, descr in sorted(self.types[name].items()):
+            type_ = descr['type']
+            conv = None
+            if type_ in self.types:
+                conv = self._build(type_, building)
+            interned = type_ == 'basestring' and field not in UNIQUE_FIELDS
+            plan.append((str(field), conv, bool(descr.get('collection')),
+                         interned))
+        return decode
+
+    def decode(self, name, dct):
+        """Convert `dct` of type `name` into a record."""
+        return self.decoder(name)(dct)
+
+
+#: Decoder shared by all CiApiClient instances using compact mode.
+DEFAULT_DECODER = RecordDecoder()
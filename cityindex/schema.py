@@ -0,0 +1,1536 @@
+# Generated by rebuild_schema.py; do not edit.
+
+from __future__ import absolute_import
+
+import urllib
+
+from cityindex import util
+
+
+def _q(value):
+    if value is None:
+        return ''
+    elif value is True or value is False:
+        return 'true' if value else 'false'
+    elif isinstance(value, unicode):
+        value = value.encode('utf-8')
+    return urllib.quote(str(value), safe='')
+
+
+def _date(value):
+    return value if value is None else util.ms_date(value)
+
+
+def _identity(o):
+    return o
+
+
+TYPES = {u'AccountInformationResponseDTO': {u'AccountOperatorId': {'type': 'int'},
+                                    u'ClientAccountCurrency': {'type': 'basestring'},
+                                    u'ClientAccountId': {'type': 'int'},
+                                    u'HasMultipleEmailAddresses': {'type': 'bool'},
+                                    u'LogonUserName': {'type': 'basestring'},
+                                    u'PersonalEmailAddress': {'type': 'basestring'},
+                                    u'TradingAccounts': {'collection': True,
+                                                         'type': u'ApiTradingAccountDTO'}},
+ u'ApiActiveStopLimitOrderDTO': {u'Applicability': {'type': 'int'},
+                                 u'Currency': {'type': 'basestring'},
+                                 u'Direction': {'type': 'basestring'},
+                                 u'ExpiryDateTimeUTC': {'date': True,
+                                                        'type': 'basestring'},
+                                 u'LastChangedDateTimeUTC': {'date': True,
+                                                             'type': 'basestring'},
+                                 u'LimitOrder': {'type': u'ApiBasicStopLimitOrderDTO'},
+                                 u'MarketId': {'type': 'int'},
+                                 u'MarketName': {'type': 'basestring'},
+                                 u'OcoOrder': {'type': u'ApiBasicStopLimitOrderDTO'},
+                                 u'OrderId': {'type': 'int'},
+                                 u'ParentOrderId': {'type': 'int'},
+                                 u'Quantity': {'type': 'int'},
+                                 u'Status': {'type': 'int'},
+                                 u'StopOrder': {'type': u'ApiBasicStopLimitOrderDTO'},
+                                 u'TradingAccountId': {'type': 'int'},
+                                 u'TriggerPrice': {'type': 'int'},
+                                 u'Type': {'type': 'int'}},
+ u'ApiBasicStopLimitOrderDTO': {u'OrderId': {'type': 'int'},
+                                u'Quantity': {'type': 'int'},
+                                u'TriggerPrice': {'type': 'int'}},
+ u'ApiChangePasswordRequestDTO': {u'NewPassword': {'type': 'basestring'},
+                                  u'Password': {'type': 'basestring'},
+                                  u'UserName': {'type': 'basestring'}},
+ u'ApiChangePasswordResponseDTO': {u'IsPasswordChanged': {'type': 'bool'}},
+ u'ApiClientAccountWatchlistDTO': {u'DisplayOrder': {'type': 'int'},
+                                   u'Items': {'collection': True,
+                                              'type': u'ApiClientAccountWatchlistItemDTO'},
+                                   u'WatchlistDescription': {'type': 'basestring'},
+                                   u'WatchlistId': {'type': 'int'}},
+ u'ApiClientAccountWatchlistItemDTO': {u'DisplayOrder': {'type': 'int'},
+                                       u'MarketId': {'type': 'int'},
+                                       u'WatchlistId': {'type': 'int'}},
+ u'ApiClientApplicationMessageTranslationDTO': {u'Key': {'type': 'basestring'},
+                                                u'Value': {'type': 'basestring'}},
+ u'ApiClientApplicationMessageTranslationRequestDTO': {u'AccountOperatorId': {'type': 'int'},
+                                                       u'ClientApplicationId': {'type': 'int'},
+                                                       u'CultureId': {'type': 'int'},
+                                                       u'InterestedTranslationKeys': {'collection': True,
+                                                                                      'type': 'basestring'}},
+ u'ApiClientApplicationMessageTranslationResponseDTO': {u'TranslationKeyValuePairs': {'collection': True,
+                                                                                      'type': u'ApiClientApplicationMessageTranslationDTO'}},
+ u'ApiCultureLookupDTO': {u'Code': {'type': 'basestring'},
+                          u'Description': {'type': 'basestring'},
+                          u'DisplayOrder': {'type': 'int'},
+                          u'Id': {'type': 'int'},
+                          u'IsActive': {'type': 'bool'},
+                          u'IsAllowed': {'type': 'bool'},
+                          u'TranslationText': {'type': 'basestring'},
+                          u'TranslationTextId': {'type': 'int'}},
+ u'ApiDateTimeOffsetDTO': {u'OffsetMinutes': {'type': 'int'},
+                           u'UtcDateTime': {'date': True,
+                                            'type': 'basestring'}},
+ u'ApiDeleteWatchlistRequestDTO': {u'WatchlistId': {'type': 'int'}},
+ u'ApiDeleteWatchlistResponseDTO': {u'Deleted': {'type': 'bool'}},
+ u'ApiErrorResponseDTO': {u'ErrorCode': {'type': 'int'},
+                          u'ErrorMessage': {'type': 'basestring'},
+                          u'HttpStatus': {'type': 'int'}},
+ u'ApiIfDoneDTO': {u'Limit': {'type': u'ApiStopLimitOrderDTO'},
+                   u'Stop': {'type': u'ApiStopLimitOrderDTO'}},
+ u'ApiIfDoneResponseDTO': {u'Limit': {'type': u'ApiOrderResponseDTO'},
+                           u'Stop': {'type': u'ApiOrderResponseDTO'}},
+ u'ApiLogOffRequestDTO': {u'UserName': {'type': 'basestring'},
+                          u'session': {'type': 'basestring'}},
+ u'ApiLogOffResponseDTO': {u'LoggedOut': {'type': 'bool'}},
+ u'ApiLogOnRequestDTO': {u'AppComments': {'type': 'basestring'},
+                         u'AppKey': {'type': 'basestring'},
+                         u'AppVersion': {'type': 'basestring'},
+                         u'Password': {'type': 'basestring'},
+                         u'UserName': {'type': 'basestring'}},
+ u'ApiLogOnResponseDTO': {u'AllowedAccountOperator': {'type': 'bool'},
+                          u'PasswordChangeRequired': {'type': 'bool'},
+                          u'session': {'type': 'basestring'}},
+ u'ApiLookupDTO': {u'Description': {'type': 'basestring'},
+                   u'DisplayOrder': {'type': 'int'},
+                   u'Id': {'type': 'int'},
+                   u'IsActive': {'type': 'bool'},
+                   u'IsAllowed': {'type': 'bool'},
+                   u'TranslationText': {'type': 'basestring'},
+                   u'TranslationTextId': {'type': 'int'}},
+ u'ApiLookupResponseDTO': {u'ApiCultureLookupDTOList': {'collection': True,
+                                                        'type': u'ApiCultureLookupDTO'},
+                           u'ApiLookupDTOList': {'collection': True,
+                                                 'type': u'ApiLookupDTO'},
+                           u'CultureId': {'type': 'int'},
+                           u'LookupEntityName': {'type': 'basestring'}},
+ u'ApiMarketDTO': {u'MarketId': {'type': 'int'},
+                   u'Name': {'type': 'basestring'}},
+ u'ApiMarketEodDTO': {u'MarketEodAmount': {'type': 'int'},
+                      u'MarketEodUnit': {'type': 'basestring'}},
+ u'ApiMarketInformationDTO': {u'AllowGuaranteedOrders': {'type': 'bool'},
+                              u'AllowRollover': {'type': 'bool'},
+                              u'BetPer': {'type': 'int'},
+                              u'CentralClearingType': {'type': 'basestring'},
+                              u'CentralClearingTypeDescription': {'type': 'basestring'},
+                              u'CloseOnly': {'type': 'bool'},
+                              u'CommissionChargeMinimum': {'type': 'int'},
+                              u'CommissionRate': {'type': 'int'},
+                              u'CommissionRateUnits': {'type': 'int'},
+                              u'ConvertPriceToPipsMultiplier': {'type': 'int'},
+                              u'DailyFinancingAppliedAtUtc': {'date': True,
+                                                              'type': 'basestring'},
+                              u'DefaultQuoteLength': {'type': 'int'},
+                              u'ExpiryBasisId': {'type': 'int'},
+                              u'ExpiryBasisText': {'type': 'basestring'},
+                              u'ExpiryUtc': {'date': True,
+                                             'type': 'basestring'},
+                              u'FutureRolloverUTC': {'date': True,
+                                                     'type': 'basestring'},
+                              u'GuaranteedOrderMinDistance': {'type': 'int'},
+                              u'GuaranteedOrderMinDistanceUnits': {'type': 'int'},
+                              u'GuaranteedOrderPremium': {'type': 'int'},
+                              u'GuaranteedOrderPremiumUnits': {'type': 'int'},
+                              u'LimitDown': {'type': 'bool'},
+                              u'LimitUp': {'type': 'bool'},
+                              u'LongPositionOnly': {'type': 'bool'},
+                              u'MarginFactor': {'type': 'int'},
+                              u'MarginFactorUnits': {'type': 'int'},
+                              u'Market24H': {'type': 'bool'},
+                              u'MarketBreakTimes': {'collection': True,
+                                                    'type': u'ApiTradingDayTimesDTO'},
+                              u'MarketCurrencyId': {'type': 'int'},
+                              u'MarketEod': {'collection': True,
+                                             'type': u'ApiMarketEodDTO'},
+                              u'MarketId': {'type': 'int'},
+                              u'MarketPricingTimes': {'collection': True,
+                                                      'type': u'ApiTradingDayTimesDTO'},
+                              u'MarketSettingsType': {'type': 'basestring'},
+                              u'MarketSettingsTypeId': {'type': 'int'},
+                              u'MarketSpreads': {'collection': True,
+                                                 'type': u'ApiMarketSpreadDTO'},
+                              u'MarketTimeZoneOffsetMinutes': {'type': 'int'},
+                              u'MarketUnderlyingType': {'type': 'basestring'},
+                              u'MarketUnderlyingTypeId': {'type': 'int'},
+                              u'MaxMarginFactor': {'type': 'int'},
+                              u'MaxSize': {'type': 'int'},
+                              u'MinDistance': {'type': 'int'},
+                              u'MinDistanceUnits': {'type': 'int'},
+                              u'MinMarginFactor': {'type': 'int'},
+                              u'MobileShortName': {'type': 'basestring'},
+                              u'Name': {'type': 'basestring'},
+                              u'NextMarketEodTimeUtc': {'date': True,
+                                                        'type': 'basestring'},
+                              u'OrdersAwareMargining': {'type': 'bool'},
+                              u'OrdersAwareMarginingMinimum': {'type': 'int'},
+                              u'PhoneMinSize': {'type': 'int'},
+                              u'PriceDecimalPlaces': {'type': 'int'},
+                              u'PriceTolerance': {'type': 'int'},
+                              u'PriceToleranceUnits': {'type': 'int'},
+                              u'TradeOnWeb': {'type': 'bool'},
+                              u'TradingEndTimeUtc': {'date': True,
+                                                     'type': 'basestring'},
+                              u'TradingStartTimeUtc': {'date': True,
+                                                       'type': 'basestring'},
+                              u'WebMinSize': {'type': 'int'}},
+ u'ApiMarketInformationSaveDTO': {u'MarginFactor': {'type': 'int'},
+                                  u'MarginFactorIsDirty': {'type': 'bool'},
+                                  u'MarketId': {'type': 'int'},
+                                  u'PriceTolerance': {'type': 'int'},
+                                  u'PriceToleranceIsDirty': {'type': 'bool'}},
+ u'ApiMarketSpreadDTO': {u'Spread': {'type': 'int'},
+                         u'SpreadTimeUtc': {'date': True,
+                                            'type': 'basestring'},
+                         u'SpreadUnits': {'type': 'int'}},
+ u'ApiMarketTagDTO': {u'MarketTagId': {'type': 'int'},
+                      u'Name': {'type': 'basestring'},
+                      u'Type': {'type': 'int'}},
+ u'ApiOpenPositionDTO': {u'Currency': {'type': 'basestring'},
+                         u'Direction': {'type': 'basestring'},
+                         u'LastChangedDateTimeUTC': {'date': True,
+                                                     'type': 'basestring'},
+                         u'LimitOrder': {'type': u'ApiBasicStopLimitOrderDTO'},
+                         u'MarketId': {'type': 'int'},
+                         u'MarketName': {'type': 'basestring'},
+                         u'OrderId': {'type': 'int'},
+                         u'Price': {'type': 'int'},
+                         u'Quantity': {'type': 'int'},
+                         u'Status': {'type': 'int'},
+                         u'StopOrder': {'type': u'ApiBasicStopLimitOrderDTO'},
+                         u'TradingAccountId': {'type': 'int'}},
+ u'ApiOrderActionResponseDTO': {u'ActionedOrderId': {'type': 'int'},
+                                u'ActioningOrderId': {'type': 'int'},
+                                u'OrderActionTypeId': {'type': 'int'},
+                                u'ProfitAndLoss': {'type': 'int'},
+                                u'ProfitAndLossCurrency': {'type': 'basestring'},
+                                u'Quantity': {'type': 'int'}},
+ u'ApiOrderDTO': {u'CurrencyId': {'type': 'int'},
+                  u'Direction': {'type': 'basestring'},
+                  u'IfDone': {'collection': True, 'type': u'ApiIfDoneDTO'},
+                  u'MarketId': {'type': 'int'},
+                  u'OcoOrder': {'type': u'ApiStopLimitOrderDTO'},
+                  u'OrderId': {'type': 'int'},
+                  u'Price': {'type': 'int'},
+                  u'Quantity': {'type': 'int'},
+                  u'StatusId': {'type': 'int'},
+                  u'TradingAccountId': {'type': 'int'},
+                  u'TypeId': {'type': 'int'}},
+ u'ApiOrderResponseDTO': {u'CommissionCharge': {'type': 'int'},
+                          u'GuaranteedPremium': {'type': 'int'},
+                          u'IfDone': {'collection': True,
+                                      'type': u'ApiIfDoneResponseDTO'},
+                          u'OCO': {'type': u'ApiOrderResponseDTO'},
+                          u'OrderId': {'type': 'int'},
+                          u'OrderTypeId': {'type': 'int'},
+                          u'Price': {'type': 'int'},
+                          u'Quantity': {'type': 'int'},
+                          u'Status': {'type': 'int'},
+                          u'StatusReason': {'type': 'int'},
+                          u'TriggerPrice': {'type': 'int'}},
+ u'ApiPrimaryMarketTagDTO': {u'Children': {'collection': True,
+                                           'type': u'ApiMarketTagDTO'},
+                             u'MarketTagId': {'type': 'int'},
+                             u'Name': {'type': 'basestring'},
+                             u'Type': {'type': 'int'}},
+ u'ApiQuoteResponseDTO': {u'QuoteId': {'type': 'int'},
+                          u'Status': {'type': 'int'},
+                          u'StatusReason': {'type': 'int'}},
+ u'ApiSaveAccountInformationRequestDTO': {u'PersonalEmailAddress': {'type': 'basestring'},
+                                          u'PersonalEmailAddressIsDirty': {'type': 'bool'}},
+ u'ApiSaveAccountInformationResponseDTO': {},
+ u'ApiSaveMarketInformationResponseDTO': {},
+ u'ApiSaveWatchlistRequestDTO': {u'Watchlist': {'type': u'ApiClientAccountWatchlistDTO'}},
+ u'ApiSaveWatchlistResponseDTO': {},
+ u'ApiSimulateOrderResponseDTO': {u'Status': {'type': 'int'},
+                                  u'StatusReason': {'type': 'int'}},
+ u'ApiStopLimitOrderDTO': {u'Applicability': {'type': 'basestring'},
+                           u'CurrencyId': {'type': 'int'},
+                           u'Direction': {'type': 'basestring'},
+                           u'ExpiryDateTimeUTC': {'date': True,
+                                                  'type': 'basestring'},
+                           u'Guaranteed': {'type': 'bool'},
+                           u'IfDone': {'collection': True,
+                                       'type': u'ApiIfDoneDTO'},
+                           u'MarketId': {'type': 'int'},
+                           u'OcoOrder': {'type': u'ApiStopLimitOrderDTO'},
+                           u'OrderId': {'type': 'int'},
+                           u'Price': {'type': 'int'},
+                           u'Quantity': {'type': 'int'},
+                           u'StatusId': {'type': 'int'},
+                           u'TradingAccountId': {'type': 'int'},
+                           u'TriggerPrice': {'type': 'int'},
+                           u'TypeId': {'type': 'int'}},
+ u'ApiStopLimitOrderHistoryDTO': {u'CreatedDateTimeUtc': {'date': True,
+                                                          'type': 'basestring'},
+                                  u'Currency': {'type': 'basestring'},
+                                  u'Direction': {'type': 'basestring'},
+                                  u'LastChangedDateTimeUtc': {'date': True,
+                                                              'type': 'basestring'},
+                                  u'MarketId': {'type': 'int'},
+                                  u'MarketName': {'type': 'basestring'},
+                                  u'OrderApplicabilityId': {'type': 'int'},
+                                  u'OrderId': {'type': 'int'},
+                                  u'OriginalQuantity': {'type': 'int'},
+                                  u'Price': {'type': 'int'},
+                                  u'StatusId': {'type': 'int'},
+                                  u'TradingAccountId': {'type': 'int'},
+                                  u'TriggerPrice': {'type': 'int'},
+                                  u'TypeId': {'type': 'int'}},
+ u'ApiStopLimitResponseDTO': {u'CommissionCharge': {'type': 'int'},
+                              u'GuaranteedPremium': {'type': 'int'},
+                              u'IfDone': {'collection': True,
+                                          'type': u'ApiIfDoneResponseDTO'},
+                              u'OCO': {'type': u'ApiOrderResponseDTO'},
+                              u'OrderId': {'type': 'int'},
+                              u'OrderTypeId': {'type': 'int'},
+                              u'Price': {'type': 'int'},
+                              u'Quantity': {'type': 'int'},
+                              u'Status': {'type': 'int'},
+                              u'StatusReason': {'type': 'int'},
+                              u'TriggerPrice': {'type': 'int'}},
+ u'ApiTradeHistoryDTO': {u'Currency': {'type': 'basestring'},
+                         u'Direction': {'type': 'basestring'},
+                         u'ExecutedDateTimeUtc': {'date': True,
+                                                  'type': 'basestring'},
+                         u'LastChangedDateTimeUtc': {'date': True,
+                                                     'type': 'basestring'},
+                         u'MarketId': {'type': 'int'},
+                         u'MarketName': {'type': 'basestring'},
+                         u'OpeningOrderIds': {'collection': True,
+                                              'type': 'int'},
+                         u'OrderId': {'type': 'int'},
+                         u'OriginalQuantity': {'type': 'int'},
+                         u'Price': {'type': 'int'},
+                         u'Quantity': {'type': 'int'},
+                         u'RealisedPnl': {'type': 'int'},
+                         u'RealisedPnlCurrency': {'type': 'basestring'},
+                         u'TradingAccountId': {'type': 'int'}},
+ u'ApiTradeOrderDTO': {u'CurrencyId': {'type': 'int'},
+                       u'Direction': {'type': 'basestring'},
+                       u'IfDone': {'collection': True,
+                                   'type': u'ApiIfDoneDTO'},
+                       u'MarketId': {'type': 'int'},
+                       u'OcoOrder': {'type': u'ApiStopLimitOrderDTO'},
+                       u'OrderId': {'type': 'int'},
+                       u'Price': {'type': 'int'},
+                       u'Quantity': {'type': 'int'},
+                       u'StatusId': {'type': 'int'},
+                       u'TradingAccountId': {'type': 'int'},
+                       u'TypeId': {'type': 'int'}},
+ u'ApiTradeOrderResponseDTO': {u'Actions': {'collection': True,
+                                            'type': u'ApiOrderActionResponseDTO'},
+                               u'OrderId': {'type': 'int'},
+                               u'Orders': {'collection': True,
+                                           'type': u'ApiOrderResponseDTO'},
+                               u'Quote': {'type': u'ApiQuoteResponseDTO'},
+                               u'Status': {'type': 'int'},
+                               u'StatusReason': {'type': 'int'}},
+ u'ApiTradingAccountDTO': {u'TradingAccountCode': {'type': 'basestring'},
+                           u'TradingAccountId': {'type': 'int'},
+                           u'TradingAccountStatus': {'type': 'basestring'},
+                           u'TradingAccountType': {'type': 'basestring'}},
+ u'ApiTradingDayTimesDTO': {u'DayOfWeek': {'type': 'int'},
+                            u'EndTimeUtc': {'type': u'ApiDateTimeOffsetDTO'},
+                            u'StartTimeUtc': {'type': u'ApiDateTimeOffsetDTO'}},
+ u'CancelOrderRequestDTO': {u'OrderId': {'type': 'int'},
+                            u'TradingAccountId': {'type': 'int'}},
+ u'ClientAccountMarginDTO': {u'Cash': {'type': 'int'},
+                             u'CurrencyISO': {'type': 'basestring'},
+                             u'CurrencyId': {'type': 'int'},
+                             u'Margin': {'type': 'int'},
+                             u'MarginIndicator': {'type': 'int'},
+                             u'NetEquity': {'type': 'int'},
+                             u'OpenTradeEquity': {'type': 'int'},
+                             u'PendingFunds': {'type': 'int'},
+                             u'TotalMarginRequirement': {'type': 'int'},
+                             u'TradeableFunds': {'type': 'int'},
+                             u'TradingResource': {'type': 'int'}},
+ u'ClientPreferenceKeyDTO': {u'Key': {'type': 'basestring'},
+                             u'Value': {'type': 'basestring'}},
+ u'ClientPreferenceRequestDTO': {u'Key': {'type': 'basestring'}},
+ u'DeleteSessionRequestDTO': {u'UserName': {'type': 'basestring'},
+                              u'session': {'type': 'basestring'}},
+ u'DeleteWatchlistItemRequestDTO': {u'MarketId': {'type': 'int'},
+                                    u'ParentWatchlistDisplayOrderId': {'type': 'int'}},
+ u'GetActiveStopLimitOrderRequestDTO': {u'OrderId': {'type': 'basestring'}},
+ u'GetActiveStopLimitOrderResponseDTO': {u'ActiveStopLimitOrder': {'type': u'ApiActiveStopLimitOrderDTO'}},
+ u'GetClientAndTradingAccountRequestDTO': {},
+ u'GetClientApplicationMessageTranslationRequestDTO': {u'AccountOperatorId': {'type': 'int'},
+                                                       u'ClientApplicationId': {'type': 'int'},
+                                                       u'CultureId': {'type': 'int'}},
+ u'GetClientPreferenceResponseDTO': {u'ClientPreference': {'type': u'ClientPreferenceKeyDTO'}},
+ u'GetKeyListClientPreferenceResponseDTO': {u'ClientPreferenceKeys': {'collection': True,
+                                                                      'type': 'basestring'}},
+ u'GetKeyListRequestDTO': {},
+ u'GetListClientPreferenceResponseDTO': {u'ClientPreferences': {'collection': True,
+                                                                'type': u'ClientPreferenceKeyDTO'}},
+ u'GetMarketInformationRequestDTO': {u'MarketId': {'type': 'basestring'}},
+ u'GetMarketInformationResponseDTO': {u'MarketInformation': {'type': u'ApiMarketInformationDTO'}},
+ u'GetMessagePopupResponseDTO': {u'AskForClientApproval': {'type': 'bool'},
+                                 u'Message': {'type': 'basestring'}},
+ u'GetNewsDetailRequestDTO': {u'source': {'type': 'basestring'},
+                              u'storyId': {'type': 'basestring'}},
+ u'GetNewsDetailResponseDTO': {u'NewsDetail': {'type': u'NewsDetailDTO'}},
+ u'GetOpenPositionRequestDTO': {u'OrderId': {'type': 'basestring'}},
+ u'GetOpenPositionResponseDTO': {u'OpenPosition': {'type': u'ApiOpenPositionDTO'}},
+ u'GetOrderRequestDTO': {u'OrderId': {'type': 'basestring'}},
+ u'GetOrderResponseDTO': {u'StopLimitOrder': {'type': u'ApiStopLimitOrderDTO'},
+                          u'TradeOrder': {'type': u'ApiTradeOrderDTO'}},
+ u'GetPriceBarResponseDTO': {u'PartialPriceBar': {'type': u'PriceBarDTO'},
+                             u'PriceBars': {'collection': True,
+                                            'type': u'PriceBarDTO'}},
+ u'GetPriceBarsRequestDTO': {u'MarketId': {'type': 'basestring'},
+                             u'PriceBars': {'type': 'basestring'},
+                             u'interval': {'type': 'basestring'},
+                             u'span': {'type': 'int'}},
+ u'GetPriceTickResponseDTO': {u'PriceTicks': {'collection': True,
+                                              'type': u'PriceTickDTO'}},
+ u'GetPriceTicksRequestDTO': {u'MarketId': {'type': 'basestring'},
+                              u'PriceTicks': {'type': 'basestring'}},
+ u'GetSystemLookupRequestDTO': {u'CultureId': {'type': 'int'},
+                                u'LookupEntityName': {'type': 'basestring'}},
+ u'GetVersionInformationRequestDTO': {u'AccountOperatorId': {'type': 'int'},
+                                      u'AppKey': {'type': 'basestring'}},
+ u'GetVersionInformationResponseDTO': {u'LatestVersion': {'type': 'basestring'},
+                                       u'MinimumRequiredVersion': {'type': 'basestring'},
+                                       u'UpgradeUrl': {'type': 'basestring'}},
+ u'GetWatchlistsRequestDTO': {},
+ u'InsertWatchlistItemRequestDTO': {u'MarketId': {'type': 'int'},
+                                    u'ParentWatchlistDisplayOrderId': {'type': 'int'}},
+ u'ListActiveStopLimitOrderResponseDTO': {u'ActiveStopLimitOrders': {'collection': True,
+                                                                     'type': u'ApiActiveStopLimitOrderDTO'}},
+ u'ListActiveStopLimitOrdersRequestDTO': {u'TradingAccountId': {'type': 'int'}},
+ u'ListCfdMarketsRequestDTO': {u'ClientAccountId': {'type': 'int'},
+                               u'maxResults': {'type': 'int'},
+                               u'searchByMarketCode': {'type': 'basestring'},
+                               u'searchByMarketName': {'type': 'basestring'},
+                               u'useMobileShortName': {'type': 'bool'}},
+ u'ListCfdMarketsResponseDTO': {u'Markets': {'collection': True,
+                                             'type': u'ApiMarketDTO'}},
+ u'ListMarketInformationRequestDTO': {u'MarketIds': {'collection': True,
+                                                     'type': 'int'}},
+ u'ListMarketInformationResponseDTO': {u'MarketInformation': {'collection': True,
+                                                              'type': u'ApiMarketInformationDTO'}},
+ u'ListMarketInformationSearchRequestDTO': {u'binaryProductType': {'type': 'bool'},
+                                            u'cfdProductType': {'type': 'bool'},
+                                            u'maxResults': {'type': 'int'},
+                                            u'query': {'type': 'basestring'},
+                                            u'searchByMarketCode': {'type': 'bool'},
+                                            u'searchByMarketName': {'type': 'bool'},
+                                            u'spreadProductType': {'type': 'bool'},
+                                            u'useMobileShortName': {'type': 'bool'}},
+ u'ListMarketInformationSearchResponseDTO': {u'MarketInformation': {'collection': True,
+                                                                    'type': u'ApiMarketInformationDTO'}},
+ u'ListMarketSearchRequestDTO': {u'binaryProductType': {'type': 'bool'},
+                                 u'cfdProductType': {'type': 'bool'},
+                                 u'maxResults': {'type': 'int'},
+                                 u'query': {'type': 'basestring'},
+                                 u'searchByMarketCode': {'type': 'bool'},
+                                 u'searchByMarketName': {'type': 'bool'},
+                                 u'spreadProductType': {'type': 'bool'},
+                                 u'useMobileShortName': {'type': 'bool'}},
+ u'ListMarketSearchResponseDTO': {u'Markets': {'collection': True,
+                                               'type': u'ApiMarketDTO'}},
+ u'ListNewsHeadlinesRequestDTO': {u'Category': {'type': 'basestring'},
+                                  u'CultureId': {'type': 'int'},
+                                  u'MaxResults': {'type': 'int'},
+                                  u'Source': {'type': 'basestring'}},
+ u'ListNewsHeadlinesResponseDTO': {u'Headlines': {'collection': True,
+                                                  'type': u'NewsDTO'}},
+ u'ListNewsHeadlinesWithSourceRequestDTO': {u'category': {'type': 'basestring'},
+                                            u'maxResults': {'type': 'int'},
+                                            u'source': {'type': 'basestring'}},
+ u'ListOpenPositionsRequestDTO': {u'TradingAccountId': {'type': 'int'}},
+ u'ListOpenPositionsResponseDTO': {u'OpenPositions': {'collection': True,
+                                                      'type': u'ApiOpenPositionDTO'}},
+ u'ListSpreadMarketsRequestDTO': {u'ClientAccountId': {'type': 'int'},
+                                  u'maxResults': {'type': 'int'},
+                                  u'searchByMarketCode': {'type': 'basestring'},
+                                  u'searchByMarketName': {'type': 'basestring'},
+                                  u'useMobileShortName': {'type': 'bool'}},
+ u'ListSpreadMarketsResponseDTO': {u'Markets': {'collection': True,
+                                                'type': u'ApiMarketDTO'}},
+ u'ListStopLimitOrderHistoryRequestDTO': {u'TradingAccountId': {'type': 'int'},
+                                          u'maxResults': {'type': 'int'}},
+ u'ListStopLimitOrderHistoryResponseDTO': {u'StopLimitOrderHistory': {'collection': True,
+                                                                      'type': u'ApiStopLimitOrderHistoryDTO'}},
+ u'ListTradeHistoryRequestDTO': {u'TradingAccountId': {'type': 'int'},
+                                 u'maxResults': {'type': 'int'}},
+ u'ListTradeHistoryResponseDTO': {u'SupplementalOpenOrders': {'collection': True,
+                                                              'type': u'ApiTradeHistoryDTO'},
+                                  u'TradeHistory': {'collection': True,
+                                                    'type': u'ApiTradeHistoryDTO'}},
+ u'ListWatchlistResponseDTO': {u'ClientAccountId': {'type': 'int'},
+                               u'ClientAccountWatchlists': {'collection': True,
+                                                            'type': u'ApiClientAccountWatchlistDTO'}},
+ u'MarketInformationSearchWithTagsResponseDTO': {u'Markets': {'collection': True,
+                                                              'type': u'ApiMarketDTO'},
+                                                 u'Tags': {'collection': True,
+                                                           'type': u'ApiMarketTagDTO'}},
+ u'MarketInformationTagLookupResponseDTO': {u'Tags': {'collection': True,
+                                                      'type': u'ApiPrimaryMarketTagDTO'}},
+ u'NewStopLimitOrderRequestDTO': {u'Applicability': {'type': 'basestring'},
+                                  u'AuditId': {'type': 'basestring'},
+                                  u'AutoRollover': {'type': 'bool'},
+                                  u'BidPrice': {'type': 'int'},
+                                  u'Currency': {'type': 'basestring'},
+                                  u'Direction': {'type': 'basestring'},
+                                  u'ExpiryDateTimeUTC': {'date': True,
+                                                         'type': 'basestring'},
+                                  u'Guaranteed': {'type': 'bool'},
+                                  u'IfDone': {'collection': True,
+                                              'type': u'ApiIfDoneDTO'},
+                                  u'MarketId': {'type': 'int'},
+                                  u'OcoOrder': {'type': u'NewStopLimitOrderRequestDTO'},
+                                  u'OfferPrice': {'type': 'int'},
+                                  u'OrderId': {'type': 'int'},
+                                  u'Quantity': {'type': 'int'},
+                                  u'TradingAccountId': {'type': 'int'},
+                                  u'TriggerPrice': {'type': 'int'}},
+ u'NewTradeOrderRequestDTO': {u'AuditId': {'type': 'basestring'},
+                              u'AutoRollover': {'type': 'bool'},
+                              u'BidPrice': {'type': 'int'},
+                              u'Close': {'collection': True, 'type': 'int'},
+                              u'Currency': {'type': 'basestring'},
+                              u'Direction': {'type': 'basestring'},
+                              u'IfDone': {'collection': True,
+                                          'type': u'ApiIfDoneDTO'},
+                              u'MarketId': {'type': 'int'},
+                              u'OfferPrice': {'type': 'int'},
+                              u'Quantity': {'type': 'int'},
+                              u'QuoteId': {'type': 'int'},
+                              u'TradingAccountId': {'type': 'int'}},
+ u'NewsDTO': {u'Headline': {'type': 'basestring'},
+              u'PublishDate': {'date': True, 'type': 'basestring'},
+              u'StoryId': {'type': 'int'}},
+ u'NewsDetailDTO': {u'Headline': {'type': 'basestring'},
+                    u'PublishDate': {'date': True, 'type': 'basestring'},
+                    u'Story': {'type': 'basestring'},
+                    u'StoryId': {'type': 'int'}},
+ u'OrderDTO': {u'AutoRollover': {'type': 'bool'},
+               u'ClientAccountId': {'type': 'int'},
+               u'CurrencyISO': {'type': 'basestring'},
+               u'CurrencyId': {'type': 'int'},
+               u'Direction': {'type': 'int'},
+               u'LastChangedTime': {'date': True, 'type': 'basestring'},
+               u'MarketId': {'type': 'int'},
+               u'OpenPrice': {'type': 'int'},
+               u'OrderId': {'type': 'int'},
+               u'OriginalLastChangedDateTime': {'date': True,
+                                                'type': 'basestring'},
+               u'OriginalQuantity': {'type': 'int'},
+               u'PositionMethodId': {'type': 'int'},
+               u'Quantity': {'type': 'int'},
+               u'ReasonId': {'type': 'int'},
+               u'Status': {'type': 'basestring'},
+               u'TradingAccountId': {'type': 'int'},
+               u'Type': {'type': 'basestring'}},
+ u'PriceBarDTO': {u'BarDate': {'date': True, 'type': 'basestring'},
+                  u'Close': {'type': 'int'},
+                  u'High': {'type': 'int'},
+                  u'Low': {'type': 'int'},
+                  u'Open': {'type': 'int'}},
+ u'PriceDTO': {u'AuditId': {'type': 'basestring'},
+               u'Bid': {'type': 'int'},
+               u'Change': {'type': 'int'},
+               u'Direction': {'type': 'int'},
+               u'High': {'type': 'int'},
+               u'Low': {'type': 'int'},
+               u'MarketId': {'type': 'int'},
+               u'Offer': {'type': 'int'},
+               u'Price': {'type': 'int'},
+               u'StatusSummary': {'type': 'int'},
+               u'TickDate': {'date': True, 'type': 'basestring'}},
+ u'PriceTickDTO': {u'Price': {'type': 'int'},
+                   u'TickDate': {'date': True, 'type': 'basestring'}},
+ u'QuoteDTO': {u'ApprovalDateTimeUTC': {'date': True, 'type': 'basestring'},
+               u'BidAdjust': {'type': 'int'},
+               u'BidPrice': {'type': 'int'},
+               u'BreathTimeSecs': {'type': 'int'},
+               u'CurrencyId': {'type': 'int'},
+               u'IsOversize': {'type': 'bool'},
+               u'MarketId': {'type': 'int'},
+               u'OfferAdjust': {'type': 'int'},
+               u'OfferPrice': {'type': 'int'},
+               u'OrderId': {'type': 'int'},
+               u'Quantity': {'type': 'int'},
+               u'QuoteId': {'type': 'int'},
+               u'ReasonId': {'type': 'int'},
+               u'RequestDateTimeUTC': {'date': True, 'type': 'basestring'},
+               u'StatusId': {'type': 'int'},
+               u'TradingAccountId': {'type': 'int'},
+               u'TypeId': {'type': 'int'}},
+ u'SaveClientPreferenceRequestDTO': {u'ClientPreference': {'type': u'ClientPreferenceKeyDTO'}},
+ u'SaveMarketInformationRequestDTO': {u'MarketInformation': {'collection': True,
+                                                             'type': u'ApiMarketInformationSaveDTO'},
+                                      u'TradingAccountId': {'type': 'int'}},
+ u'SearchWithTagsRequestDTO': {u'maxResults': {'type': 'int'},
+                               u'query': {'type': 'basestring'},
+                               u'tagId': {'type': 'int'},
+                               u'useMobileShortName': {'type': 'bool'}},
+ u'SystemStatusDTO': {u'StatusMessage': {'type': 'basestring'}},
+ u'SystemStatusRequestDTO': {u'TestDepth': {'type': 'basestring'}},
+ u'TagLookupRequestDTO': {},
+ u'TradeMarginDTO': {u'ClientAccountId': {'type': 'int'},
+                     u'DirectionId': {'type': 'int'},
+                     u'MarginRequirementConverted': {'type': 'int'},
+                     u'MarginRequirementConvertedCurrencyISOCode': {'type': 'basestring'},
+                     u'MarginRequirementConvertedCurrencyId': {'type': 'int'},
+                     u'MarketId': {'type': 'int'},
+                     u'MarketTypeId': {'type': 'int'},
+                     u'Multiplier': {'type': 'int'},
+                     u'OTEConverted': {'type': 'int'},
+                     u'OTEConvertedCurrencyISOCode': {'type': 'basestring'},
+                     u'OTEConvertedCurrencyId': {'type': 'int'},
+                     u'OrderId': {'type': 'int'},
+                     u'PriceCalculatedAt': {'type': 'int'},
+                     u'PriceTakenAt': {'type': 'int'},
+                     u'Quantity': {'type': 'int'}},
+ u'UpdateDeleteClientPreferenceResponseDTO': {u'Successful': {'type': 'bool'}},
+ u'UpdateStopLimitOrderRequestDTO': {u'Applicability': {'type': 'basestring'},
+                                     u'AuditId': {'type': 'basestring'},
+                                     u'AutoRollover': {'type': 'bool'},
+                                     u'BidPrice': {'type': 'int'},
+                                     u'Currency': {'type': 'basestring'},
+                                     u'Direction': {'type': 'basestring'},
+                                     u'ExpiryDateTimeUTC': {'date': True,
+                                                            'type': 'basestring'},
+                                     u'Guaranteed': {'type': 'bool'},
+                                     u'IfDone': {'collection': True,
+                                                 'type': u'ApiIfDoneDTO'},
+                                     u'MarketId': {'type': 'int'},
+                                     u'OcoOrder': {'type': u'NewStopLimitOrderRequestDTO'},
+                                     u'OfferPrice': {'type': 'int'},
+                                     u'OrderId': {'type': 'int'},
+                                     u'Quantity': {'type': 'int'},
+                                     u'TradingAccountId': {'type': 'int'},
+                                     u'TriggerPrice': {'type': 'int'}},
+ u'UpdateTradeOrderRequestDTO': {u'AuditId': {'type': 'basestring'},
+                                 u'AutoRollover': {'type': 'bool'},
+                                 u'BidPrice': {'type': 'int'},
+                                 u'Close': {'collection': True,
+                                            'type': 'int'},
+                                 u'Currency': {'type': 'basestring'},
+                                 u'Direction': {'type': 'basestring'},
+                                 u'IfDone': {'collection': True,
+                                             'type': u'ApiIfDoneDTO'},
+                                 u'MarketId': {'type': 'int'},
+                                 u'OfferPrice': {'type': 'int'},
+                                 u'OrderId': {'type': 'int'},
+                                 u'Quantity': {'type': 'int'},
+                                 u'QuoteId': {'type': 'int'},
+                                 u'TradingAccountId': {'type': 'int'}},
+ u'UpdateWatchlistDisplayOrderRequestDTO': {u'NewDisplayOrderIdSequence': {'collection': True,
+                                                                           'type': 'int'}}}
+
+RPCS = {u'CancelOrder': {'cache_duration': 0,
+                  'post': True,
+                  'request': u'CancelOrderRequestDTO',
+                  'response': u'ApiTradeOrderResponseDTO',
+                  'throttle_scope': None,
+                  'url': u'order/cancel'},
+ u'ChangePassword': {'cache_duration': 0,
+                     'post': True,
+                     'request': u'ApiChangePasswordRequestDTO',
+                     'response': u'ApiChangePasswordResponseDTO',
+                     'throttle_scope': u'data',
+                     'url': u'session/changePassword'},
+ u'Delete': {'cache_duration': 0,
+             'post': True,
+             'request': u'ClientPreferenceRequestDTO',
+             'response': u'UpdateDeleteClientPreferenceResponseDTO',
+             'throttle_scope': u'data',
+             'url': u'clientpreference/delete'},
+ u'DeleteSession': {'cache_duration': 0,
+                    'post': True,
+                    'request': u'DeleteSessionRequestDTO',
+                    'response': u'ApiLogOffResponseDTO',
+                    'throttle_scope': u'data',
+                    'url': u'session/deleteSession?UserName={UserName}&session={session}'},
+ u'DeleteWatchlist': {'cache_duration': 0,
+                      'post': True,
+                      'request': u'ApiDeleteWatchlistRequestDTO',
+                      'response': u'ApiDeleteWatchlistResponseDTO',
+                      'throttle_scope': u'data',
+                      'url': u'watchlist/delete'},
+ u'Get': {'cache_duration': 0,
+          'post': True,
+          'request': u'ClientPreferenceRequestDTO',
+          'response': u'GetClientPreferenceResponseDTO',
+          'throttle_scope': u'data',
+          'url': u'clientpreference/get'},
+ u'GetActiveStopLimitOrder': {'cache_duration': 0,
+                              'post': False,
+                              'request': u'GetActiveStopLimitOrderRequestDTO',
+                              'response': u'GetActiveStopLimitOrderResponseDTO',
+                              'throttle_scope': None,
+                              'url': u'order/{OrderId}/activestoplimitorder'},
+ u'GetClientAndTradingAccount': {'cache_duration': 0,
+                                 'post': False,
+                                 'request': u'GetClientAndTradingAccountRequestDTO',
+                                 'response': u'AccountInformationResponseDTO',
+                                 'throttle_scope': u'data',
+                                 'url': u'useraccount/ClientAndTradingAccount'},
+ u'GetClientApplicationMessageTranslation': {'cache_duration': 3600000,
+                                             'post': False,
+                                             'request': u'GetClientApplicationMessageTranslationRequestDTO',
+                                             'response': u'ApiClientApplicationMessageTranslationResponseDTO',
+                                             'throttle_scope': None,
+                                             'url': u'message/translation?ClientApplicationId={ClientApplicationId}&CultureId={CultureId}&AccountOperatorId={AccountOperatorId}'},
+ u'GetClientApplicationMessageTranslationWithInterestingItems': {'cache_duration': 0,
+                                                                 'post': True,
+                                                                 'request': u'ApiClientApplicationMessageTranslationRequestDTO',
+                                                                 'response': u'ApiClientApplicationMessageTranslationResponseDTO',
+                                                                 'throttle_scope': None,
+                                                                 'url': u'message/translationWithInterestingItems'},
+ u'GetKeyList': {'cache_duration': 0,
+                 'post': False,
+                 'request': u'GetKeyListRequestDTO',
+                 'response': u'GetKeyListClientPreferenceResponseDTO',
+                 'throttle_scope': None,
+                 'url': u'clientpreference/getkeylist'},
+ u'GetMarketInformation': {'cache_duration': 1000,
+                           'post': False,
+                           'request': u'GetMarketInformationRequestDTO',
+                           'response': u'GetMarketInformationResponseDTO',
+                           'throttle_scope': u'data',
+                           'url': u'market/{MarketId}/information'},
+ u'GetNewsDetail': {'cache_duration': 10000,
+                    'post': False,
+                    'request': u'GetNewsDetailRequestDTO',
+                    'response': u'GetNewsDetailResponseDTO',
+                    'throttle_scope': u'data',
+                    'url': u'news/{source}/{storyId}'},
+ u'GetOpenPosition': {'cache_duration': 0,
+                      'post': False,
+                      'request': u'GetOpenPositionRequestDTO',
+                      'response': u'GetOpenPositionResponseDTO',
+                      'throttle_scope': None,
+                      'url': u'order/{OrderId}/openposition'},
+ u'GetOrder': {'cache_duration': 0,
+               'post': False,
+               'request': u'GetOrderRequestDTO',
+               'response': u'GetOrderResponseDTO',
+               'throttle_scope': None,
+               'url': u'order/{OrderId}'},
+ u'GetPriceBars': {'cache_duration': 0,
+                   'post': False,
+                   'request': u'GetPriceBarsRequestDTO',
+                   'response': u'GetPriceBarResponseDTO',
+                   'throttle_scope': u'data',
+                   'url': u'market/{MarketId}/barhistory?interval={interval}&span={span}&PriceBars={PriceBars}'},
+ u'GetPriceTicks': {'cache_duration': 0,
+                    'post': False,
+                    'request': u'GetPriceTicksRequestDTO',
+                    'response': u'GetPriceTickResponseDTO',
+                    'throttle_scope': u'data',
+                    'url': u'market/{MarketId}/tickhistory?PriceTicks={PriceTicks}'},
+ u'GetSystemLookup': {'cache_duration': 3600000,
+                      'post': False,
+                      'request': u'GetSystemLookupRequestDTO',
+                      'response': u'ApiLookupResponseDTO',
+                      'throttle_scope': None,
+                      'url': u'message/lookup?LookupEntityName={LookupEntityName}&CultureId={CultureId}'},
+ u'GetVersionInformation': {'cache_duration': 360000,
+                            'post': False,
+                            'request': u'GetVersionInformationRequestDTO',
+                            'response': u'GetVersionInformationResponseDTO',
+                            'throttle_scope': None,
+                            'url': u'clientapplication/versioninformation?AppKey={AppKey}&AccountOperatorId={AccountOperatorId}'},
+ u'GetWatchlists': {'cache_duration': 0,
+                    'post': False,
+                    'request': u'GetWatchlistsRequestDTO',
+                    'response': u'ListWatchlistResponseDTO',
+                    'throttle_scope': u'data',
+                    'url': u'watchlists/'},
+ u'ListActiveStopLimitOrders': {'cache_duration': 0,
+                                'post': False,
+                                'request': u'ListActiveStopLimitOrdersRequestDTO',
+                                'response': u'ListActiveStopLimitOrderResponseDTO',
+                                'throttle_scope': None,
+                                'url': u'order/activestoplimitorders?TradingAccountId={TradingAccountId}'},
+ u'ListCfdMarkets': {'cache_duration': 0,
+                     'post': False,
+                     'request': u'ListCfdMarketsRequestDTO',
+                     'response': u'ListCfdMarketsResponseDTO',
+                     'throttle_scope': u'data',
+                     'url': u'cfd/markets?MarketName={searchByMarketName}&MarketCode={searchByMarketCode}&ClientAccountId={ClientAccountId}&MaxResults={maxResults}&UseMobileShortName={useMobileShortName}'},
+ u'ListMarketInformation': {'cache_duration': 1000,
+                            'post': True,
+                            'request': u'ListMarketInformationRequestDTO',
+                            'response': u'ListMarketInformationResponseDTO',
+                            'throttle_scope': u'data',
+                            'url': u'market/information'},
+ u'ListMarketInformationSearch': {'cache_duration': 0,
+                                  'post': False,
+                                  'request': u'ListMarketInformationSearchRequestDTO',
+                                  'response': u'ListMarketInformationSearchResponseDTO',
+                                  'throttle_scope': u'data',
+                                  'url': u'market/informationsearch?SearchByMarketCode={searchByMarketCode}&SearchByMarketName={searchByMarketName}&SpreadProductType={spreadProductType}&CfdProductType={cfdProductType}&BinaryProductType={binaryProductType}&Query={query}&MaxResults={maxResults}&UseMobileShortName={useMobileShortName}'},
+ u'ListMarketSearch': {'cache_duration': 0,
+                       'post': False,
+                       'request': u'ListMarketSearchRequestDTO',
+                       'response': u'ListMarketSearchResponseDTO',
+                       'throttle_scope': u'data',
+                       'url': u'market/search?SearchByMarketCode={searchByMarketCode}&SearchByMarketName={searchByMarketName}&SpreadProductType={spreadProductType}&CfdProductType={cfdProductType}&BinaryProductType={binaryProductType}&Query={query}&MaxResults={maxResults}&UseMobileShortName={useMobileShortName}'},
+ u'ListNewsHeadlines': {'cache_duration': 0,
+                        'post': False,
+                        'request': u'ListNewsHeadlinesRequestDTO',
+                        'response': u'ListNewsHeadlinesResponseDTO',
+                        'throttle_scope': u'data',
+                        'url': u'news/headlines'},
+ u'ListNewsHeadlinesWithSource': {'cache_duration': 10000,
+                                  'post': False,
+                                  'request': u'ListNewsHeadlinesWithSourceRequestDTO',
+                                  'response': u'ListNewsHeadlinesResponseDTO',
+                                  'throttle_scope': u'data',
+                                  'url': u'news/{source}/{category}?MaxResults={maxResults}'},
+ u'ListOpenPositions': {'cache_duration': 0,
+                        'post': False,
+                        'request': u'ListOpenPositionsRequestDTO',
+                        'response': u'ListOpenPositionsResponseDTO',
+                        'throttle_scope': None,
+                        'url': u'order/openpositions?TradingAccountId={TradingAccountId}'},
+ u'ListSpreadMarkets': {'cache_duration': 0,
+                        'post': False,
+                        'request': u'ListSpreadMarketsRequestDTO',
+                        'response': u'ListSpreadMarketsResponseDTO',
+                        'throttle_scope': u'data',
+                        'url': u'spread/markets?MarketName={searchByMarketName}&MarketCode={searchByMarketCode}&ClientAccountId={ClientAccountId}&MaxResults={maxResults}&UseMobileShortName={useMobileShortName}'},
+ u'ListStopLimitOrderHistory': {'cache_duration': 0,
+                                'post': False,
+                                'request': u'ListStopLimitOrderHistoryRequestDTO',
+                                'response': u'ListStopLimitOrderHistoryResponseDTO',
+                                'throttle_scope': None,
+                                'url': u'order/stoplimitorderhistory?TradingAccountId={TradingAccountId}&MaxResults={maxResults}'},
+ u'ListTradeHistory': {'cache_duration': 0,
+                       'post': False,
+                       'request': u'ListTradeHistoryRequestDTO',
+                       'response': u'ListTradeHistoryResponseDTO',
+                       'throttle_scope': None,
+                       'url': u'order/order/tradehistory?TradingAccountId={TradingAccountId}&MaxResults={maxResults}'},
+ u'LogOn': {'cache_duration': 0,
+            'post': True,
+            'request': u'ApiLogOnRequestDTO',
+            'response': u'ApiLogOnResponseDTO',
+            'throttle_scope': u'data',
+            'url': u'session/'},
+ u'Order': {'cache_duration': 0,
+            'post': True,
+            'request': u'NewStopLimitOrderRequestDTO',
+            'response': u'ApiTradeOrderResponseDTO',
+            'throttle_scope': u'trading',
+            'url': u'order/newstoplimitorder'},
+ u'Save': {'cache_duration': 0,
+           'post': True,
+           'request': u'SaveClientPreferenceRequestDTO',
+           'response': u'UpdateDeleteClientPreferenceResponseDTO',
+           'throttle_scope': u'data',
+           'url': u'clientpreference/save'},
+ u'SaveAccountInformation': {'cache_duration': 0,
+                             'post': True,
+                             'request': u'ApiSaveAccountInformationRequestDTO',
+                             'response': u'ApiSaveAccountInformationResponseDTO',
+                             'throttle_scope': u'data',
+                             'url': u'useraccount/Save'},
+ u'SaveMarketInformation': {'cache_duration': 0,
+                            'post': True,
+                            'request': u'SaveMarketInformationRequestDTO',
+                            'response': u'ApiSaveMarketInformationResponseDTO',
+                            'throttle_scope': u'data',
+                            'url': u'market/information/save'},
+ u'SaveWatchlist': {'cache_duration': 0,
+                    'post': True,
+                    'request': u'ApiSaveWatchlistRequestDTO',
+                    'response': u'ApiSaveWatchlistResponseDTO',
+                    'throttle_scope': u'data',
+                    'url': u'watchlist/Save'},
+ u'SearchWithTags': {'cache_duration': 0,
+                     'post': False,
+                     'request': u'SearchWithTagsRequestDTO',
+                     'response': u'MarketInformationSearchWithTagsResponseDTO',
+                     'throttle_scope': u'data',
+                     'url': u'market/searchwithtags?Query={query}&TagId={tagId}&MaxResults={maxResults}&UseMobileShortName={useMobileShortName}'},
+ u'TagLookup': {'cache_duration': 0,
+                'post': False,
+                'request': u'TagLookupRequestDTO',
+                'response': u'MarketInformationTagLookupResponseDTO',
+                'throttle_scope': u'data',
+                'url': u'market/taglookup'},
+ u'Trade': {'cache_duration': 0,
+            'post': True,
+            'request': u'NewTradeOrderRequestDTO',
+            'response': u'ApiTradeOrderResponseDTO',
+            'throttle_scope': u'trading',
+            'url': u'order/newtradeorder'},
+ u'UpdateOrder': {'cache_duration': 0,
+                  'post': True,
+                  'request': u'UpdateStopLimitOrderRequestDTO',
+                  'response': u'ApiTradeOrderResponseDTO',
+                  'throttle_scope': None,
+                  'url': u'order/updatestoplimitorder'},
+ u'UpdateTrade': {'cache_duration': 0,
+                  'post': True,
+                  'request': u'UpdateTradeOrderRequestDTO',
+                  'response': u'ApiTradeOrderResponseDTO',
+                  'throttle_scope': u'trading',
+                  'url': u'order/updatetradeorder'}}
+
+def _conv_ApiActiveStopLimitOrderDTO(o):
+    v = o.get(u'ExpiryDateTimeUTC')
+    if v is not None:
+        o[u'ExpiryDateTimeUTC'] = _date(v)
+    v = o.get(u'LastChangedDateTimeUTC')
+    if v is not None:
+        o[u'LastChangedDateTimeUTC'] = _date(v)
+    return o
+
+
+def _conv_ApiDateTimeOffsetDTO(o):
+    v = o.get(u'UtcDateTime')
+    if v is not None:
+        o[u'UtcDateTime'] = _date(v)
+    return o
+
+
+def _conv_ApiIfDoneDTO(o):
+    v = o.get(u'Limit')
+    if v is not None:
+        o[u'Limit'] = _conv_ApiStopLimitOrderDTO(v)
+    v = o.get(u'Stop')
+    if v is not None:
+        o[u'Stop'] = _conv_ApiStopLimitOrderDTO(v)
+    return o
+
+
+def _conv_ApiMarketInformationDTO(o):
+    v = o.get(u'DailyFinancingAppliedAtUtc')
+    if v is not None:
+        o[u'DailyFinancingAppliedAtUtc'] = _date(v)
+    v = o.get(u'ExpiryUtc')
+    if v is not None:
+        o[u'ExpiryUtc'] = _date(v)
+    v = o.get(u'FutureRolloverUTC')
+    if v is not None:
+        o[u'FutureRolloverUTC'] = _date(v)
+    v = o.get(u'MarketBreakTimes')
+    if v:
+        o[u'MarketBreakTimes'] = [_conv_ApiTradingDayTimesDTO(x) for x in v]
+    v = o.get(u'MarketPricingTimes')
+    if v:
+        o[u'MarketPricingTimes'] = [_conv_ApiTradingDayTimesDTO(x) for x in v]
+    v = o.get(u'MarketSpreads')
+    if v:
+        o[u'MarketSpreads'] = [_conv_ApiMarketSpreadDTO(x) for x in v]
+    v = o.get(u'NextMarketEodTimeUtc')
+    if v is not None:
+        o[u'NextMarketEodTimeUtc'] = _date(v)
+    v = o.get(u'TradingEndTimeUtc')
+    if v is not None:
+        o[u'TradingEndTimeUtc'] = _date(v)
+    v = o.get(u'TradingStartTimeUtc')
+    if v is not None:
+        o[u'TradingStartTimeUtc'] = _date(v)
+    return o
+
+
+def _conv_ApiMarketSpreadDTO(o):
+    v = o.get(u'SpreadTimeUtc')
+    if v is not None:
+        o[u'SpreadTimeUtc'] = _date(v)
+    return o
+
+
+def _conv_ApiOpenPositionDTO(o):
+    v = o.get(u'LastChangedDateTimeUTC')
+    if v is not None:
+        o[u'LastChangedDateTimeUTC'] = _date(v)
+    return o
+
+
+def _conv_ApiOrderDTO(o):
+    v = o.get(u'IfDone')
+    if v:
+        o[u'IfDone'] = [_conv_ApiIfDoneDTO(x) for x in v]
+    v = o.get(u'OcoOrder')
+    if v is not None:
+        o[u'OcoOrder'] = _conv_ApiStopLimitOrderDTO(v)
+    return o
+
+
+def _conv_ApiStopLimitOrderDTO(o):
+    v = o.get(u'ExpiryDateTimeUTC')
+    if v is not None:
+        o[u'ExpiryDateTimeUTC'] = _date(v)
+    v = o.get(u'IfDone')
+    if v:
+        o[u'IfDone'] = [_conv_ApiIfDoneDTO(x) for x in v]
+    v = o.get(u'OcoOrder')
+    if v is not None:
+        o[u'OcoOrder'] = _conv_ApiStopLimitOrderDTO(v)
+    return o
+
+
+def _conv_ApiStopLimitOrderHistoryDTO(o):
+    v = o.get(u'CreatedDateTimeUtc')
+    if v is not None:
+        o[u'CreatedDateTimeUtc'] = _date(v)
+    v = o.get(u'LastChangedDateTimeUtc')
+    if v is not None:
+        o[u'LastChangedDateTimeUtc'] = _date(v)
+    return o
+
+
+def _conv_ApiTradeHistoryDTO(o):
+    v = o.get(u'ExecutedDateTimeUtc')
+    if v is not None:
+        o[u'ExecutedDateTimeUtc'] = _date(v)
+    v = o.get(u'LastChangedDateTimeUtc')
+    if v is not None:
+        o[u'LastChangedDateTimeUtc'] = _date(v)
+    return o
+
+
+def _conv_ApiTradeOrderDTO(o):
+    v = o.get(u'IfDone')
+    if v:
+        o[u'IfDone'] = [_conv_ApiIfDoneDTO(x) for x in v]
+    v = o.get(u'OcoOrder')
+    if v is not None:
+        o[u'OcoOrder'] = _conv_ApiStopLimitOrderDTO(v)
+    return o
+
+
+def _conv_ApiTradingDayTimesDTO(o):
+    v = o.get(u'EndTimeUtc')
+    if v is not None:
+        o[u'EndTimeUtc'] = _conv_ApiDateTimeOffsetDTO(v)
+    v = o.get(u'StartTimeUtc')
+    if v is not None:
+        o[u'StartTimeUtc'] = _conv_ApiDateTimeOffsetDTO(v)
+    return o
+
+
+def _conv_GetActiveStopLimitOrderResponseDTO(o):
+    v = o.get(u'ActiveStopLimitOrder')
+    if v is not None:
+        o[u'ActiveStopLimitOrder'] = _conv_ApiActiveStopLimitOrderDTO(v)
+    return o
+
+
+def _conv_GetMarketInformationResponseDTO(o):
+    v = o.get(u'MarketInformation')
+    if v is not None:
+        o[u'MarketInformation'] = _conv_ApiMarketInformationDTO(v)
+    return o
+
+
+def _conv_GetNewsDetailResponseDTO(o):
+    v = o.get(u'NewsDetail')
+    if v is not None:
+        o[u'NewsDetail'] = _conv_NewsDetailDTO(v)
+    return o
+
+
+def _conv_GetOpenPositionResponseDTO(o):
+    v = o.get(u'OpenPosition')
+    if v is not None:
+        o[u'OpenPosition'] = _conv_ApiOpenPositionDTO(v)
+    return o
+
+
+def _conv_GetOrderResponseDTO(o):
+    v = o.get(u'StopLimitOrder')
+    if v is not None:
+        o[u'StopLimitOrder'] = _conv_ApiStopLimitOrderDTO(v)
+    v = o.get(u'TradeOrder')
+    if v is not None:
+        o[u'TradeOrder'] = _conv_ApiTradeOrderDTO(v)
+    return o
+
+
+def _conv_GetPriceBarResponseDTO(o):
+    v = o.get(u'PartialPriceBar')
+    if v is not None:
+        o[u'PartialPriceBar'] = _conv_PriceBarDTO(v)
+    v = o.get(u'PriceBars')
+    if v:
+        o[u'PriceBars'] = [_conv_PriceBarDTO(x) for x in v]
+    return o
+
+
+def _conv_GetPriceTickResponseDTO(o):
+    v = o.get(u'PriceTicks')
+    if v:
+        o[u'PriceTicks'] = [_conv_PriceTickDTO(x) for x in v]
+    return o
+
+
+def _conv_ListActiveStopLimitOrderResponseDTO(o):
+    v = o.get(u'ActiveStopLimitOrders')
+    if v:
+        o[u'ActiveStopLimitOrders'] = [_conv_ApiActiveStopLimitOrderDTO(x) for x in v]
+    return o
+
+
+def _conv_ListMarketInformationResponseDTO(o):
+    v = o.get(u'MarketInformation')
+    if v:
+        o[u'MarketInformation'] = [_conv_ApiMarketInformationDTO(x) for x in v]
+    return o
+
+
+def _conv_ListMarketInformationSearchResponseDTO(o):
+    v = o.get(u'MarketInformation')
+    if v:
+        o[u'MarketInformation'] = [_conv_ApiMarketInformationDTO(x) for x in v]
+    return o
+
+
+def _conv_ListNewsHeadlinesResponseDTO(o):
+    v = o.get(u'Headlines')
+    if v:
+        o[u'Headlines'] = [_conv_NewsDTO(x) for x in v]
+    return o
+
+
+def _conv_ListOpenPositionsResponseDTO(o):
+    v = o.get(u'OpenPositions')
+    if v:
+        o[u'OpenPositions'] = [_conv_ApiOpenPositionDTO(x) for x in v]
+    return o
+
+
+def _conv_ListStopLimitOrderHistoryResponseDTO(o):
+    v = o.get(u'StopLimitOrderHistory')
+    if v:
+        o[u'StopLimitOrderHistory'] = [_conv_ApiStopLimitOrderHistoryDTO(x) for x in v]
+    return o
+
+
+def _conv_ListTradeHistoryResponseDTO(o):
+    v = o.get(u'SupplementalOpenOrders')
+    if v:
+        o[u'SupplementalOpenOrders'] = [_conv_ApiTradeHistoryDTO(x) for x in v]
+    v = o.get(u'TradeHistory')
+    if v:
+        o[u'TradeHistory'] = [_conv_ApiTradeHistoryDTO(x) for x in v]
+    return o
+
+
+def _conv_NewStopLimitOrderRequestDTO(o):
+    v = o.get(u'ExpiryDateTimeUTC')
+    if v is not None:
+        o[u'ExpiryDateTimeUTC'] = _date(v)
+    v = o.get(u'IfDone')
+    if v:
+        o[u'IfDone'] = [_conv_ApiIfDoneDTO(x) for x in v]
+    v = o.get(u'OcoOrder')
+    if v is not None:
+        o[u'OcoOrder'] = _conv_NewStopLimitOrderRequestDTO(v)
+    return o
+
+
+def _conv_NewTradeOrderRequestDTO(o):
+    v = o.get(u'IfDone')
+    if v:
+        o[u'IfDone'] = [_conv_ApiIfDoneDTO(x) for x in v]
+    return o
+
+
+def _conv_NewsDTO(o):
+    v = o.get(u'PublishDate')
+    if v is not None:
+        o[u'PublishDate'] = _date(v)
+    return o
+
+
+def _conv_NewsDetailDTO(o):
+    v = o.get(u'PublishDate')
+    if v is not None:
+        o[u'PublishDate'] = _date(v)
+    return o
+
+
+def _conv_OrderDTO(o):
+    v = o.get(u'LastChangedTime')
+    if v is not None:
+        o[u'LastChangedTime'] = _date(v)
+    v = o.get(u'OriginalLastChangedDateTime')
+    if v is not None:
+        o[u'OriginalLastChangedDateTime'] = _date(v)
+    return o
+
+
+def _conv_PriceBarDTO(o):
+    v = o.get(u'BarDate')
+    if v is not None:
+        o[u'BarDate'] = _date(v)
+    return o
+
+
+def _conv_PriceDTO(o):
+    v = o.get(u'TickDate')
+    if v is not None:
+        o[u'TickDate'] = _date(v)
+    return o
+
+
+def _conv_PriceTickDTO(o):
+    v = o.get(u'TickDate')
+    if v is not None:
+        o[u'TickDate'] = _date(v)
+    return o
+
+
+def _conv_QuoteDTO(o):
+    v = o.get(u'ApprovalDateTimeUTC')
+    if v is not None:
+        o[u'ApprovalDateTimeUTC'] = _date(v)
+    v = o.get(u'RequestDateTimeUTC')
+    if v is not None:
+        o[u'RequestDateTimeUTC'] = _date(v)
+    return o
+
+
+def _conv_UpdateStopLimitOrderRequestDTO(o):
+    v = o.get(u'ExpiryDateTimeUTC')
+    if v is not None:
+        o[u'ExpiryDateTimeUTC'] = _date(v)
+    v = o.get(u'IfDone')
+    if v:
+        o[u'IfDone'] = [_conv_ApiIfDoneDTO(x) for x in v]
+    v = o.get(u'OcoOrder')
+    if v is not None:
+        o[u'OcoOrder'] = _conv_NewStopLimitOrderRequestDTO(v)
+    return o
+
+
+def _conv_UpdateTradeOrderRequestDTO(o):
+    v = o.get(u'IfDone')
+    if v:
+        o[u'IfDone'] = [_conv_ApiIfDoneDTO(x) for x in v]
+    return o
+
+
+class Rpc(object):
+    """Binding for every service described by the SMD. Access via
+    CiApiClient.rpc."""
+    def __init__(self, client):
+        self._client = client
+
+    def cancel_order(self, cancelOrder):
+        """Cancel an order."""
+        path = 'order/cancel'
+        return self._client._post(path, cancelOrder,
+            rpc='CancelOrder', conv=_identity)
+
+    def change_password(self, apiChangePasswordRequest):
+        """Change a user's password."""
+        path = 'session/changePassword'
+        return self._client._post(path, apiChangePasswordRequest,
+            rpc='ChangePassword', conv=_identity)
+
+    def delete(self, clientPreferenceKey):
+        """Delete client preference key."""
+        path = 'clientpreference/delete'
+        return self._client._post(path, clientPreferenceKey,
+            rpc='Delete', conv=_identity)
+
+    def delete_session(self, UserName=None, session=None):
+        """Delete a session."""
+        path = 'session/deleteSession?UserName=%s&session=%s' % (
+            _q(UserName), _q(session))
+        return self._client._post(path, {},
+            rpc='DeleteSession', conv=_identity)
+
+    def delete_watchlist(self, deleteWatchlistRequestDto):
+        """Delete a watchlist."""
+        path = 'watchlist/delete'
+        return self._client._post(path, deleteWatchlistRequestDto,
+            rpc='DeleteWatchlist', conv=_identity)
+
+    def get(self, clientPreferenceRequestDto):
+        """Get client preferences."""
+        path = 'clientpreference/get'
+        return self._client._post(path, clientPreferenceRequestDto,
+            rpc='Get', conv=_identity)
+
+    def get_active_stop_limit_order(self, OrderId):
+        """Queries for an active stop limit order with a specified order ID."""
+        path = 'order/%s/activestoplimitorder' % _q(OrderId)
+        return self._client._get(path, rpc='GetActiveStopLimitOrder',
+            conv=_conv_GetActiveStopLimitOrderResponseDTO)
+
+    def get_client_and_trading_account(self):
+        """Returns the User's ClientAccountId and a list of their
+        TradingAccounts."""
+        path = 'useraccount/ClientAndTradingAccount'
+        return self._client._get(path, rpc='GetClientAndTradingAccount',
+            conv=_identity)
+
+    def get_client_application_message_translation(self,
+            ClientApplicationId=None, CultureId=None, AccountOperatorId=None):
+        """Use the message translation service to get client specific
+        translated text strings."""
+        path = 'message/translation?ClientApplicationId=%s&CultureId=%s&AccountOperatorId=%s' % (
+            _q(ClientApplicationId), _q(CultureId), _q(AccountOperatorId))
+        return self._client._get(path, rpc='GetClientApplicationMessageTranslation',
+            conv=_identity)
+
+    def get_client_application_message_translation_with_interesting_items(self,
+            apiClientApplicationMessageTranslationRequestDto):
+        """Use the message translation service to get client specific
+        translated textual strings for specific keys."""
+        path = 'message/translationWithInterestingItems'
+        return self._client._post(path, apiClientApplicationMessageTranslationRequestDto,
+            rpc='GetClientApplicationMessageTranslationWithInterestingItems', conv=_identity)
+
+    def get_key_list(self):
+        """Get list of client preferences keys."""
+        path = 'clientpreference/getkeylist'
+        return self._client._get(path, rpc='GetKeyList',
+            conv=_identity)
+
+    def get_market_information(self, MarketId):
+        """Get Market Information for the single specified market supplied in
+        the parameter."""
+        path = 'market/%s/information' % _q(MarketId)
+        return self._client._get(path, rpc='GetMarketInformation',
+            conv=_conv_GetMarketInformationResponseDTO)
+
+    def get_news_detail(self, source, storyId):
+        """Get the detail of the specific news story matching the story ID in
+        the parameter."""
+        path = 'news/%s/%s' % (
+            _q(source), _q(storyId))
+        return self._client._get(path, rpc='GetNewsDetail',
+            conv=_conv_GetNewsDetailResponseDTO)
+
+    def get_open_position(self, OrderId):
+        """Queries for a trade / open position with a specified order ID."""
+        path = 'order/%s/openposition' % _q(OrderId)
+        return self._client._get(path, rpc='GetOpenPosition',
+            conv=_conv_GetOpenPositionResponseDTO)
+
+    def get_order(self, OrderId):
+        """Queries for an order by a specific order ID."""
+        path = 'order/%s' % _q(OrderId)
+        return self._client._get(path, rpc='GetOrder',
+            conv=_conv_GetOrderResponseDTO)
+
+    def get_price_bars(self, MarketId, interval=None, span=None,
+            PriceBars=None):
+        """Get historic price bars for the specified market in OHLC *(open,
+        high, low, close)* format, suitable for plotting in candlestick
+        charts."""
+        path = 'market/%s/barhistory?interval=%s&span=%s&PriceBars=%s' % (
+            _q(MarketId), _q(interval), _q(span), _q(PriceBars))
+        return self._client._get(path, rpc='GetPriceBars',
+            conv=_conv_GetPriceBarResponseDTO)
+
+    def get_price_ticks(self, MarketId, PriceTicks=None):
+        """Get historic price ticks for the specified market."""
+        path = 'market/%s/tickhistory?PriceTicks=%s' % (
+            _q(MarketId), _q(PriceTicks))
+        return self._client._get(path, rpc='GetPriceTicks',
+            conv=_conv_GetPriceTickResponseDTO)
+
+    def get_system_lookup(self, LookupEntityName=None, CultureId=None):
+        """Use the message lookup service to get localised textual names for
+        the various status code & IDs returned by the API."""
+        path = 'message/lookup?LookupEntityName=%s&CultureId=%s' % (
+            _q(LookupEntityName), _q(CultureId))
+        return self._client._get(path, rpc='GetSystemLookup',
+            conv=_identity)
+
+    def get_version_information(self, AppKey=None, AccountOperatorId=None):
+        """Gets version information for a specific client application and
+        *(optionally)* account operator."""
+        path = 'clientapplication/versioninformation?AppKey=%s&AccountOperatorId=%s' % (
+            _q(AppKey), _q(AccountOperatorId))
+        return self._client._get(path, rpc='GetVersionInformation',
+            conv=_identity)
+
+    def get_watchlists(self):
+        """Gets all watchlists for the user account."""
+        path = 'watchlists/'
+        return self._client._get(path, rpc='GetWatchlists',
+            conv=_identity)
+
+    def list_active_stop_limit_orders(self, TradingAccountId=None):
+        """Queries for a specified trading account's active stop / limit
+        orders."""
+        path = 'order/activestoplimitorders?TradingAccountId=%s' % _q(TradingAccountId)
+        return self._client._get(path, rpc='ListActiveStopLimitOrders',
+            conv=_conv_ListActiveStopLimitOrderResponseDTO)
+
+    def list_cfd_markets(self, searchByMarketName=None,
+            searchByMarketCode=None, ClientAccountId=None, maxResults=None,
+            useMobileShortName=None):
+        """Returns a list of CFD markets filtered by market name and/or market
+        code."""
+        path = 'cfd/markets?MarketName=%s&MarketCode=%s&ClientAccountId=%s&MaxResults=%s&UseMobileShortName=%s' % (
+            _q(searchByMarketName), _q(searchByMarketCode), _q(ClientAccountId), _q(maxResults), _q(useMobileShortName))
+        return self._client._get(path, rpc='ListCfdMarkets',
+            conv=_identity)
+
+    def list_market_information(self, listMarketInformationRequestDTO):
+        """Get Market Information for the specified list of markets."""
+        path = 'market/information'
+        return self._client._post(path, listMarketInformationRequestDTO,
+            rpc='ListMarketInformation', conv=_conv_ListMarketInformationResponseDTO)
+
+    def list_market_information_search(self, searchByMarketCode=None,
+            searchByMarketName=None, spreadProductType=None,
+            cfdProductType=None, binaryProductType=None, query=None,
+            maxResults=None, useMobileShortName=None):
+        """Returns market information for the markets that meet the search
+        criteria."""
+        path = 'market/informationsearch?SearchByMarketCode=%s&SearchByMarketName=%s&SpreadProductType=%s&CfdProductType=%s&BinaryProductType=%s&Query=%s&MaxResults=%s&UseMobileShortName=%s' % (
+            _q(searchByMarketCode), _q(searchByMarketName), _q(spreadProductType), _q(cfdProductType), _q(binaryProductType), _q(query), _q(maxResults), _q(useMobileShortName))
+        return self._client._get(path, rpc='ListMarketInformationSearch',
+            conv=_conv_ListMarketInformationSearchResponseDTO)
+
+    def list_market_search(self, searchByMarketCode=None,
+            searchByMarketName=None, spreadProductType=None,
+            cfdProductType=None, binaryProductType=None, query=None,
+            maxResults=None, useMobileShortName=None):
+        """Returns a list of markets that meet the search criteria."""
+        path = 'market/search?SearchByMarketCode=%s&SearchByMarketName=%s&SpreadProductType=%s&CfdProductType=%s&BinaryProductType=%s&Query=%s&MaxResults=%s&UseMobileShortName=%s' % (
+            _q(searchByMarketCode), _q(searchByMarketName), _q(spreadProductType), _q(cfdProductType), _q(binaryProductType), _q(query), _q(maxResults), _q(useMobileShortName))
+        return self._client._get(path, rpc='ListMarketSearch',
+            conv=_identity)
+
+    def list_news_headlines(self, request):
+        """Get a list of current news headlines."""
+        path = 'news/headlines'
+        return self._client._post(path, request,
+            rpc='ListNewsHeadlines', conv=_conv_ListNewsHeadlinesResponseDTO)
+
+    def list_news_headlines_with_source(self, source, category,
+            maxResults=None):
+        """Get a list of current news headlines."""
+        path = 'news/%s/%s?MaxResults=%s' % (
+            _q(source), _q(category), _q(maxResults))
+        return self._client._get(path, rpc='ListNewsHeadlinesWithSource',
+            conv=_conv_ListNewsHeadlinesResponseDTO)
+
+    def list_open_positions(self, TradingAccountId=None):
+        """Queries for a specified trading account's trades / open positions."""
+        path = 'order/openpositions?TradingAccountId=%s' % _q(TradingAccountId)
+        return self._client._get(path, rpc='ListOpenPositions',
+            conv=_conv_ListOpenPositionsResponseDTO)
+
+    def list_spread_markets(self, searchByMarketName=None,
+            searchByMarketCode=None, ClientAccountId=None, maxResults=None,
+            useMobileShortName=None):
+        """Returns a list of Spread Betting markets filtered by market name
+        and/or market code."""
+        path = 'spread/markets?MarketName=%s&MarketCode=%s&ClientAccountId=%s&MaxResults=%s&UseMobileShortName=%s' % (
+            _q(searchByMarketName), _q(searchByMarketCode), _q(ClientAccountId), _q(maxResults), _q(useMobileShortName))
+        return self._client._get(path, rpc='ListSpreadMarkets',
+            conv=_identity)
+
+    def list_stop_limit_order_history(self, TradingAccountId=None,
+            maxResults=None):
+        """Queries for a specified trading account's stop / limit order
+        history."""
+        path = 'order/stoplimitorderhistory?TradingAccountId=%s&MaxResults=%s' % (
+            _q(TradingAccountId), _q(maxResults))
+        return self._client._get(path, rpc='ListStopLimitOrderHistory',
+            conv=_conv_ListStopLimitOrderHistoryResponseDTO)
+
+    def list_trade_history(self, TradingAccountId=None, maxResults=None):
+        """Queries for a specified trading account's trade history."""
+        path = 'order/order/tradehistory?TradingAccountId=%s&MaxResults=%s' % (
+            _q(TradingAccountId), _q(maxResults))
+        return self._client._get(path, rpc='ListTradeHistory',
+            conv=_conv_ListTradeHistoryResponseDTO)
+
+    def log_on(self, apiLogOnRequest):
+        """Create a new session."""
+        path = 'session/'
+        return self._client._post(path, apiLogOnRequest,
+            rpc='LogOn', conv=_identity)
+
+    def order(self, order):
+        """Place an order on a particular market."""
+        path = 'order/newstoplimitorder'
+        return self._client._post(path, order,
+            rpc='Order', conv=_identity)
+
+    def save(self, saveClientPreferenceRequestDTO):
+        """Save client preferences."""
+        path = 'clientpreference/save'
+        return self._client._post(path, saveClientPreferenceRequestDTO,
+            rpc='Save', conv=_identity)
+
+    def save_account_information(self, saveAccountInformationRequest):
+        """Saves the users account information."""
+        path = 'useraccount/Save'
+        return self._client._post(path, saveAccountInformationRequest,
+            rpc='SaveAccountInformation', conv=_identity)
+
+    def save_market_information(self, listMarketInformationRequestSaveDTO):
+        """Save Market Information for the specified list of markets."""
+        path = 'market/information/save'
+        return self._client._post(path, listMarketInformationRequestSaveDTO,
+            rpc='SaveMarketInformation', conv=_identity)
+
+    def save_watchlist(self, apiSaveWatchlistRequestDto):
+        """Save watchlist."""
+        path = 'watchlist/Save'
+        return self._client._post(path, apiSaveWatchlistRequestDto,
+            rpc='SaveWatchlist', conv=_identity)
+
+    def search_with_tags(self, query=None, tagId=None, maxResults=None,
+            useMobileShortName=None):
+        """Get market information and tags for the markets that meet the search
+        criteria."""
+        path = 'market/searchwithtags?Query=%s&TagId=%s&MaxResults=%s&UseMobileShortName=%s' % (
+            _q(query), _q(tagId), _q(maxResults), _q(useMobileShortName))
+        return self._client._get(path, rpc='SearchWithTags',
+            conv=_identity)
+
+    def tag_lookup(self):
+        """Gets all of the tags that the requesting user is allowed to see."""
+        path = 'market/taglookup'
+        return self._client._get(path, rpc='TagLookup',
+            conv=_identity)
+
+    def trade(self, trade):
+        """Place a trade on a particular market."""
+        path = 'order/newtradeorder'
+        return self._client._post(path, trade,
+            rpc='Trade', conv=_identity)
+
+    def update_order(self, order):
+        """Update an order *(for adding a stop/limit or attaching an OCO
+        relationship)*."""
+        path = 'order/updatestoplimitorder'
+        return self._client._post(path, order,
+            rpc='UpdateOrder', conv=_identity)
+
+    def update_trade(self, update):
+        """Update a trade *(for adding a stop/limit etc)*."""
+        path = 'order/updatetradeorder'
+        return self._client._post(path, update,
+            rpc='UpdateTrade', conv=_identity)
+
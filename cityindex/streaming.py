@@ -16,12 +16,19 @@
 
 from __future__ import absolute_import
 
+import collections
+import heapq
+import itertools
 import logging
 import threading
 import time
 
+from cityindex import records
 from cityindex import util
-import lightstreamer
+
+# Only imported once a streaming connection is made, so REST-only programs
+# importing cityindex don't pay for it.
+lightstreamer = util.LazyModule('lightstreamer')
 
 
 LIVE_STREAM_URL = 'https://push.cityindex.com/lightstreamer/'
@@ -48,12 +55,34 @@ AS_STREAMING = 'CITYINDEXSTREAMING'
 AS_TRADING = 'STREAMINGTRADINGACCOUNT'
 
 
+#
+# TableManager.listen() delivery policies.
+#
+
+# Invoke the function on the Lightstreamer receive thread.
+DELIVER_SYNC = 'sync'
+
+# Queue updates for a dispatcher thread, dropping them while the queue is full.
+DELIVER_QUEUE = 'queue'
+
+# Like DELIVER_QUEUE, but keep only the latest update for each item ID.
+DELIVER_CONFLATE = 'conflate'
+
+# Most items TableManager places in one table, keeping each subscription's
+# control request well inside the server's request size limit.
+MAX_TABLE_ITEMS = 500
+
+
 def conv_bool(s):
     return s == 'true'
 
 
 def conv_dt(s):
-    return float(util.json_fixup('"%s"' % s))
+    # Streamed dates never carry an offset, so try the simple case first.
+    try:
+        return float(s[s.index('(') + 1:s.index(')')]) / 1000
+    except ValueError:
+        return util.ms_date(s)
 
 
 # ClientAccountMarginDTO
@@ -167,6 +196,9 @@ def make_item_factory(fields):
     passes each value through a converter function if it is non-None, and uses
     the result to form a dict.
 
+    The function is generated specifically for `fields`, so that decoding a
+    row needs no loop, enumerate() or converter lookups.
+
     Example:
         >>> func = make_item_factory([
         ...     ('FieldA', float),
@@ -176,65 +208,665 @@ def make_item_factory(fields):
         >>> print func(['1234', 'test', None])
         {'FieldA': 1234.0, 'FieldB': u'test', 'FieldC': None}
     """
-    def item_factory(row):
-        return dict((key, conv(row[i]) if row[i] is not None else None)
-                    for i, (key, conv) in enumerate(fields))
-    return item_factory
+    names = ['v%d' % i for i in xrange(len(fields))]
+    ns = dict(('c%d' % i, conv) for i, (key, conv) in enumerate(fields))
+    exprs = ['v%d if v%d is None else c%d(v%d)' % (i, i, i, i)
+             for i in xrange(len(fields))]
+
+    lines = ['def item_factory(row):']
+    if fields:
+        lines.append('    %s, = row' % ', '.join(names))
+    lines.append('    return {%s}' % ', '.join('%r: %s' % (key, expr)
+                 for (key, conv), expr in zip(fields, exprs)))
+    exec '\n'.join(lines) in ns
+    return ns['item_factory']
+
+
+def _identity(o):
+    return o
+
+
+class DeltaDecoder(object):
+    """Decode Lightstreamer MODE_MERGE rows into a persistent per-item state,
+    converting only the fields that changed.
+
+    py-lightstreamer passes every row with unchanged fields set to the same
+    object as in the previous row, so a field changed exactly when its value
+    is not the previous value. As with make_item_factory(), the update
+    function is generated specifically for `fields`.
+    """
+    def __init__(self, fields, record_name=None):
+        """Create an instance for `fields`. If `record_name` is given, the
+        state is a records.Record subclass of that name, otherwise a dict."""
+        self.fields = fields
+        #: All field names, as passed for a new item.
+        self.names = frozenset(key for key, conv in fields)
+        #: Placeholder previous row for a new item; no field is identical.
+        self.empty = (object(),) * len(fields)
+        self.record_type = None
+        if record_name:
+            self.record_type = records.make_record_type(record_name,
+                [key for key, conv in fields])
+        self.update = self._make_update()
+        if self.record_type:
+            self.copy = self._make_copy()
+
+    def _make_update(self):
+        ns = dict(('c%d' % i, conv)
+                  for i, (key, conv) in enumerate(self.fields))
+        lines = ['def update(state, row, last):',
+                 '    changed = []']
+        if self.fields:
+            lines.append('    %s, = row' % ', '.join(
+                'v%d' % i for i in xrange(len(self.fields))))
+            lines.append('    %s, = last' % ', '.join(
+                'l%d' % i for i in xrange(len(self.fields))))
+        for i, (key, conv) in enumerate(self.fields):
+            if self.record_type:
+                target = 'state.%s' % key
+            else:
+                target = 'state[%r]' % key
+            lines.append('    if v%d is not l%d:' % (i, i))
+            lines.append('        %s = v%d if v%d is None else c%d(v%d)'
+                         % (target, i, i, i, i))
+            lines.append('        changed.append(%r)' % key)
+        lines.append('    return changed')
+        exec '\n'.join(lines) in ns
+        return ns['update']
+
+    def _make_copy(self):
+        lines = ['def copy(state):',
+                 '    rec = cls.__new__(cls)']
+        lines.extend('    rec.%s = state.%s' % (key, key)
+                     for key in self.record_type._fields)
+        lines.append('    rec._extra = None')
+        lines.append('    return rec')
+        ns = {'cls': self.record_type}
+        exec '\n'.join(lines) in ns
+        return ns['copy']
+
+    def new(self):
+        """Return the initial state for an item."""
+        if self.record_type:
+            rec = self.record_type.__new__(self.record_type)
+            for key in self.record_type._fields:
+                setattr(rec, key, None)
+            rec._extra = None
+            return rec
+        return dict.fromkeys(self.names)
+
+    def copy(self, state):
+        """Return a copy of `state` to pass to listeners, who may keep it.
+        Replaced by a generated function for record state."""
+        return state.copy()
+
+
+class _Subscriber(object):
+    """A function subscribed to a TableManager, with its options. Updates are
+    delivered synchronously, on the thread that received them."""
+    def __init__(self, func, fields=None, changes=False, queue_size=None,
+            max_frequency=None, min_move=None, move_field=None):
+        self.func = func
+        self.fields = None if fields is None else frozenset(fields)
+        self.changes = changes
+        self.queue_size = queue_size
+        self.max_frequency = max_frequency
+        self.min_move = min_move
+        self.move_field = move_field
+        # Map of item_id to (last delivered value of move_field, names of
+        # fields changed by updates since suppressed).
+        self._moves = {}
+        #: Updates passed to the function.
+        self.delivered = 0
+        #: Updates discarded because the queue was full.
+        self.dropped = 0
+        #: Updates replaced by a later update for the same item.
+        self.conflated = 0
+        #: Updates suppressed because the price moved less than min_move.
+        self.filtered = 0
+        #: True once the function raised; the TableManager then drops it.
+        self.failed = False
+        #: Number of TableManager registrations using this subscriber.
+        self.refs = 0
+
+    def _filter(self, key, item, changed):
+        """Return the field names to report as changed by an update, or None
+        if the update should not be delivered."""
+        if self.fields is not None and self.fields.isdisjoint(changed):
+            return None
+        if self.min_move:
+            value = item[self.move_field]
+            last, skipped = self._moves.get(key, (None, frozenset()))
+            if value is not None and last is not None \
+                    and abs(value - last) < self.min_move:
+                self._moves[key] = last, skipped | changed
+                self.filtered += 1
+                return None
+            self._moves[key] = value, frozenset()
+            changed |= skipped
+        return changed
+
+    def __call__(self, key, item, changed):
+        changed = self._filter(key, item, changed)
+        if changed is not None:
+            self._invoke(item, changed)
+
+    def _invoke(self, item, changed):
+        if self.changes:
+            self.func(item, changed)
+        else:
+            self.func(item)
+        self.delivered += 1
+
+    def pending(self):
+        """Return the number of updates awaiting delivery."""
+        return 0
+
+    def stats(self):
+        """Return a dict describing delivery so far."""
+        return {
+            'func': self.func,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'conflated': self.conflated,
+            'filtered': self.filtered,
+            'pending': self.pending()
+        }
+
+    def stop(self):
+        """Discard undelivered updates."""
+
+
+class _QueuedSubscriber(_Subscriber):
+    """Deliver updates from a dispatcher thread via a queue of at most
+    `queue_size` updates, so a slow function delays neither the Lightstreamer
+    receive thread nor other subscribers."""
+    def __init__(self, func, fields=None, changes=False, queue_size=1000,
+            max_frequency=None, min_move=None, move_field=None):
+        super(_QueuedSubscriber, self).__init__(func, fields, changes,
+            queue_size, max_frequency, min_move, move_field)
+        self._queue = self._make_queue()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._main)
+        self._thread.setDaemon(True)
+        self._thread.start()
+
+    def _make_queue(self):
+        return collections.deque()
+
+    def _put(self, key, item, changed):
+        if len(self._queue) >= self.queue_size:
+            self.dropped += 1
+        else:
+            self._queue.append((item, changed))
+
+    def _get(self):
+        return self._queue.popleft()
+
+    def _delay(self):
+        """Return the seconds until the next update may be delivered, or None
+        if the queue is empty."""
+        return 0 if self._queue else None
+
+    def __call__(self, key, item, changed):
+        changed = self._filter(key, item, changed)
+        if changed is None:
+            return
+        with self._cond:
+            if not self._stopped:
+                self._put(key, item, changed)
+                self._cond.notify()
+
+    def pending(self):
+        return len(self._queue)
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._queue.clear()
+            self._cond.notify()
+
+    def _main(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    delay = self._delay()
+                    if delay is None:
+                        self._cond.wait()
+                    elif delay > 0:
+                        self._cond.wait(delay)
+                    else:
+                        break
+                if self._stopped:
+                    return
+                item, changed = self._get()
+            if not lightstreamer.run_and_log(self._invoke, item, changed):
+                self.failed = True
+                self.stop()
+
+
+class _ConflatingSubscriber(_QueuedSubscriber):
+    """Like _QueuedSubscriber, but an update for an item already in the queue
+    replaces the queued update, so a slow function sees only the latest state
+    of each item. The changed field names of both updates are merged. If
+    `max_frequency` is set, each item is delivered at most that many times per
+    second, with updates in between conflated."""
+    def _make_queue(self):
+        # Map of item_id to earliest time of its next delivery.
+        self._due = {}
+        # Heap of (due time, sequence, item_id) for each queued item, so an
+        # item that is not yet due never holds back one that is. An item's
+        # due time only changes when it is delivered, so entries stay valid
+        # while it is queued.
+        self._heap = []
+        self._seq = itertools.count()
+        return {}
+
+    def _delay(self):
+        if not self._queue:
+            return None
+        return self._heap[0][0] - time.time()
+
+    def _put(self, key, item, changed):
+        queued = self._queue.get(key)
+        if queued:
+            self._queue[key] = item, queued[1] | changed
+            self.conflated += 1
+        elif len(self._queue) >= self.queue_size:
+            self.dropped += 1
+        else:
+            self._queue[key] = item, changed
+            heapq.heappush(self._heap,
+                (self._due.get(key, 0), next(self._seq), key))
+
+    def _get(self):
+        key = heapq.heappop(self._heap)[2]
+        if self.max_frequency:
+            self._due[key] = time.time() + (1.0 / self.max_frequency)
+        return self._queue.pop(key)
+
+    def stop(self):
+        with self._cond:
+            del self._heap[:]
+            super(_ConflatingSubscriber, self).stop()
+
+
+_SUBSCRIBER_TYPES = {
+    DELIVER_SYNC: _Subscriber,
+    DELIVER_QUEUE: _QueuedSubscriber,
+    DELIVER_CONFLATE: _ConflatingSubscriber
+}
+
+
+class _ItemState(object):
+    """Subscriptions and decoded state for one item of a TableManager."""
+    __slots__ = ('subs', 'table', 'last', 'state', 'item', 'resync')
+
+    def __init__(self):
+        #: Map of (item_ids, func) to _Subscriber.
+        self.subs = {}
+        #: Table the item is currently routed from.
+        self.table = None
+        #: Last raw row, state and copy of the state passed to listeners.
+        self.last = None
+        self.state = None
+        self.item = None
+        #: True if the item moved to a new table, whose first row must be
+        #: compared by value with the state.
+        self.resync = False
+
+    def frequency(self):
+        """Return the fastest max_frequency of the item's subscribers, or
+        None if any is unlimited."""
+        freqs = [sub.max_frequency for sub in self.subs.itervalues()]
+        return None if None in freqs else max(freqs)
 
 
 class TableManager(object):
-    """Manage a set of tables for a Lightstreamer client. Use table_factory()
-    when the first caller requests a table, and later destroy it when the last
-    caller unsubscribes."""
-    def __init__(self, table_factory, ids_func=None):
+    """Manage a set of tables for a Lightstreamer client.
+
+    Subscriptions are reference counted per item, so an item requested by
+    several listen() calls is subscribed and decoded once. Items are added
+    using table_factory() in a new table for each batch of items not already
+    subscribed. When an item's fastest requested frequency changes, it is
+    moved to a new table; when half of a table's items are no longer wanted,
+    the remainder are regrouped into a new table, and a table is deleted once
+    none of its items are wanted."""
+    def __init__(self, table_factory, ids_func=None, decoder=None,
+            move_field=None):
         """Create an instance that uses `table_factory` to construct tables,
-        and optionally using `ids_func` to map item_ids into a normal form."""
+        and optionally using `ids_func` to map item_ids into a normal form.
+        If `decoder` is given, it is a DeltaDecoder for the tables' raw rows;
+        otherwise rows are passed to listeners as produced by the table.
+        `move_field` names the field compared against listen()'s `min_move`.
+
+        `table_factory` is invoked as `table_factory(item_ids, max_frequency)`,
+        where `max_frequency` is None for an unfiltered table."""
         self.table_factory = table_factory
         self.ids_func = ids_func or (lambda o: o)
-        self.table_map = {}
+        self.decoder = decoder
+        self.move_field = move_field
+        #: Map of item_ids to dict mapping each function to its _Subscriber.
         self.func_map = {}
+        #: Map of each table to the list of item names it was created with.
+        self.table_map = {}
+        # Map of table to its max_frequency.
+        self._freq_map = {}
+        # Map of item name to _ItemState.
+        self._items = {}
+        # Map of item name to the set of tables subscribed to it, including
+        # tables it is no longer routed from.
+        self._carriers = {}
+        # Map of table to (Event, set of item positions yet to receive their
+        # first update), until the event is set.
+        self._acks = {}
         self._lock = threading.Lock()
 
-    def _make_ids(self, ids):
+    def _make_names(self, ids):
         if not isinstance(ids, (list, tuple)):
             ids = [ids]
-        return ' '.join(self.ids_func(id_) for id_ in ids)
-
-    def listen(self, func, item_ids=None):
-        """Subscribe `func` to updates for `item_ids``."""
-        item_ids = self._make_ids(item_ids)
+        names = []
+        seen = set()
+        for id_ in ids:
+            name = self.ids_func(id_)
+            if name not in seen:
+                seen.add(name)
+                names.append(name)
+        return names
+
+    def _make_subscriber(self, func, fields, changes, delivery, queue_size,
+            max_frequency, min_move):
+        if delivery is None:
+            delivery = DELIVER_CONFLATE if max_frequency else DELIVER_SYNC
+        if delivery not in _SUBSCRIBER_TYPES:
+            raise ValueError('unknown delivery policy: %r' % (delivery,))
+        if max_frequency and delivery != DELIVER_CONFLATE:
+            raise ValueError('max_frequency requires DELIVER_CONFLATE')
+        if min_move and not self.move_field:
+            raise ValueError('min_move is unsupported for this table')
+        return _SUBSCRIBER_TYPES[delivery](func, fields, changes, queue_size,
+            max_frequency or None, min_move, self.move_field)
+
+    def listen(self, func, item_ids=None, fields=None, changes=False,
+            delivery=None, queue_size=1000, max_frequency=None,
+            min_move=None):
+        """Subscribe `func` to updates for `item_ids``. If `fields` is given,
+        `func` is only invoked for updates that change at least one of the
+        named fields. If `changes` is True, `func` is invoked as
+        `func(item, changed)`, where `changed` is the frozenset of field names
+        changed by the update. If any of the items were already subscribed,
+        `func` is immediately passed their last known state.
+
+        `delivery` is one of the DELIVER_* constants, by default DELIVER_SYNC.
+        With DELIVER_QUEUE or DELIVER_CONFLATE, `func` runs on its own thread
+        and at most `queue_size` updates are buffered for it.
+
+        If `max_frequency` is given, `func` receives at most that many
+        updates per second for each item. Each item's subscription requests
+        the fastest frequency of any of its listeners from the server, and
+        the limit is enforced by conflation, which becomes the default
+        delivery. If `min_move` is given, updates are suppressed until the
+        manager's move_field (e.g. Price) moves at least that far from the
+        last value delivered.
+
+        Returns an object whose stats() method reports delivery counters."""
+        sub = self._make_subscriber(func, fields, changes, delivery,
+            queue_size, max_frequency, min_move)
+        names = self._make_names(item_ids)
+        with self._lock:
+            self._register(' '.join(names), names, func, sub)
+            self._update_tables(names)
+            self._replay(sub, names)
+        return sub
+
+    def listen_many(self, func, item_ids, fields=None, changes=False,
+            delivery=None, queue_size=1000, max_frequency=None,
+            min_move=None, wait=True, timeout=30):
+        """Like calling listen(func, item_id) for each of `item_ids`, except
+        new items are packed into as few tables as possible, and a single
+        subscriber, i.e. one dispatcher thread, serves every item. Each item
+        may later be unsubscribed individually using unlisten(), or all at
+        once using unlisten_many().
+
+        If `wait` is True and the tables request a snapshot, don't return
+        until every new item has received its snapshot row, raising
+        util.TimeoutError if that takes longer than `timeout` seconds; the
+        subscriptions remain in place. Returns the subscriber."""
+        sub = self._make_subscriber(func, fields, changes, delivery,
+            queue_size, max_frequency, min_move)
+        names = self._make_names(item_ids)
         with self._lock:
-            table = self.table_map.get(item_ids)
-            if not table:
-                table = self.table_factory(item_ids)
-                self.table_map[item_ids] = table
-                self.table_map[item_ids].on_update.listen(
-                    lambda item_id, row: self._on_update(item_ids, row))
-            self.func_map.setdefault(item_ids, set()).add(func)
-            if table.items:
-                func(next(table.items.itervalues()))
+            for name in names:
+                self._register(name, [name], func, sub)
+            tables = self._update_tables(names)
+            self._replay(sub, names)
+            events = [self._acks[table][0] for table in tables
+                      if table in self._acks]
+        if wait:
+            end = None if timeout is None else (time.time() + timeout)
+            for event in events:
+                event.wait(None if end is None else max(0, end - time.time()))
+            waiting = sum(1 for event in events if not event.isSet())
+            if waiting:
+                raise util.TimeoutError('%d of %d tables unacknowledged after '
+                    '%rs' % (waiting, len(events), timeout))
+        return sub
+
+    def _register(self, item_ids, names, func, sub):
+        old = self.func_map.setdefault(item_ids, {}).get(func)
+        if old:
+            self._release(old)
+        self.func_map[item_ids][func] = sub
+        sub.refs += 1
+        for name in names:
+            state = self._items.get(name)
+            if state is None:
+                state = self._items[name] = _ItemState()
+            state.subs[item_ids, func] = sub
+
+    def _release(self, sub):
+        sub.refs -= 1
+        if not sub.refs:
+            sub.stop()
+
+    def _replay(self, sub, names):
+        changed = self.decoder.names if self.decoder else frozenset()
+        for name in names:
+            item = self._items[name].item
+            if item is not None:
+                sub(name, item, changed)
 
     def unlisten(self, func, item_ids=None):
         """Unsubscribe `func` from updates for `item_ids`, destroying the
-        Lightstreamer subscription if it was the last interested function."""
-        item_ids = self._make_ids(item_ids)
+        Lightstreamer subscription of any item no longer listened to."""
+        item_ids = ' '.join(self._make_names(item_ids))
         with self._lock:
-            if item_ids in self.table_map:
-                self.func_map[item_ids].discard(func)
-                self._maybe_delete(item_ids)
-
-    def _maybe_delete(self, item_ids):
-        if not self.func_map[item_ids]:
-            table = self.table_map.pop(item_ids)
-            table.delete()
-            self.func_map.pop(item_ids)
-
-    def _on_update(self, item_ids, row):
-        """Invoked when any table has changed; forward the changed row to
-        subscribed functions."""
-        lightstreamer.dispatch(self.func_map[item_ids], row)
+            self._update_tables(self._unregister(item_ids, func))
+
+    def unlisten_many(self, func, item_ids):
+        """Undo listen_many(), or unsubscribe `func` from every item in
+        `item_ids` that it was individually subscribed to, regrouping or
+        destroying the affected tables once at the end."""
+        names = self._make_names(item_ids)
         with self._lock:
-            self._maybe_delete(item_ids)
+            for name in names:
+                self._unregister(name, func)
+            self._update_tables(names)
+
+    def stats(self):
+        """Return a dict mapping each subscribed item_ids string to a list of
+        delivery statistics for its subscribers."""
+        with self._lock:
+            return dict((item_ids, [sub.stats() for sub in subs.itervalues()])
+                        for item_ids, subs in self.func_map.iteritems())
+
+    def _unregister(self, item_ids, func):
+        """Remove the subscription of `func` to `item_ids`, returning the
+        names of the affected items; their tables still need updating."""
+        subs = self.func_map.get(item_ids)
+        sub = subs and subs.pop(func, None)
+        if not sub:
+            return []
+        self._release(sub)
+        if not subs:
+            del self.func_map[item_ids]
+        names = item_ids.split(' ')
+        for name in names:
+            self._items[name].subs.pop((item_ids, func), None)
+        return names
+
+    def _update_tables(self, names):
+        """Bring the tables into line with the subscriptions of items
+        `names`, creating, regrouping and deleting tables as necessary.
+        Return the list of created tables."""
+        created = []
+        moves = {}
+        touched = set()
+        for name in names:
+            state = self._items.get(name)
+            if state is None:
+                continue
+            if not state.subs:
+                # The state is kept while a table still carries the item.
+                touched.add(state.table)
+                continue
+            freq = state.frequency()
+            if state.table is not None and freq == self._freq_map[state.table]:
+                continue
+            touched.add(state.table)
+            carrier = self._carrier(name, freq)
+            if carrier is not None:
+                self._route(state, carrier)
+            else:
+                moves.setdefault(freq, []).append(name)
+
+        for freq, moved in moves.iteritems():
+            for i in xrange(0, len(moved), MAX_TABLE_ITEMS):
+                created.append(self._subscribe(moved[i:i + MAX_TABLE_ITEMS],
+                                               freq))
+
+        touched.discard(None)
+        for table in touched:
+            all_names = self.table_map[table]
+            live = [name for name in all_names if self._is_live(name, table)]
+            if live and (len(live) * 2) > len(all_names):
+                continue
+            if live:
+                created.append(self._subscribe(live, self._freq_map[table]))
+            self._delete_table(table)
+        return created
+
+    def _is_live(self, name, table):
+        """Return True if item `name` is wanted and routed from `table`."""
+        state = self._items.get(name)
+        return bool(state and state.subs and state.table is table)
+
+    def _carrier(self, name, freq):
+        """Return an existing table carrying item `name` with `freq`, or
+        None."""
+        for table in self._carriers.get(name, ()):
+            if self._freq_map[table] == freq:
+                return table
+
+    def _route(self, state, table):
+        state.table = table
+        state.resync = state.state is not None
+
+    def _subscribe(self, names, freq):
+        """Create and return a table for items `names` with `freq`, routing
+        the items' updates from it."""
+        table = self.table_factory(' '.join(names), freq)
+        table.on_update.listen(lambda pos, row:
+            self._on_update(table, names, pos, row))
+        self.table_map[table] = names
+        self._freq_map[table] = freq
+        # Only snapshot tables are guaranteed a first update for each item.
+        # py-lightstreamer reports end of snapshot without naming the item,
+        # so items are acknowledged only by their snapshot rows.
+        if table.snapshot:
+            self._acks[table] = (threading.Event(),
+                                 set(xrange(1, len(names) + 1)))
+        for name in names:
+            self._carriers.setdefault(name, set()).add(table)
+            self._route(self._items[name], table)
+        return table
+
+    def _delete_table(self, table):
+        """Delete `table`, discarding the state of unwanted items routed
+        from it."""
+        for name in self.table_map.pop(table):
+            carriers = self._carriers[name]
+            carriers.discard(table)
+            if not carriers:
+                del self._carriers[name]
+            state = self._items.get(name)
+            if state and state.table is table and not state.subs:
+                del self._items[name]
+        del self._freq_map[table]
+        ack = self._acks.pop(table, None)
+        if ack:
+            ack[0].set()
+        table.delete()
+
+    def _acknowledge(self, table, pos):
+        """Record the first update for item `pos` of `table`, setting the
+        table's event once every item has received one."""
+        event, waiting = self._acks[table]
+        waiting.discard(pos)
+        if not waiting:
+            del self._acks[table]
+            event.set()
+
+    def _decode(self, state, row):
+        """Return (item, changed) for `row`, updating the item's state, or
+        (None, None) if it changed nothing."""
+        decoder = self.decoder
+        if decoder is None:
+            state.item = row
+            return row, frozenset()
+        if state.state is None:
+            state.state = decoder.new()
+            state.last = decoder.empty
+        if state.resync:
+            # Rows of the new table share no objects with the old table's.
+            fresh = decoder.new()
+            decoder.update(fresh, row, decoder.empty)
+            changed = frozenset(key for key in decoder.names
+                                if fresh[key] != state.state[key])
+            state.state = fresh
+            state.resync = False
+            if not changed:
+                state.last = row
+                return None, None
+        else:
+            changed = frozenset(decoder.update(state.state, row, state.last))
+        state.last = row
+        state.item = decoder.copy(state.state)
+        return state.item, changed
+
+    def _on_update(self, table, names, pos, row):
+        """Invoked when any table has changed; decode the changed fields and
+        forward the item to subscribed functions. `pos` is the 1-based index
+        of the item in the table's `names`."""
+        name = names[pos - 1]
+        with self._lock:
+            if table in self._acks:
+                self._acknowledge(table, pos)
+            state = self._items.get(name)
+            if state is None or state.table is not table:
+                return
+            item, changed = self._decode(state, row)
+            if changed is None:
+                return
+            subs = state.subs.items()
+        for (item_ids, func), sub in subs:
+            if sub.failed or \
+                    not lightstreamer.run_and_log(sub, name, item, changed):
+                with self._lock:
+                    if self.func_map.get(item_ids, {}).get(func) is sub:
+                        self._update_tables(
+                            self._unregister(item_ids, func))
 
 
 class CiStreamingClient(object):
@@ -299,17 +931,17 @@ class CiStreamingClient(object):
         # Do useful work, decide to shutdown.
         streamer.stop()
     """
-    def __init__(self, api, url=None, prod=True):
+    def __init__(self, api, url=None, prod=True, compact=False):
         """Create an instance using the API session from CiApiClient instance
-        `api`."""
+        `api`. If `compact` is True, updates are records.Record instances
+        rather than dicts."""
         self.api = api
         self.url = url or (LIVE_STREAM_URL if prod else TEST_STREAM_URL)
+        self.compact = compact
         self.log = logging.getLogger('CiStreamingClient')
         self._client_map = {}
         self._client_map_lock = threading.Lock()
-        self._state_map = dict.fromkeys(
-            (AS_ACCOUNT, AS_DEFAULT, AS_STREAMING, AS_TRADING),
-            lightstreamer.STATE_DISCONNECTED)
+        self._state_map = {}
         self._state_funcs = []
         self._stopped = False
 
@@ -357,6 +989,10 @@ class CiStreamingClient(object):
         """Create an LsClient instance connected to the given `adapter_set."""
         with self._client_map_lock:
             client = self._client_map.get(adapter_set)
+            if not self._state_map:
+                self._state_map.update(dict.fromkeys(
+                    (AS_ACCOUNT, AS_DEFAULT, AS_STREAMING, AS_TRADING),
+                    lightstreamer.STATE_DISCONNECTED))
             if not client:
                 client = lightstreamer.LsClient(self.url, content_length=1<<20)
                 client.on_state.listen(lambda state: \
@@ -369,69 +1005,78 @@ class CiStreamingClient(object):
             snapshot=False):
         """Return a function that when passed an item_ids string, returns a
         lightstreamer.Table instance for `client` subscribed to those IDs from
-        `data_adapter`, with a row factory coresponding to `fields`"""
+        `data_adapter`, with a schema coresponding to `fields`. Rows are left
+        undecoded, for the TableManager's DeltaDecoder. Tables are unfiltered
+        unless a `max_frequency` is passed."""
         client = self._get_client(adapter_set)
         schema = ' '.join(p[0] for p in fields)
-        item_factory = make_item_factory(fields)
 
-        def table_factory(item_ids):
+        def table_factory(item_ids, max_frequency=None):
             return lightstreamer.Table(
                 client,
                 data_adapter=data_adapter,
                 item_ids=item_ids,
-                max_frequency='unfiltered',
+                max_frequency=max_frequency or 'unfiltered',
                 mode=lightstreamer.MODE_MERGE,
                 schema=schema,
                 snapshot=snapshot,
-                item_factory=item_factory
+                item_factory=_identity
             )
         return table_factory
 
+    def _make_manager(self, ids_func, adapter_set, data_adapter, fields,
+            snapshot=False, record_name=None, move_field=None):
+        """Return a TableManager for `data_adapter`, decoding `fields`. In
+        compact mode, items are records named `record_name`."""
+        factory = self._make_table_factory(adapter_set, data_adapter, fields,
+            snapshot)
+        decoder = DeltaDecoder(fields, record_name if self.compact else None)
+        return TableManager(factory, ids_func, decoder, move_field)
+
     @util.cached_property
     def account_margin(self):
         """Listen to client account margin updates."""
-        factory = self._make_table_factory(adapter_set=AS_ACCOUNT,
-            data_adapter='CLIENTACCOUNTMARGIN', fields=MARGIN_FIELDS)
-        return TableManager(factory, ids_func=lambda key: 'ALL')
+        return self._make_manager(lambda key: 'ALL', adapter_set=AS_ACCOUNT,
+            data_adapter='CLIENTACCOUNTMARGIN', fields=MARGIN_FIELDS,
+            record_name='ClientAccountMarginDTO')
 
     @util.cached_property
     def trade_margin(self):
         """Listen to per-trade margin updates."""
-        factory = self._make_table_factory(adapter_set=AS_ACCOUNT,
-            data_adapter='TRADEMARGIN', fields=TRADE_MARGIN_FIELDS)
-        return TableManager(factory, ids_func=lambda key: 'ALL')
+        return self._make_manager(lambda key: 'ALL', adapter_set=AS_ACCOUNT,
+            data_adapter='TRADEMARGIN', fields=TRADE_MARGIN_FIELDS,
+            record_name='TradeMarginDTO')
 
     @util.cached_property
     def default(self):
         """Listen to the stream of default prices for some operator ID."""
-        factory = self._make_table_factory(adapter_set=AS_DEFAULT,
-            data_adapter='PRICES', fields=PRICE_FIELDS, snapshot=True)
-        return TableManager(factory, lambda operator_id: 'AC%d' % operator_id)
+        return self._make_manager(lambda operator_id: 'AC%d' % operator_id,
+            adapter_set=AS_DEFAULT, data_adapter='PRICES', fields=PRICE_FIELDS,
+            snapshot=True, record_name='PriceDTO', move_field='Price')
 
     @util.cached_property
     def orders(self):
         """Listen to order status updates."""
-        factory = self._make_table_factory(adapter_set=AS_ACCOUNT,
-            data_adapter='ORDERS', fields=ORDER_FIELDS)
-        return TableManager(factory, ids_func=lambda key: 'ORDERS')
+        return self._make_manager(lambda key: 'ORDERS', adapter_set=AS_ACCOUNT,
+            data_adapter='ORDERS', fields=ORDER_FIELDS, record_name='OrderDTO')
 
     @util.cached_property
     def prices(self):
         """Listen to prices for some market ID."""
-        factory = self._make_table_factory(adapter_set=AS_STREAMING,
-            data_adapter='PRICES', fields=PRICE_FIELDS, snapshot=True)
-        return TableManager(factory, ids_func=lambda key: 'PRICE.%s' % key)
+        return self._make_manager(lambda key: 'PRICE.%s' % key,
+            adapter_set=AS_STREAMING, data_adapter='PRICES',
+            fields=PRICE_FIELDS, snapshot=True, record_name='PriceDTO',
+            move_field='Price')
 
     @util.cached_property
     def quotes(self):
         """Listen to oversize order quote updates."""
-        factory = self._make_table_factory(adapter_set=AS_TRADING,
-            data_adapter='QUOTE', fields=QUOTE_FIELDS)
-        return TableManager(factory, ids_func=lambda key: 'ALL')
+        return self._make_manager(lambda key: 'ALL', adapter_set=AS_TRADING,
+            data_adapter='QUOTE', fields=QUOTE_FIELDS, record_name='QuoteDTO')
 
     @util.cached_property
     def news(self):
         """Listen to news headlines for some category."""
-        factory = self._make_table_factory(adapter_set=AS_STREAMING,
-            data_adapter='NEWS', fields=NEWS_FIELDS)
-        return TableManager(factory, ids_func=lambda key: 'HEADLINES.%s' % key)
+        return self._make_manager(lambda key: 'HEADLINES.%s' % key,
+            adapter_set=AS_STREAMING, data_adapter='NEWS', fields=NEWS_FIELDS,
+            record_name='NewsDTO')
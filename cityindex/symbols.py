@@ -0,0 +1,236 @@
+#
+# Copyright 2012, the py-cityindex authors
+# 
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+# 
+#    http://www.apache.org/licenses/LICENSE-2.0
+# 
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+In-memory index of market names and codes.
+
+Resolving a list of symbols by searching for each one costs a request per
+symbol. SymbolIndex instead lists every market once via SearchWithTags,
+answers name prefix lookups from a sorted list, remembers the result of each
+market code search, and persists both to a JSON file that is reused until it
+is older than a configurable age.
+"""
+
+from __future__ import absolute_import
+
+import bisect
+import json
+import os
+import re
+import threading
+import time
+
+from cityindex.api import PRODUCT_TYPES
+
+
+#: Matches quarterly and spread contract names, excluded by `daily=True`.
+QUARTER_RE = re.compile(' (Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|'
+                        'Oct|Nov|Dec) [0-9]+ | Spread')
+
+#: Version of the persisted file format.
+FORMAT_VERSION = 1
+
+#: Market fields kept in the index. SearchWithTags lists only MarketId and
+#: Name; the rest are recorded from market searches or by fill().
+FIELDS = ('MarketId', 'Name', 'PriceDecimalPlaces')
+
+
+class SymbolIndex(object):
+    """Index of markets by name prefix and market code.
+
+    Example:
+        index = SymbolIndex(os.path.expanduser('~/.py-cityindex.symbols'))
+        index.refresh(api)
+        print index.prefix('UK 100', cfd=True, daily=True)
+    """
+    def __init__(self, path=None, max_age=86400):
+        """Create an instance persisted to `path`, if given. A loaded index
+        older than `max_age` seconds is rebuilt by refresh()."""
+        self.path = path
+        self.max_age = max_age
+        #: Time the market listing was built.
+        self.created = 0
+        #: Map of MarketId to dict of known FIELDS and 'Products'.
+        self.markets = {}
+        #: Map of upper case market code to list of MarketIds.
+        self.codes = {}
+        self._names = []
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @property
+    def stale(self):
+        return (time.time() - self.created) > self.max_age
+
+    def _reindex(self):
+        self._names = sorted((market['Name'].lower(), market_id)
+                             for market_id, market in self.markets.iteritems())
+
+    def load(self):
+        """Load the index from `path`. Return True if it was loaded and is
+        not stale."""
+        if not (self.path and os.path.exists(self.path)):
+            return False
+        with file(self.path) as fp:
+            dct = json.load(fp)
+        if dct.get('version') != FORMAT_VERSION:
+            return False
+        self.created = dct['created']
+        self.markets = dict((m['MarketId'], m) for m in dct['markets'])
+        self.codes = dct['codes']
+        self._reindex()
+        return not self.stale
+
+    def save(self):
+        """Write the index to `path` if it changed since it was loaded."""
+        if not (self.path and self._dirty):
+            return
+        with self._lock:
+            dct = {
+                'version': FORMAT_VERSION,
+                'created': self.created,
+                'markets': sorted(self.markets.itervalues(),
+                                  key=lambda m: m['MarketId']),
+                'codes': self.codes
+            }
+            self._dirty = False
+        tmp = '%s.%d.tmp' % (self.path, os.getpid())
+        with file(tmp, 'w') as fp:
+            json.dump(dct, fp)
+        os.rename(tmp, self.path)
+
+    def build(self, api):
+        """Replace the index with every market listed by SearchWithTags for
+        each of PRODUCT_TYPES, using api.list_tag_markets(). Fields recorded
+        for markets that are still listed are kept, as are remembered market
+        codes whose markets are all still listed."""
+        markets = {}
+        for tag, product, listing in api.list_tag_markets():
+            for market in listing:
+                dct = markets.get(market['MarketId'])
+                if dct is None:
+                    dct = markets[market['MarketId']] = {
+                        'MarketId': market['MarketId'],
+                        'Name': market['Name'],
+                        'Products': []
+                    }
+                    self._update(dct, self.markets.get(market['MarketId']))
+                if product not in dct['Products']:
+                    dct['Products'].append(product)
+
+        with self._lock:
+            self.markets = markets
+            self.codes = dict((code, market_ids)
+                              for code, market_ids in self.codes.iteritems()
+                              if all(m in markets for m in market_ids))
+            self.created = time.time()
+            self._dirty = True
+            self._reindex()
+
+    def _update(self, dct, market):
+        """Copy FIELDS missing from index entry `dct` from `market`."""
+        if dct is None or market is None:
+            return
+        for field in FIELDS:
+            if field not in dct and market.get(field) is not None:
+                dct[field] = market[field]
+
+    def refresh(self, api):
+        """Load the index, rebuilding and saving it if it is missing or
+        stale."""
+        if not self.load():
+            self.build(api)
+            self.save()
+
+    def _filter(self, market_ids, cfd, spread, binary, daily):
+        wanted = set(p for p, on in zip(PRODUCT_TYPES, (cfd, spread, binary))
+                     if on)
+        out = []
+        for market_id in market_ids:
+            market = self.markets.get(market_id)
+            if not market:
+                continue
+            if wanted and wanted.isdisjoint(market['Products']):
+                continue
+            if daily and QUARTER_RE.search(market['Name']):
+                continue
+            out.append(market)
+        return out
+
+    def prefix(self, prefix, cfd=False, spread=False, binary=False,
+            daily=False):
+        """Return markets whose name starts with `prefix`, ignoring case.
+        If any of `cfd`, `spread` or `binary` are True, only markets of
+        those product types are returned. If `daily` is True, quarterly
+        contracts are excluded."""
+        prefix = prefix.lower()
+        names = self._names
+        lo = bisect.bisect_left(names, (prefix,))
+        hi = bisect.bisect_left(names, (prefix + u'\uffff',))
+        return self._filter((market_id for name, market_id in names[lo:hi]),
+                            cfd, spread, binary, daily)
+
+    def code(self, code, suffix=None, cfd=False, spread=False, binary=False,
+            daily=False):
+        """Return markets previously recorded by add_code() for `code`, with
+        an optional exchange `suffix` such as '.L' appended. Returns None if
+        the code has not been searched for."""
+        code = (code + (suffix or '')).upper()
+        market_ids = self.codes.get(code)
+        if market_ids is not None:
+            return self._filter(market_ids, cfd, spread, binary, daily)
+
+    def add_code(self, code, markets, product=None):
+        """Record the result of searching for market `code`, a list of
+        market dicts, adding any unlisted markets as type `product`. Results
+        are merged with those recorded by earlier searches, which may have
+        been for other product types."""
+        with self._lock:
+            for market in markets:
+                dct = self.markets.get(market['MarketId'])
+                if dct is None:
+                    dct = self.markets[market['MarketId']] = {
+                        'MarketId': market['MarketId'],
+                        'Name': market['Name'],
+                        'Products': []
+                    }
+                    bisect.insort(self._names, (dct['Name'].lower(),
+                                                dct['MarketId']))
+                self._update(dct, market)
+                if product and product not in dct['Products']:
+                    dct['Products'].append(product)
+            market_ids = self.codes.setdefault(code.upper(), [])
+            for market in markets:
+                if market['MarketId'] not in market_ids:
+                    market_ids.append(market['MarketId'])
+            self._dirty = True
+
+    def fill(self, api, markets):
+        """Add any FIELDS missing from `markets`, a list of market dicts
+        returned by prefix() or code(), using api.market_info_many(). The
+        fields are recorded in the index, so each market is fetched at most
+        once per build()."""
+        missing = [m for m in markets
+                   if any(field not in m for field in FIELDS)]
+        if not missing:
+            return
+        infos = api.market_info_many(m['MarketId'] for m in missing)
+        with self._lock:
+            for market in missing:
+                info = infos[market['MarketId']]
+                self._update(market, info)
+                self._update(self.markets.get(market['MarketId']), info)
+            self._dirty = True
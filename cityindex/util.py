@@ -16,21 +16,38 @@
 
 from __future__ import absolute_import
 
+import Queue
+import collections
+import fcntl
+import json
+import mmap
+import os
 import re
+import struct
+import sys
 import threading
 import time
 
 
 class LeakyBucket(object):
-    """'Leaky bucket' rate limiting discipline."""
-    def __init__(self, per_sec, capacity, initial=None):
+    """'Leaky bucket' rate limiting discipline. Waiting threads are admitted
+    in priority order, then FIFO, and never sleep while holding the bucket's
+    lock."""
+    def __init__(self, per_sec, capacity, initial=None, starvation=None):
         """Create an instance. Allow no more than `per_sec` tokens per second
-        or `capacity` tokens in the bucket."""
+        or `capacity` tokens in the bucket. `starvation` optionally maps a
+        priority to the seconds its waiters may be overtaken, after which
+        they are admitted ahead of all others."""
         self._per_sec = per_sec
         self._capacity = capacity
         self._tokens = initial or capacity
-        self._lock = threading.Lock()
+        self._starvation = starvation or {}
+        self._cond = threading.Condition(threading.Lock())
+        self._waiters = []
+        self._seq = 0
         self._last_fill = time.time()
+        #: Total seconds callers have spent waiting for tokens.
+        self.waited = 0.0
 
     def _fill(self):
         """Fill the bucket up to its capacity with as many tokens as were
@@ -40,14 +57,460 @@ class LeakyBucket(object):
         self._tokens = min(self._capacity or tokens, tokens)
         self._last_fill = now
 
-    def get(self):
-        """Block the calling thread until a token is available."""
+    def _available(self):
+        """Return the current token count."""
+        self._fill()
+        return self._tokens
+
+    def _take(self):
+        """Take a token if available and return 0, otherwise return the
+        number of tokens still required."""
+        self._fill()
+        if self._tokens < 1:
+            return 1 - self._tokens
+        self._tokens -= 1
+        return 0
+
+    def _promote_at(self, waiter):
+        """Return the time `waiter` is promoted for starvation, or None."""
+        limit = self._starvation.get(waiter[0])
+        if limit is not None:
+            return waiter[2] + limit
+
+    def _head(self):
+        """Return the waiter to be admitted next."""
+        now = time.time()
+        def key(waiter):
+            promote_at = self._promote_at(waiter)
+            if promote_at is not None and promote_at <= now:
+                return -1, waiter[1]
+            return waiter[0], waiter[1]
+        return min(self._waiters, key=key)
+
+    def try_acquire(self):
+        """Take a token if one is available without waiting, and no other
+        thread is queued ahead. Return True on success."""
+        with self._cond:
+            return not (self._waiters or self._take())
+
+    def wait_time(self):
+        """Return the approximate seconds a new caller would wait for a
+        token, assuming it is queued behind every current waiter."""
+        with self._cond:
+            deficit = len(self._waiters) + 1 - self._available()
+            return max(0.0, deficit / float(self._per_sec))
+
+    def get(self, priority=0):
+        """Block the calling thread until a token is available, admitting
+        lower `priority` values first. Return the seconds spent waiting."""
+        start = time.time()
+        with self._cond:
+            self._seq += 1
+            waiter = (priority, self._seq, start)
+            self._waiters.append(waiter)
+            try:
+                while True:
+                    if self._head() is not waiter:
+                        # Wake when promoted, or when the head is admitted.
+                        timeout = None
+                        promote_at = self._promote_at(waiter)
+                        now = time.time()
+                        if promote_at is not None and promote_at > now:
+                            timeout = promote_at - now
+                        self._cond.wait(timeout)
+                        continue
+                    deficit = self._take()
+                    if not deficit:
+                        break
+                    self._cond.wait(deficit / float(self._per_sec))
+            finally:
+                self._waiters.remove(waiter)
+                self._cond.notify_all()
+            waited = time.time() - start
+            self.waited += waited
+        return waited
+
+
+class SharedLeakyBucket(LeakyBucket):
+    """LeakyBucket whose token count lives in a memory mapped file, so every
+    process opening the same `path` draws from one budget. Priority and FIFO
+    ordering apply among threads of a single process.
+
+    The file is only locked with flock() while tokens are counted, never while
+    waiting. The kernel drops the lock of a process that dies, and no tokens
+    are reserved ahead of use, so dead processes cannot leak tokens."""
+    _STATE = struct.Struct('<dd')
+
+    def __init__(self, path, per_sec, capacity, initial=None,
+            starvation=None):
+        """Create an instance sharing state with other users of `path`, which
+        is created and initialized with `initial` or `capacity` tokens if it
+        does not exist."""
+        LeakyBucket.__init__(self, per_sec, capacity, initial, starvation)
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < self._STATE.size:
+                os.write(self._fd, self._STATE.pack(self._tokens,
+                                                    self._last_fill))
+            self._map = mmap.mmap(self._fd, self._STATE.size)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _locked(self, func):
+        """Load the shared state, invoke `func()`, and store the state, all
+        while holding the file lock."""
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            self._tokens, self._last_fill = self._STATE.unpack(self._map[:])
+            result = func()
+            self._map[:] = self._STATE.pack(self._tokens, self._last_fill)
+            return result
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _available(self):
+        return self._locked(super(SharedLeakyBucket, self)._available)
+
+    def _take(self):
+        return self._locked(super(SharedLeakyBucket, self)._take)
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+
+class ScopedLimiter(object):
+    """Maintain an independent rate limiter per throttle scope, so exhausting
+    one scope's allowance never delays requests in another."""
+    def __init__(self, factory):
+        """Create an instance using `factory(scope)` to construct the bucket
+        for each scope."""
+        self.factory = factory
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, scope):
+        """Return the bucket for `scope`, creating it on first use."""
+        bucket = self._buckets.get(scope)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(scope)
+                if bucket is None:
+                    bucket = self.factory(scope)
+                    self._buckets[scope] = bucket
+        return bucket
+
+    def get(self, scope, priority=0):
+        """Block until a token for `scope` is available, returning the seconds
+        spent waiting."""
+        return self.bucket(scope).get(priority)
+
+    def try_acquire(self, scope):
+        """Take a token for `scope` without waiting, returning True on
+        success."""
+        return self.bucket(scope).try_acquire()
+
+    def wait_time(self, scope):
+        """Return the approximate seconds a new caller for `scope` would
+        wait."""
+        return self.bucket(scope).wait_time()
+
+    def stats(self):
+        """Return a dict mapping each scope to its total and current wait
+        times."""
+        return dict((scope, {'waited': bucket.waited,
+                             'wait_time': bucket.wait_time()})
+                    for scope, bucket in self._buckets.items())
+
+
+class LruCache(object):
+    """Thread-safe mapping of keys to expiring values, evicting the least
+    recently used entries once the total size of all values exceeds a bound.
+    Counts of hits and misses are kept in the `hits` and `misses`
+    attributes."""
+    def __init__(self, max_size, sizeof=len):
+        """Create an instance holding values whose combined `sizeof()` does
+        not exceed `max_size`."""
+        self.max_size = max_size
+        self.sizeof = sizeof
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._dct = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the unexpired value for `key`, or None."""
+        with self._lock:
+            item = self._dct.pop(key, None)
+            if item is not None:
+                if item[0] > time.time():
+                    self._dct[key] = item
+                    self.hits += 1
+                    return item[1]
+                self.size -= item[2]
+            self.misses += 1
+
+    def put(self, key, value, ttl):
+        """Store `value` for `key`, expiring after `ttl` seconds."""
+        size = self.sizeof(value)
+        if size > self.max_size:
+            return
         with self._lock:
-            self._fill()
-            if self._tokens < 1:
-                time.sleep((1 - self._tokens) / float(self._per_sec))
-                self._fill()
-            self._tokens -= 1
+            old = self._dct.pop(key, None)
+            if old is not None:
+                self.size -= old[2]
+            self._dct[key] = (time.time() + ttl, value, size)
+            self.size += size
+            while self.size > self.max_size:
+                _, (_, _, old_size) = self._dct.popitem(last=False)
+                self.size -= old_size
+
+    def discard(self, key):
+        """Remove the value for `key`, if any."""
+        with self._lock:
+            item = self._dct.pop(key, None)
+            if item is not None:
+                self.size -= item[2]
+
+    def clear(self):
+        with self._lock:
+            self._dct.clear()
+            self.size = 0
+
+    def stats(self):
+        """Return a dict describing cache effectiveness."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._dct),
+                'size': self.size
+            }
+
+
+class TimeoutError(Exception):
+    """Raised when waiting on a Future or subscription times out."""
+
+
+class CancelledError(Exception):
+    """Raised when retrieving the result of a cancelled Future."""
+
+
+class Future(object):
+    """The eventual result of a function running on an Executor. Callers may
+    block on result(), or register a callback with add_done_callback()."""
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._done = False
+        self._running = False
+        self._cancelled = False
+        self._result = None
+        self._exc_info = None
+        self._callbacks = []
+
+    def done(self):
+        """Return True if the result or exception is available."""
+        return self._done
+
+    def cancelled(self):
+        """Return True if the future was cancelled."""
+        return self._cancelled
+
+    def cancel(self):
+        """Cancel the function if it has not started running. Returns True
+        if the future is now cancelled."""
+        with self._cond:
+            if self._running or (self._done and not self._cancelled):
+                return False
+            if self._cancelled:
+                return True
+            self._cancelled = True
+        self.set_exception((CancelledError, CancelledError(), None))
+        return True
+
+    def set_running(self):
+        """Mark the future as running, returning False if it was already
+        cancelled."""
+        with self._cond:
+            if self._cancelled:
+                return False
+            self._running = True
+            return True
+
+    def _wait(self, timeout):
+        with self._cond:
+            if not self._done:
+                self._cond.wait(timeout)
+            if not self._done:
+                raise TimeoutError('timed out after %rs' % (timeout,))
+
+    def result(self, timeout=None):
+        """Block until the function completes, returning its result or
+        re-raising its exception."""
+        self._wait(timeout)
+        if self._exc_info:
+            raise self._exc_info[0], self._exc_info[1], self._exc_info[2]
+        return self._result
+
+    def exception(self, timeout=None):
+        """Block until the function completes, returning the exception it
+        raised, or None."""
+        self._wait(timeout)
+        return self._exc_info and self._exc_info[1]
+
+    def add_done_callback(self, func):
+        """Arrange for `func(future)` to be invoked on completion, or
+        immediately if already complete."""
+        with self._cond:
+            if not self._done:
+                self._callbacks.append(func)
+                return
+        func(self)
+
+    def _complete(self, result, exc_info):
+        with self._cond:
+            self._result = result
+            self._exc_info = exc_info
+            self._done = True
+            self._cond.notify_all()
+            callbacks, self._callbacks = self._callbacks, []
+        for func in callbacks:
+            func(self)
+
+    def set_result(self, result):
+        self._complete(result, None)
+
+    def set_exception(self, exc_info):
+        """Complete the future with `exc_info`, a sys.exc_info() tuple."""
+        self._complete(None, exc_info)
+
+
+class Executor(object):
+    """Run functions on a bounded set of daemon worker threads, returning a
+    Future for each. Threads are started on first use."""
+    def __init__(self, workers):
+        """Create an instance that runs at most `workers` functions
+        concurrently; further submissions are queued."""
+        self.workers = workers
+        self._queue = Queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _start(self):
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._main)
+                thread.setDaemon(True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, func, *args, **kwargs):
+        """Schedule `func(*args, **kwargs)`, returning a Future. Functions
+        submitted from one of the executor's own threads are run immediately,
+        since waiting for a queued function while occupying a worker could
+        deadlock."""
+        future = Future()
+        if getattr(self._local, 'worker', False):
+            self._run(future, func, args, kwargs)
+            return future
+        self._queue.put((future, func, args, kwargs))
+        if len(self._threads) < self.workers:
+            self._start()
+        return future
+
+    def map(self, func, *iterables, **kwargs):
+        """Like itertools.imap(), but run `func` concurrently. Results are
+        yielded in order; an exception is raised when its result is reached.
+        If the `timeout` keyword is given, TimeoutError is raised unless every
+        result is available that many seconds after map() was called. Work
+        not yet started is cancelled if the iterator is abandoned."""
+        timeout = kwargs.pop('timeout', None)
+        assert not kwargs, kwargs
+        futures = [self.submit(func, *args) for args in zip(*iterables)]
+        return self._map_results(futures, timeout)
+
+    def _map_results(self, futures, timeout):
+        end = None if timeout is None else (time.time() + timeout)
+        try:
+            for future in futures:
+                remain = None if end is None else max(0, end - time.time())
+                yield future.result(remain)
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self, wait=True, cancel=False):
+        """Stop the worker threads once queued work completes. If `cancel`
+        is True, queued work that has not started is cancelled instead. If
+        `wait` is True, don't return until the threads have exited."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        if cancel:
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except Queue.Empty:
+                    break
+                if item is not None:
+                    item[0].cancel()
+        for thread in threads:
+            self._queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def _run(self, future, func, args, kwargs):
+        if not future.set_running():
+            return
+        try:
+            result = func(*args, **kwargs)
+        except:
+            future.set_exception(sys.exc_info())
+        else:
+            future.set_result(result)
+
+    def _main(self):
+        self._local.worker = True
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            self._run(*item)
+
+
+def as_completed(futures, timeout=None):
+    """Yield each of `futures` as it completes, finished ones first. Raise
+    TimeoutError if they have not all completed within `timeout` seconds."""
+    futures = list(futures)
+    end = None if timeout is None else (time.time() + timeout)
+    done = Queue.Queue()
+    for future in futures:
+        future.add_done_callback(done.put)
+    for _ in xrange(len(futures)):
+        remain = None if end is None else max(0, end - time.time())
+        try:
+            yield done.get(timeout=remain)
+        except Queue.Empty:
+            raise TimeoutError('timed out after %rs' % (timeout,))
+
+
+class LazyModule(object):
+    """Stand-in for a module that is imported on first attribute access, so
+    importing a module that uses a heavy dependency only for some features
+    stays cheap."""
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+
+    def __getattr__(self, attr):
+        module = self.__dict__.get('_module')
+        if module is None:
+            __import__(self._name)
+            module = self.__dict__['_module'] = sys.modules[self._name]
+        return getattr(module, attr)
 
 
 class cached_property(object):
@@ -85,3 +548,50 @@ def json_fixup(s):
     """
     repl = lambda match: str(float(match.group(1)) / 1000)
     return re.sub(MS_DATE_RE, repl, s)
+
+
+def ms_date(s):
+    """Convert a Microsoft JSON date string such as "\/Date(1343067900000)\/"
+    or "/Date(1343067900000+0100)/" to a float UNIX timestamp. The optional
+    offset is ignored, as the milliseconds are always relative to UTC."""
+    ms = s[s.index('(') + 1:s.index(')')]
+    offset = max(ms.find('+', 1), ms.find('-', 1))
+    if offset > 0:
+        ms = ms[:offset]
+    return float(ms) / 1000
+
+
+def _ms_date_value(value):
+    if isinstance(value, unicode) and value.startswith(u'/Date('):
+        return ms_date(value)
+    elif isinstance(value, list):
+        return [_ms_date_value(v) for v in value]
+    return value
+
+
+def _ms_date_hook(dct):
+    for key, value in dct.iteritems():
+        dct[key] = _ms_date_value(value)
+    return dct
+
+
+def json_loads(s):
+    """Parse the JSON document `s`, converting Microsoft JSON dates to float
+    UNIX timestamps like json_fixup(), but without a regex pass.
+
+    Each "\/Date(ms)\/" string literal is rewritten to the JSON number
+    "mse-3", so conversion happens in json's C number parser rather than in
+    a Python callback per date. Documents using the offset form fail to parse
+    that way, and are decoded using an object hook instead. The first date
+    is checked for an offset, so such documents are usually parsed once."""
+    start = s.find('\\/Date(')
+    if start == -1:
+        return json.loads(s)
+    start += 7
+    if s[start:s.find(')', start)].isdigit():
+        try:
+            return json.loads(s.replace('"\\/Date(', '').replace(')\\/"',
+                                                               'e-3'))
+        except ValueError:
+            pass
+    return _ms_date_value(json.loads(s, object_hook=_ms_date_hook))
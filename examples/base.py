@@ -7,15 +7,23 @@ import os
 import re
 import shlex
 import sys
-import threading
+import time
 
 import cityindex
-import lightstreamer
+from cityindex import symbols
+from cityindex import util
+
+lightstreamer = util.LazyModule('lightstreamer')
 
 
 LOG = logging.getLogger('base')
 CONF_PATH = os.path.expanduser('~/.py-cityindex.conf')
 SESSION_PATH = os.path.expanduser('~/.py-cityindex.session')
+LIMITER_PATH = os.path.expanduser('~/.py-cityindex.limiter')
+SYMBOLS_PATH = os.path.expanduser('~/.py-cityindex.symbols')
+
+# SymbolIndex used by the searcher when --index is given.
+INDEX = None
 
 
 def filename_for(opts, market, kind):
@@ -47,58 +55,44 @@ class ThreadWaker(object):
         os.write(self.wpipe, ' ')
 
 
-class ThreadPool(object):
-    def __init__(self):
-        self.queue = Queue.Queue()
-        self.threads = [threading.Thread(target=self._main)
-                        for x in range(15)]
-        for thread in self.threads:
-            thread.setDaemon(True)
-            thread.start()
-
-    def put(self, func, *args, **kwargs):
-        self.queue.put((func, args, kwargs))
-
-    def join(self):
-        import time
-        while not self.queue.empty():
-            time.sleep(1)
-        self.queue.join()
-        # blocks SIGINT:
-        #self.queue.join()
-
-    def _run_one(self):
-        func, args, kwargs = self.queue.get()
+def run_all(func, items):
+    """Run `func(item)` for each of `items` on the shared executor, logging
+    any exceptions. Return a list of (item, result) in completion order,
+    omitting items that failed."""
+    executor = cityindex.shared_executor()
+    futures = dict((executor.submit(func, item), item) for item in items)
+    results = []
+    for future in util.as_completed(futures):
+        item = futures[future]
         try:
-            func(*args, **kwargs)
-        except:
-            LOG.exception('While invoking %r(*%r, **%r)', func, args, kwargs)
-        self.queue.task_done()
-
-    def _main(self):
-        while True:
-            self._run_one()
+            results.append((item, future.result()))
+        except Exception:
+            LOG.exception('While invoking %r(%r)', func, item)
+    return results
 
 
 def threaded_lookup(searcher, strs):
     markets = {}
     unknown = []
-
-    def lookup(s):
-        matches = searcher(s)
+    results = dict(run_all(searcher, strs))
+    for s in strs:
+        matches = results.get(s)
         if matches:
             for match in matches:
                 markets[match['MarketId']] = s, match
         else:
             unknown.append(s)
-
-    tp = ThreadPool()
-    for s in strs:
-        tp.put(lookup, s)
-    tp.join()
     return markets, unknown
 
 
+def fill_details(api, markets):
+    """Ensure each of `markets` returned by the searcher has every field of
+    symbols.FIELDS. Index hits may hold only MarketId and Name, so missing
+    fields are fetched once and remembered by the index."""
+    if INDEX:
+        INDEX.fill(api, markets)
+
+
 def parse_options():
     parser = optparse.OptionParser()
     parser.add_option('--raw', action='store_true', default=False,
@@ -128,6 +122,14 @@ def parse_options():
                       help='Search for spread bet markets.')
     parser.add_option('--suffix',
         help='Append suffix to each symbol (e.g. .O=NASDAQ, .N=NYSE')
+    parser.add_option('--store',
+        help='Keep bars in this directory, fetching only newer bars.')
+    parser.add_option('--index', action='store_true',
+        help='Resolve symbols using a symbol index kept in %s' % SYMBOLS_PATH)
+    parser.add_option('--index-age', type='int', default=86400,
+        help='Rebuild the symbol index when older than this many seconds.')
+    parser.add_option('--timings', action='store_true',
+        help='Log a breakdown of startup time on exit.')
 
     args = sys.argv[1:]
     if os.path.exists(CONF_PATH):
@@ -138,6 +140,8 @@ def parse_options():
 
 
 def main_wrapper(main):
+    global INDEX
+    start = time.time()
     opts, args = parse_options()
     if not ((opts.username and opts.password)\
             and (opts.cfd or opts.bet)):
@@ -156,21 +160,37 @@ def main_wrapper(main):
     else:
         session_cache = {}
 
+    def save_session(future=None):
+        if session_cache.get(key) != api.session_id:
+            session_cache[key] = api.session_id
+            with file(SESSION_PATH, 'w') as fp:
+                json.dump(session_cache, fp, sort_keys=True, indent=True)
+
+    # Share one rate limit budget between all tools using this account.
     api = cityindex.CiApiClient(opts.username, opts.password,
-        session_id=session_cache.get(key))
+        session_id=session_cache.get(key),
+        limiter_path='%s.%s' % (LIMITER_PATH, opts.username))
     if not api.session_id:
         api.login()
-    session_cache[key] = api.session_id
-
-    with file(SESSION_PATH, 'w') as fp:
-        json.dump(session_cache, fp, sort_keys=True, indent=True)
+    save_session()
+    # Reuse the cached session rather than logging in; fetching account
+    # details in the background both validates it and warms the cache. Save
+    # the session again in case the fetch had to login.
+    api.prefetch().add_done_callback(save_session)
 
     streamer = cityindex.CiStreamingClient(api)
 
     method = api.list_spread_markets if opts.bet else api.list_cfd_markets
     kwarg = 'code' if opts.bycode else 'name'
-    def searcher(s):
-        hits = api.market_search(s,
+    index = None
+    if opts.index:
+        index = symbols.SymbolIndex(SYMBOLS_PATH, max_age=opts.index_age)
+        with api.timed('index'):
+            index.refresh(api)
+    INDEX = index
+
+    def search(s):
+        return api.market_search(s,
             by_code=opts.bycode,
             by_name=not opts.bycode,
             spread=opts.bet,
@@ -178,13 +198,34 @@ def main_wrapper(main):
             binary=opts.binary,
             options=opts.options)
 
+    def searcher(s):
+        if index and opts.bycode:
+            # Codes aren't listed by the API, so remember each search result.
+            hits = index.code(s, cfd=bool(opts.cfd), spread=opts.bet,
+                binary=opts.binary)
+            if not hits:
+                hits = search(s)
+                index.add_code(s, hits, 'spread' if opts.bet else 'cfd')
+        elif index and not opts.options:
+            return index.prefix(s, cfd=bool(opts.cfd), spread=opts.bet,
+                binary=opts.binary, daily=opts.daily)
+        else:
+            hits = search(s)
+
         prefix = s.split()[0].lower()
         hits = filter(lambda m: m['Name'].lower().startswith(prefix), hits)
 
         if opts.daily:
-            quarter_re = re.compile(' (Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|'
-                                      'Oct|Nov|Dec) [0-9]+ | Spread')
-            hits = filter(lambda m: not quarter_re.search(m['Name']), hits)
+            hits = filter(lambda m: not symbols.QUARTER_RE.search(m['Name']),
+                          hits)
         return hits
 
-    main(opts, args, api, streamer, searcher)
+    api.timings['startup'] = time.time() - start
+    try:
+        main(opts, args, api, streamer, searcher)
+    finally:
+        if index:
+            index.save()
+        if opts.timings:
+            LOG.info('timings: %s', ', '.join('%s=%dms' % (k, 1000 * v)
+                     for k, v in sorted(api.timings.items())))
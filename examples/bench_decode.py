@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+"""Compare REST response decoding via util.json_fixup() + json.loads() with
+util.json_loads(), using synthetic barhistory and informationsearch bodies.
+
+PYTHONPATH=. examples/bench_decode.py
+"""
+
+from __future__ import absolute_import
+
+import json
+import time
+
+from cityindex import util
+
+
+def make_bars(count):
+    return json.dumps({
+        'PriceBars': [{
+            'BarDate': '\\/Date(%d)\\/' % (1343067900000 + (i * 60000)),
+            'Open': 5712.5, 'High': 5714.0, 'Low': 5711.0, 'Close': 5713.5
+        } for i in xrange(count)]
+    }).replace('\\\\/', '\\/')
+
+
+def make_markets(count):
+    return json.dumps({
+        'MarketInformation': [{
+            'MarketId': 400000000 + i,
+            'Name': 'UK 100 CFD %d' % i,
+            'MarketSettingsType': 'CFD',
+            'PriceDecimalPlaces': 2,
+            'MarginFactor': 1.0,
+            'QuantityMinimum': 1.0,
+            'TradingStartTimeUtc': '\\/Date(1343030400000)\\/',
+            'TradingEndTimeUtc': '\\/Date(1343081700000)\\/',
+            'MarketBreakTimes': []
+        } for i in xrange(count)]
+    }).replace('\\\\/', '\\/')
+
+
+def bench(label, func, raw, rounds=5):
+    start = time.time()
+    for _ in xrange(rounds):
+        func(raw)
+    print '%-12s %-18s %8.2fms' % (label, func.__name__,
+        1000 * (time.time() - start) / rounds)
+
+
+def json_fixup_loads(raw):
+    return json.loads(util.json_fixup(raw))
+
+
+def main():
+    for label, raw in (('barhistory', make_bars(20000)),
+                       ('search', make_markets(5000))):
+        assert json_fixup_loads(raw) == util.json_loads(raw)
+        print '%s: %d bytes' % (label, len(raw))
+        bench(label, json_fixup_loads, raw)
+        bench(label, util.json_loads, raw)
+        bench(label, json.loads, raw)
+
+
+if __name__ == '__main__':
+    main()
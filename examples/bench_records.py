@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+
+"""Compare the memory used by a synthetic 10,000 market catalogue decoded as
+dicts with the same catalogue decoded as compact records.
+
+PYTHONPATH=. examples/bench_records.py
+"""
+
+from __future__ import absolute_import
+
+import json
+import random
+import sys
+import time
+
+from cityindex import records
+from cityindex import schema
+
+
+MARKETS = 10000
+RESPONSE_TYPE = 'ListMarketInformationSearchResponseDTO'
+
+
+def make_value(rand, field, descr):
+    """Return a plausible value for `field`."""
+    if descr.get('collection'):
+        return []
+    elif descr.get('date'):
+        return rand.randrange(1343000000, 1344000000)
+    elif descr['type'] == 'bool':
+        return rand.random() > 0.5
+    elif descr['type'] == 'int':
+        return rand.choice((0, 1, 2, 10, 100))
+    elif field in records.UNIQUE_FIELDS:
+        return 'UK 100 CFD %d' % rand.randrange(1 << 30)
+    return rand.choice(('GBP', 'USD', 'EUR', 'CFD', 'Spread', 'Index'))
+
+
+def make_catalogue(count):
+    rand = random.Random(0)
+    fields = schema.TYPES['ApiMarketInformationDTO']
+    return json.dumps({
+        'MarketInformation': [
+            dict((field, make_value(rand, field, descr))
+                 for field, descr in fields.iteritems())
+            for _ in xrange(count)
+        ]
+    })
+
+
+def deep_size(obj, seen=None):
+    """Return the approximate bytes used by `obj` and everything it
+    references, counting shared objects once."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.iteritems():
+            size += deep_size(key, seen) + deep_size(value, seen)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            size += deep_size(value, seen)
+    elif isinstance(obj, records.Record):
+        for key, value in obj.iteritems():
+            size += deep_size(value, seen)
+    return size
+
+
+def main():
+    raw = make_catalogue(MARKETS)
+    print '%d markets, %d bytes of JSON' % (MARKETS, len(raw))
+
+    start = time.time()
+    dicts = json.loads(raw)
+    elapsed = time.time() - start
+    print 'dict:   %6.2fMiB, decoded in %.2fs' % (
+        deep_size(dicts) / 1048576.0, elapsed)
+
+    start = time.time()
+    compact = records.RecordDecoder().decode(RESPONSE_TYPE, json.loads(raw))
+    elapsed = time.time() - start
+    print 'record: %6.2fMiB, decoded in %.2fs' % (
+        deep_size(compact) / 1048576.0, elapsed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+
+"""Compare decoding synthetic Lightstreamer price rows in full, using the
+original generator-based item factory and the generated make_item_factory(),
+against the DeltaDecoder update and copy that TableManager performs for each
+row, with dict and record state.
+
+Rows are merged the way py-lightstreamer merges them: fields a tick leaves
+unchanged are the same objects as in the item's previous row.
+
+PYTHONPATH=. examples/bench_streaming.py
+"""
+
+from __future__ import absolute_import
+
+import random
+import time
+
+from cityindex import streaming
+
+
+ROWS = 200000
+MARKETS = 500
+
+# Indices into PRICE_FIELDS changed by every tick: TickDate, Bid, Offer,
+# Price and AuditId.
+TICK_FIELDS = (2, 3, 4, 5, 10)
+
+
+def old_make_item_factory(fields):
+    """The item factory as it was before decoders were generated."""
+    def item_factory(row):
+        return dict((key, conv(row[i]) if row[i] is not None else None)
+                    for i, (key, conv) in enumerate(fields))
+    return item_factory
+
+
+def make_rows(count):
+    rand = random.Random(0)
+    last = {}
+    rows = []
+    for i in xrange(count):
+        market_id = 99500 + (i % MARKETS)
+        price = 5700 + rand.random() * 20
+        tick = [
+            None, None, '\\/Date(%d)\\/' % (1343067900000 + i),
+            '%.1f' % price, '%.1f' % (price + 1), '%.1f' % (price + 0.5),
+            None, None, None, None, str(1000000 + i), None
+        ]
+        row = last.get(market_id)
+        if row is None:
+            row = [str(market_id), 'UK 100 CFD', None, None, None, None,
+                   '5720.0', '5700.0', '-12.5', '1', None, '0']
+        row = list(row)
+        for j in TICK_FIELDS:
+            row[j] = tick[j]
+        last[market_id] = row
+        rows.append((market_id, row))
+    return rows
+
+
+def bench(label, func, rows):
+    start = time.time()
+    for market_id, row in rows:
+        func(market_id, row)
+    elapsed = time.time() - start
+    print '%-8s %7.2fus/row %9d rows/sec' % (label,
+        1e6 * elapsed / len(rows), len(rows) / elapsed)
+
+
+def make_full(make_factory=streaming.make_item_factory):
+    factory = make_factory(streaming.PRICE_FIELDS)
+    def full(market_id, row):
+        return factory(row)
+    return full
+
+
+def make_delta(record_name=None):
+    decoder = streaming.DeltaDecoder(streaming.PRICE_FIELDS, record_name)
+    update = decoder.update
+    copy = decoder.copy
+    items = {}
+    def delta(market_id, row):
+        last, state = items.get(market_id, (decoder.empty, None))
+        if state is None:
+            state = decoder.new()
+        update(state, row, last)
+        items[market_id] = row, state
+        return copy(state)
+    return delta
+
+
+def main():
+    rows = make_rows(ROWS)
+    old = make_full(old_make_item_factory)
+    full = make_full()
+    delta = make_delta()
+    record = make_delta('PriceDTO')
+    for market_id, row in rows[:MARKETS * 2]:
+        assert old(market_id, row) == full(market_id, row) == \
+            delta(market_id, row) == record(market_id, row).to_dict()
+
+    print '%d rows of %d PRICE_FIELDS, %d changed per tick' % (ROWS,
+        len(streaming.PRICE_FIELDS), len(TICK_FIELDS))
+    bench('old', make_full(old_make_item_factory), rows)
+    bench('full', make_full(), rows)
+    bench('delta', make_delta(), rows)
+    bench('record', make_delta('PriceDTO'), rows)
+
+
+if __name__ == '__main__':
+    main()
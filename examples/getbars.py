@@ -11,40 +11,15 @@ import sys
 import threading
 
 import cityindex
+from cityindex import bars as bars_
 import base
 
 
-def tsformat(bar):
-    dt = datetime.datetime.fromtimestamp(bar['BarDate'])
+def tsformat(ts):
+    dt = datetime.datetime.fromtimestamp(ts)
     return dt.strftime('%Y-%m-%d %H:%M:%S')
 
 
-
-def pad_bars(bars, interval):
-    if not bars:
-        return
-
-    out = []
-    last = None
-    for bar in bars:
-        if last is not None:
-            while bar['BarDate'] > (last + interval):
-                price = out[-1]['Close']
-                padded = {
-                    'BarDate': out[-1]['BarDate'] + interval,
-                    'Open': price,
-                    'High': price,
-                    'Low': price,
-                    'Close': price
-                }
-                out.append(padded)
-                last = padded['BarDate']
-        out.append(bar)
-        last = bar['BarDate']
-    return out
-
-
-
 def main(opts, args, api, streamer, searcher):
     if not args:
         print 'Need at least one symbol to lookup.'
@@ -53,19 +28,28 @@ def main(opts, args, api, streamer, searcher):
     for i in xrange(len(args)):
         args[i] += opts.suffix or ''
 
+    if opts.store:
+        store = bars_.BarStore(opts.store, api, initial=opts.bars)
+
     def fetch(market):
-        bars = api.market_bars(market['MarketId'],
-            interval=opts.interval.upper(),
-            span=opts.span, bars=opts.bars)['PriceBars']
+        if opts.store:
+            key = market['MarketId'], opts.interval, opts.span
+            store.update(*key)
+            bars = bars_.tail(store.read(*key), opts.bars)
+        else:
+            bars = api.market_bars(market['MarketId'],
+                interval=opts.interval.upper(),
+                span=opts.span, bars=opts.bars, as_array=True)['PriceBars']
 
         if opts.raw:
             pad_count = 0
         else:
-            orig = len(bars)
-            bars = pad_bars(bars, interval=opts.span * 60)
-            pad_count = len(bars) - orig
+            orig = len(bars['BarDate'])
+            bars = bars_.pad(bars, opts.interval, opts.span)
+            pad_count = len(bars['BarDate']) - orig
             if opts.chop:
-                bars = bars[-opts.bars:]
+                bars = bars_.tail(bars, opts.bars)
+        dates = bars['BarDate']
 
         filename = base.filename_for(opts, market,
             kind='bars_%s%s' % (opts.span, opts.interval[0].upper()))
@@ -74,24 +58,20 @@ def main(opts, args, api, streamer, searcher):
             writer = csv.writer(fp, quoting=csv.QUOTE_ALL)
             write = writer.writerow
             write(('UtcTime', 'Open', 'High', 'Low', 'Close'))
-            for bar in bars:
-                write((tsformat(bar),
-                      bar['Open'], bar['High'], bar['Low'],
-                      bar['Close']))
+            for row in zip(*[bars[name].tolist()
+                             for name in bars_.COLUMNS]):
+                write((tsformat(row[0]),) + row[1:])
 
         print 'Wrote %d bars for %d/%s to %r (padded:%d, first:%r, last:%r)' %\
-            (len(bars), market['MarketId'], market['Name'], filename,
-             pad_count, bars and tsformat(bars[0]),
-                        bars and tsformat(bars[-1]))
+            (len(dates), market['MarketId'], market['Name'], filename,
+             pad_count, len(dates) and tsformat(dates[0]),
+                        len(dates) and tsformat(dates[-1]))
 
     markets, unknown = base.threaded_lookup(searcher, args)
     for unk in unknown:
         print 'Can\'t find %r' % (unk,)
 
-    tp = base.ThreadPool()
-    for s, market in markets.values():
-        tp.put(fetch, market)
-    tp.join()
+    base.run_all(fetch, [market for s, market in markets.values()])
 
 if __name__ == '__main__':
     base.main_wrapper(main)
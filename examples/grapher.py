@@ -3,12 +3,14 @@ import Queue
 import errno
 import json
 import operator
+import threading
 import time
 
 import numpy
 import flask
 import werkzeug.serving
 
+from cityindex import bars as bars_
 import base
 
 
@@ -17,16 +19,13 @@ API = None
 STREAMER = None
 
 MCACHE = {}
-BCACHE = {}
+LIVE = {}
+LIVE_LOCKS = {}
+LIVE_LOCK = threading.Lock()
 WINDOW = 60 * 60
 
 MODIFIERS = sorted('cfd binary bet daily options'.split())
 INTERVALS = 'MINUTE HOUR DAY'.split()
-INTERVAL_MAP = {
-    'MINUTE': 60,
-    'HOUR': 60 * 60,
-    'DAY': 86400
-}
 
 app = flask.Flask(__name__)
 
@@ -158,19 +157,34 @@ def on_markets():
 
 
 def make_bin(bars):
-    ar = numpy.empty(5 * len(bars))
-    base_open = len(bars)
-    base_high = len(bars) * 2
-    base_low = len(bars) * 3
-    base_close = len(bars) * 4
-
-    for idx, bar in enumerate(bars):
-        ar[idx] = bar['BarDate']
-        ar[base_open + idx] = bar['Open']
-        ar[base_high + idx] = bar['High']
-        ar[base_low + idx] = bar['Low']
-        ar[base_close + idx] = bar['Close']
-    return ar.tostring()
+    return numpy.concatenate([bars[name] for name in bars_.COLUMNS]).tostring()
+
+
+def get_live(market_id, interval, span, bars):
+    """Return the LiveBars for `market_id` at `interval`, creating it on first
+    use. Every span of the interval is derived from the same instance, which
+    is replaced by one seeded with more history when a request needs more
+    base bars than it was seeded with."""
+    key = market_id, interval
+    needed = bars * span
+    with LIVE_LOCK:
+        live = LIVE.get(key)
+        if live is not None and live.history >= needed:
+            return live
+        lock = LIVE_LOCKS.setdefault(key, threading.Lock())
+    # Seeding fetches history, so only hold this key's lock while it runs.
+    with lock:
+        old = LIVE.get(key)
+        if old is not None and old.history >= needed:
+            return old
+        history = max(1440, needed, old.history if old else 0)
+        live = bars_.LiveBars(STREAMER, API, market_id, interval,
+                              history=history, limit=max(10000, history))
+        with LIVE_LOCK:
+            LIVE[key] = live
+        if old is not None:
+            old.stop()
+        return live
 
 
 @app.route('/bars')
@@ -180,28 +194,11 @@ def on_bars():
     bars = int(flask.request.args.get('bars', '1440'))
     span = int(flask.request.args.get('span', '1'))
 
-    key = market_id, interval, span
-
-    old = BCACHE.setdefault(key, [0, []])
-    if old:
-        import math
-        cnt = int(math.ceil((time.time() - old[0]) / INTERVAL_MAP[interval]))
-    else:
-        cnt = max(1000, bars)
-    cnt = min(cnt, bars)
-
-    result = API.market_bars(market_id, bars=cnt,
-        interval=interval, span=span)
-    new = result['PriceBars'] + [result['PartialPriceBar']]
-    while new and old[1] and old[1][-1]['BarDate'] >= new[0]['BarDate']:
-        old[1].pop()
-    old[1].extend(new)
-    old[0] = time.time()
-
-    bars = old[1][-bars:]
+    live = get_live(market_id, interval, span, bars)
+    arr = live.read(interval, span, count=bars)
     if flask.request.args.get('f') == 'bin':
-        return flask.Response(make_bin(bars))
-    return jsonify(bars)
+        return flask.Response(make_bin(arr))
+    return jsonify(bars_.to_dicts(arr))
 
 
 def main(opts, args, api, streamer, searcher):
@@ -11,15 +11,10 @@ import cityindex
 import base
 
 API = None
-MARKET_CACHE = {}
 
 
 def get_market(market_id):
-    market = MARKET_CACHE.get(market_id)
-    if not market:
-        market = API.market_info(market_id)
-        MARKET_CACHE[market_id] = market
-    return market
+    return API.market_info_many([market_id])[market_id]
 
 
 def on_order_update(order):
@@ -184,7 +184,8 @@ def main(opts, args, api, streamer, searcher):
     markets, unknown = base.threaded_lookup(searcher, args)
     for market_id, (ric, market) in markets.iteritems():
         table.append({'MarketId': market_id})
-        streamer.prices.listen(on_price_update, market_id)
+    streamer.prices.listen_many(on_price_update, list(markets),
+                                max_frequency=4, wait=False)
 
     loop.run()
     streamer.stop()
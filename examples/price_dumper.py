@@ -18,6 +18,9 @@ HEADER = ('Date', 'UnixTime', 'RecvTime', 'MarketId', 'Price',
           'Bid', 'Offer', 'Direction', 'High', 'Low', 'Change', 'AuditId',
           'StatusSummary')
 
+# Ticks buffered for the CSV writer before any are dropped.
+QUEUE_SIZE = 1000000
+
 
 def reset_tz():
     os.environ['TZ'] = 'UTC'
@@ -78,6 +81,7 @@ def main(opts, args, api, streamer, searcher):
     markets, unknown = base.threaded_lookup(searcher, args)
     if unknown:
         print '# Unknown:', ', '.join(unknown)
+    base.fill_details(api, [market for ric, market in markets.itervalues()])
 
     for market_id, (ric, market) in markets.iteritems():
         fp = file(base.filename_for(opts, market, kind='ticks'), 'a', 1)
@@ -85,9 +89,20 @@ def main(opts, args, api, streamer, searcher):
         market_writer_map[market_id] = writer
         if os.path.getsize(fp.name) == 0:
             writer.writerow(HEADER)
-        streamer.prices.listen(dump, market_id)
+
+    try:
+        streamer.prices.listen_many(dump, list(markets),
+                                    delivery=cityindex.DELIVER_QUEUE,
+                                    queue_size=QUEUE_SIZE)
+    except cityindex.util.TimeoutError, e:
+        print '# Subscription incomplete:', e
 
     raw_input()
+    stats = streamer.prices.stats()
+    if stats:
+        # Every market shares one subscriber.
+        print ('# Delivered %(delivered)d ticks, dropped %(dropped)d, '
+               '%(pending)d unwritten.' % stats.values()[0][0])
     streamer.stop()
 
 
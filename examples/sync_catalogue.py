@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+
+"""Synchronize a local SQLite catalogue of every market and its tags, then
+print a summary of the work done. Run it again to refresh only what changed.
+
+PYTHONPATH=. examples/sync_catalogue.py --username=.. --password=.. --cfd markets.db
+"""
+
+from __future__ import absolute_import
+
+import time
+
+from cityindex import catalogue
+import base
+
+
+def main(opts, args, api, streamer, searcher):
+    if len(args) != 1:
+        print 'Need path to catalogue database.'
+        return
+
+    cat = catalogue.Catalogue(args[0])
+    start = time.time()
+    stats = cat.sync(api)
+    print 'Synced in %.2fs: %s' % (time.time() - start,
+        ', '.join('%s=%d' % item for item in sorted(stats.items())))
+    cat.close()
+
+if __name__ == '__main__':
+    base.main_wrapper(main)
@@ -17,13 +17,15 @@
 
 """
 Read the CityIndex schema descriptions and output a Python module implementing
-convertors and validators for its types.
+convertors and validators for its types, and an RPC binding for each service.
 """
 
 from __future__ import absolute_import
 
 import json
 import pprint
+import re
+import textwrap
 
 
 TYPE_MAP = {
@@ -35,6 +37,37 @@ TYPE_MAP = {
 
 types = {}
 rpcs = {}
+services = {}
+
+PREAMBLE = """\
+# Generated by rebuild_schema.py; do not edit.
+
+from __future__ import absolute_import
+
+import urllib
+
+from cityindex import util
+
+
+def _q(value):
+    if value is None:
+        return ''
+    elif value is True or value is False:
+        return 'true' if value else 'false'
+    elif isinstance(value, unicode):
+        value = value.encode('utf-8')
+    return urllib.quote(str(value), safe='')
+
+
+def _date(value):
+    return value if value is None else util.ms_date(value)
+
+
+def _identity(o):
+    return o
+
+
+"""
 
 
 def load_json(path):
@@ -66,6 +99,9 @@ def make_type_from_props(name, props):
         else:
             descr['type'] = TYPE_MAP[js_type]
 
+        if param.get('format') == 'wcf-date':
+            descr['date'] = True
+
     types[name] = fields
 
 
@@ -88,6 +124,106 @@ def write_rpcs(fp):
     fp.write('RPCS = %s\n\n' % pprint.pformat(rpcs))
 
 
+def snake_case(name):
+    return re.sub('([a-z0-9])([A-Z])', r'\1_\2', name).lower()
+
+
+def converted_types():
+    """Return the set of type names containing dates, directly or via nested
+    types."""
+    found = set()
+    while True:
+        new = set(name for name, fields in types.items()
+                  if name not in found
+                  and any(f.get('date') or f['type'] in found
+                          for f in fields.values()))
+        if not new:
+            return found
+        found |= new
+
+
+def write_converters(fp):
+    """Emit a _conv_<type>() function for each type containing dates, which
+    converts its date fields in-place and recurses into nested types."""
+    needed = converted_types()
+    for name in sorted(needed):
+        fp.write('def _conv_%s(o):\n' % name)
+        for field, descr in sorted(types[name].items()):
+            if descr.get('date'):
+                conv = '_date'
+            elif descr['type'] in needed:
+                conv = '_conv_' + descr['type']
+            else:
+                continue
+            fp.write('    v = o.get(%r)\n' % field)
+            if descr.get('collection'):
+                fp.write('    if v:\n')
+                fp.write('        o[%r] = [%s(x) for x in v]\n'
+                         % (field, conv))
+            else:
+                fp.write('    if v is not None:\n')
+                fp.write('        o[%r] = %s(v)\n' % (field, conv))
+        fp.write('    return o\n\n\n')
+
+
+def write_method(fp, name, svc):
+    rpc = rpcs[name]
+    url = rpc['url']
+    params = svc['parameters']
+    in_url = re.findall('{([^}]+)}', url)
+    path_params = re.findall('{([^}]+)}', url.split('?')[0])
+    body_params = [p['name'] for p in params if p['name'] not in in_url]
+
+    args = ['self']
+    for param in params:
+        if param['name'] in path_params or param.get('$ref'):
+            args.append(param['name'])
+        else:
+            args.append('%s=None' % param['name'])
+
+    fp.write('\n'.join(textwrap.wrap('    def %s(%s):' % (snake_case(name),
+        ', '.join(args)), 79, subsequent_indent=' ' * 12)) + '\n')
+    descr = ' '.join(svc.get('description', name).split())
+    descr = descr.split('. ')[0].rstrip('.').replace('"', "'") + '.'
+    descr = '\n        '.join(textwrap.wrap(descr, 68))
+    fp.write('        """%s"""\n' % descr)
+
+    fmt = re.sub('{[^}]+}', '%s', url.replace('%', '%%'))
+    if len(in_url) == 1:
+        fp.write('        path = %r %% _q(%s)\n' % (str(fmt), in_url[0]))
+    elif in_url:
+        fp.write('        path = %r %% (\n            %s)\n' % (str(fmt),
+            ', '.join('_q(%s)' % p for p in in_url)))
+    else:
+        fp.write('        path = %r\n' % str(url))
+
+    conv = '_identity'
+    if rpc['response'] in converted_types():
+        conv = '_conv_' + rpc['response']
+    if svc['transport'] == 'POST':
+        if len(params) == 1 and params[0].get('$ref'):
+            body = params[0]['name']
+        else:
+            body = '{%s}' % ', '.join('%r: %s' % (str(p), p)
+                                      for p in body_params)
+        fp.write('        return self._client._post(path, %s,\n'
+                 '            rpc=%r, conv=%s)\n\n' % (body, str(name), conv))
+    else:
+        assert not body_params, name
+        fp.write('        return self._client._get(path, rpc=%r,\n'
+                 '            conv=%s)\n\n' % (str(name), conv))
+
+
+def write_client(fp):
+    fp.write('class Rpc(object):\n')
+    fp.write('    """Binding for every service described by the SMD. Access via\n'
+             '    CiApiClient.rpc."""\n')
+    fp.write('    def __init__(self, client):\n')
+    fp.write('        self._client = client\n\n')
+    for name in sorted(services):
+        write_method(fp, name, services[name])
+
+
 def main():
     schema = load_json('schema/schema.json.js')
     for name, typ in schema['properties'].items():
@@ -114,13 +250,19 @@ def main():
             'post': svc['envelope'] == 'JSON',
             'request': req_type,
             'response': resp_type,
-            'url': svc.get('target', '') + svc.get('uriTemplate', '')
+            'url': svc.get('target', '') + svc.get('uriTemplate', ''),
+            'cache_duration': svc.get('cacheDuration', 0),
+            'throttle_scope': svc.get('throttleScope')
         }
         rpcs[name] = rpc
+        services[name] = svc
 
     with file('cityindex/schema.py', 'w') as fp:
+        fp.write(PREAMBLE)
         write_types(fp)
         write_rpcs(fp)
+        write_converters(fp)
+        write_client(fp)
 
 if __name__ == '__main__':
     main()
@@ -30,6 +30,7 @@ setup(
     license =       'AGPL3',
     url =           'http://github.com/dw/py-cityindex/',
     install_requires=[
+        'numpy',
         'py-lightstreamer'
     ],
     py_modules =    ['cityindex']
@@ -0,0 +1,102 @@
+import socket
+import threading
+import time
+import unittest
+
+from cityindex import api
+
+
+class KeepAliveServer(object):
+    """HTTP/1.1 server answering every request with 200 OK on a keep-alive
+    connection, until drop() closes its side of every connection."""
+    def __init__(self):
+        self.requests = []
+        self._conns = []
+        self._sock = socket.socket()
+        self._sock.bind(('127.0.0.1', 0))
+        self._sock.listen(5)
+        self.url = 'http://127.0.0.1:%d/' % self._sock.getsockname()[1]
+        self._start(self._accept)
+
+    def _start(self, target, *args):
+        thread = threading.Thread(target=target, args=args)
+        thread.setDaemon(True)
+        thread.start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, addr = self._sock.accept()
+            except socket.error:
+                return
+            self._conns.append(conn)
+            self._start(self._serve, conn)
+
+    def _serve(self, conn):
+        fp = conn.makefile('rb')
+        try:
+            while True:
+                line = fp.readline()
+                if not line:
+                    return
+                length = 0
+                header = line
+                while header not in ('\r\n', ''):
+                    header = fp.readline()
+                    name, _, value = header.partition(':')
+                    if name.lower() == 'content-length':
+                        length = int(value)
+                self.requests.append((line.split()[0], fp.read(length)))
+                conn.sendall('HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok')
+        except socket.error:
+            return
+
+    def drop(self):
+        for conn in self._conns:
+            conn.shutdown(socket.SHUT_RDWR)
+            conn.close()
+        del self._conns[:]
+        # Let the FIN reach the client.
+        time.sleep(0.1)
+
+    def close(self):
+        self.drop()
+        self._sock.close()
+
+
+class HttpPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.server = KeepAliveServer()
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_reuse(self):
+        pool = api.HttpPool()
+        for i in xrange(3):
+            resp = pool.request('POST', self.server.url, body='x')
+            self.assertEqual((200, 'ok'), (resp.code, resp.read()))
+        self.assertEqual(1, pool.stats()['opened'])
+        self.assertEqual(2, pool.stats()['reused'])
+
+    def test_post_after_server_closed(self):
+        pool = api.HttpPool()
+        pool.request('POST', self.server.url, body='first')
+        self.server.drop()
+        resp = pool.request('POST', self.server.url, body='second')
+        self.assertEqual(200, resp.code)
+        self.assertEqual([('POST', 'first'), ('POST', 'second')],
+                         self.server.requests)
+        self.assertEqual(2, pool.stats()['opened'])
+
+    def test_idle_timeout(self):
+        pool = api.HttpPool(idle_timeout=0)
+        pool.request('POST', self.server.url, body='first')
+        time.sleep(0.01)
+        pool.request('POST', self.server.url, body='second')
+        self.assertEqual(2, pool.stats()['opened'])
+        self.assertEqual(0, pool.stats()['reused'])
+
+
+if __name__ == '__main__':
+    unittest.main()
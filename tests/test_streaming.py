@@ -0,0 +1,152 @@
+import threading
+import time
+import unittest
+
+import lightstreamer
+
+from cityindex import streaming
+
+
+class ConflatingSubscriberTest(unittest.TestCase):
+    def _wait(self, cond, timeout=1.0):
+        end = time.time() + timeout
+        while not cond() and time.time() < end:
+            time.sleep(0.01)
+        return cond()
+
+    def test_due_item_not_held_back(self):
+        delivered = []
+        sub = streaming._ConflatingSubscriber(delivered.append,
+                                              max_frequency=0.5)
+        try:
+            sub('a', 'a1', frozenset())
+            self.assertTrue(self._wait(lambda: len(delivered) == 1))
+            # 'a' may not be delivered again for 2 seconds, while 'b' has
+            # never been delivered and is due immediately.
+            sub('a', 'a2', frozenset())
+            sub('b', 'b1', frozenset())
+            self.assertTrue(self._wait(lambda: len(delivered) == 2))
+            self.assertEqual(['a1', 'b1'], delivered)
+            self.assertEqual(1, sub.pending())
+        finally:
+            sub.stop()
+
+    def test_unlimited_is_fifo(self):
+        delivered = []
+        gate = threading.Event()
+        def func(item):
+            gate.wait()
+            delivered.append(item)
+        sub = streaming._ConflatingSubscriber(func)
+        try:
+            # 'a1' blocks the dispatcher while the others are queued.
+            sub('a', 'a1', frozenset())
+            self.assertTrue(self._wait(lambda: sub.pending() == 0))
+            sub('b', 'b1', frozenset())
+            sub('c', 'c1', frozenset())
+            sub('b', 'b2', frozenset())
+            gate.set()
+            self.assertTrue(self._wait(lambda: len(delivered) == 3))
+            self.assertEqual(['a1', 'b2', 'c1'], delivered)
+            self.assertEqual(1, sub.conflated)
+        finally:
+            sub.stop()
+
+
+
+class FakeTable(object):
+    """Stands in for lightstreamer.Table, recording its subscription."""
+    snapshot = False
+
+    def __init__(self, item_ids, max_frequency):
+        self.names = item_ids.split(' ')
+        self.max_frequency = max_frequency
+        self.deleted = False
+        self.on_update = lightstreamer.Event()
+        self.on_end_of_snapshot = lightstreamer.Event()
+
+    def update(self, name, row):
+        self.on_update.fire(self.names.index(name) + 1, row)
+
+    def delete(self):
+        self.deleted = True
+
+
+class Collector(object):
+    """Listener function recording the items passed to it."""
+    def __init__(self):
+        self.items = []
+
+    def __call__(self, item):
+        self.items.append(item)
+
+
+class TableManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.tables = []
+        self.manager = streaming.TableManager(self._make_table)
+
+    def _make_table(self, item_ids, max_frequency):
+        table = FakeTable(item_ids, max_frequency)
+        self.tables.append(table)
+        return table
+
+    def live(self):
+        return [t for t in self.tables if not t.deleted]
+
+    def test_shared_subscription(self):
+        got1, got2 = Collector(), Collector()
+        self.manager.listen(got1, 'a')
+        self.manager.listen(got2, 'a')
+        self.assertEqual(1, len(self.tables))
+        self.tables[0].update('a', 'row')
+        self.assertEqual((['row'], ['row']), (got1.items, got2.items))
+
+    def test_unlisten_teardown(self):
+        got1, got2 = Collector(), Collector()
+        self.manager.listen(got1, 'a')
+        self.manager.listen(got2, 'a')
+        self.manager.unlisten(got1, 'a')
+        self.assertEqual(self.tables, self.live())
+        self.tables[0].update('a', 'row')
+        self.assertEqual(([], ['row']), (got1.items, got2.items))
+        self.manager.unlisten(got2, 'a')
+        self.assertEqual([], self.live())
+        self.assertEqual({}, self.manager.func_map)
+
+    def test_frequency_move(self):
+        got1, got2 = Collector(), Collector()
+        slow = self.manager.listen(got1, 'a', max_frequency=1)
+        try:
+            self.assertEqual([1], [t.max_frequency for t in self.live()])
+            self.manager.listen(got2, 'a')
+            # The item moves to an unfiltered table for the new listener.
+            self.assertEqual([None], [t.max_frequency for t in self.live()])
+            self.tables[0].update('a', 'stale')
+            self.live()[0].update('a', 'row')
+            self.assertEqual(['row'], got2.items)
+            self.manager.unlisten(got2, 'a')
+            self.assertEqual([1], [t.max_frequency for t in self.live()])
+        finally:
+            slow.stop()
+
+    def test_regroup(self):
+        func = lambda item: None
+        self.manager.listen_many(func, list('abcd'))
+        self.manager.unlisten_many(func, ['a'])
+        # Three of four items are still wanted, so the table is kept.
+        self.assertEqual([list('abcd')], [t.names for t in self.live()])
+        self.manager.unlisten_many(func, ['b', 'c'])
+        self.assertEqual([['d']], [t.names for t in self.live()])
+        self.assertTrue(self.tables[0].deleted)
+
+    def test_split(self):
+        names = ['m%d' % i for i in xrange(1200)]
+        self.manager.listen_many(lambda item: None, names)
+        self.assertEqual([500, 500, 200],
+                         [len(t.names) for t in self.live()])
+        self.assertEqual(names, sum((t.names for t in self.live()), []))
+
+
+if __name__ == '__main__':
+    unittest.main()